@@ -6,8 +6,8 @@ if os.name == "nt":
 import streamlit as st
 
 from src.config import load_config
-from src.models import FilterOptions, PlaylistRequest
-from src.services.playlist_service import build_playlist
+from src.models import FilterOptions, PlaylistRequest, PlaylistResult, Recommendation
+from src.services.playlist_service import iter_playlist
 from src.ui.components import export_buttons, header, recommendation_card, subtopic_section
 from src.ui.theme import THEMES, theme_css
 
@@ -47,6 +47,11 @@ with st.sidebar:
         value=False,
         help="Requires YouTube Data API credentials and OAuth client secrets.",
     )
+    force_refresh = st.checkbox(
+        "Force refresh",
+        value=False,
+        help="Build a new playlist even if an identical request finished recently.",
+    )
 
 header(
     "YouTube Playlist Generator",
@@ -67,9 +72,16 @@ st.markdown(
 topic = st.text_input("Topic", placeholder="Example: Applied machine learning for tabular data")
 st.caption("Tip: clearer, narrower topics usually produce better subtopic planning and ranking.")
 build_clicked = st.button("Build Playlist", type="primary", use_container_width=True)
+# Set while a run is in progress, so a run cut short by a rerun or an error can continue from its journal.
+interrupted_run = st.session_state.get("interrupted_run")
+resume_clicked = bool(interrupted_run) and st.button("Resume interrupted run", use_container_width=True)
 st.markdown("</div>", unsafe_allow_html=True)
 
-if build_clicked:
+request = None
+resume_run_id = None
+if resume_clicked:
+    resume_run_id, request = interrupted_run
+elif build_clicked:
     if not topic.strip():
         st.warning("Enter a topic before building a playlist.")
     else:
@@ -84,28 +96,45 @@ if build_clicked:
             filters=filters,
             create_youtube_playlist=create_youtube_playlist,
         )
-        progress_bar = st.progress(0)
-        status_box = st.empty()
-
-        def on_progress(event):
-            progress_bar.progress(event.progress)
-            label = event.stage.replace("_", " ").title()
-            status_box.info(f"{label}: {event.message}")
-
-        try:
-            result = build_playlist(config, request, progress_callback=on_progress)
-            st.session_state["result"] = result
-        except Exception as exc:
-            st.error("Playlist generation failed.")
-            st.caption(str(exc))
-        finally:
-            progress_bar.empty()
-            status_box.empty()
+
+if request is not None:
+    progress_bar = st.progress(0)
+    status_box = st.empty()
+    # Cards are shown as each subtopic is decided; the full result below replaces them when the run ends.
+    live_box = st.empty()
+    live_cards = live_box.container()
+
+    def on_progress(event):
+        progress_bar.progress(event.progress)
+        label = event.stage.replace("_", " ").title()
+        status_box.info(f"{label}: {event.message}")
+        if event.run_id:
+            st.session_state["interrupted_run"] = (event.run_id, request)
+
+    try:
+        for item in iter_playlist(
+            config, request, progress_callback=on_progress, resume_run_id=resume_run_id, force_refresh=force_refresh
+        ):
+            if isinstance(item, Recommendation):
+                with live_cards:
+                    recommendation_card(item)
+            elif isinstance(item, PlaylistResult):
+                st.session_state["result"] = item
+                st.session_state.pop("interrupted_run", None)
+    except Exception as exc:
+        st.error("Playlist generation failed.")
+        st.caption(str(exc))
+    finally:
+        progress_bar.empty()
+        status_box.empty()
+        live_box.empty()
 
 if "result" in st.session_state:
     result = st.session_state["result"]
     st.markdown("## Playlist")
     st.caption(f"Run ID: {result.run_id}")
+    if result.reused_from_run_id:
+        st.caption(f"Reused the recent result of run {result.reused_from_run_id} for the same request.")
 
     if result.warnings:
         for warning in result.warnings:
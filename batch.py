@@ -0,0 +1,45 @@
+import argparse
+import os
+import sys
+
+if os.name == "nt":
+    os.environ.setdefault("KMP_DUPLICATE_LIB_OK", "TRUE")
+
+from src.config import load_config
+from src.services.batch_service import batch_quota_remaining, format_batch_summary, load_batch_requests, run_batch
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build playlists for every request in a JSONL or CSV file.")
+    parser.add_argument("requests_file", help="JSONL of PlaylistRequest objects, or CSV with a topic column")
+    parser.add_argument("--workers", type=int, default=4, help="playlists built concurrently")
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config()
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+
+    requests = load_batch_requests(args.requests_file)
+    total = len(requests)
+    quota = batch_quota_remaining(config)
+    if quota is not None:
+        print(f"YouTube Data API quota available to this batch: {quota} units; searches beyond it use yt-dlp")
+    done = 0
+
+    def on_result(request, result, error):
+        nonlocal done
+        done += 1
+        if error:
+            print(f"[{done}/{total}] FAILED {request.topic}: {error}")
+        else:
+            print(f"[{done}/{total}] {request.topic} -> {result.exports.json_path}")
+
+    summary = run_batch(config, requests, workers=args.workers, on_result=on_result)
+    print(format_batch_summary(summary))
+    return 1 if summary.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
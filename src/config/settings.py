@@ -14,6 +14,10 @@ class AppConfig(BaseModel):
     gemini_model: str = Field(default="gemini-2.5-flash")
 
     youtube_data_api_key: str | None = Field(default=None)
+    youtube_data_api_daily_quota: int = Field(default=10000)
+    youtube_data_api_interactive_reserve: int = Field(default=1000)
+    youtube_data_api_requests_per_sec: int = Field(default=5)
+    run_priority: str = Field(default="interactive")
     youtube_oauth_client_secret_file: str | None = Field(default=None)
     youtube_oauth_client_id: str | None = Field(default=None)
     youtube_oauth_client_secret: str | None = Field(default=None)
@@ -34,10 +38,24 @@ class AppConfig(BaseModel):
 
     data_dir: str = Field(default="data")
     sqlite_path: str = Field(default="data/cache/app.db")
+    sqlite_busy_timeout_ms: int = Field(default=5000)
+    sqlite_cache_size_kib: int = Field(default=16384)
+    sqlite_mmap_size_mb: int = Field(default=128)
 
     search_candidates_per_subtopic: int = Field(default=12)
+    search_max_pages: int = Field(default=1)
     metadata_top_k: int = Field(default=4)
+    subtopic_workers: int = Field(default=1)
+    transcript_enrichment_mode: str = Field(default="eager")
+    transcript_workers: int = Field(default=4)
+    transcript_api_concurrency: int = Field(default=8)
+    ytdlp_subtitle_concurrency: int = Field(default=4)
+    asr_concurrency: int = Field(default=1)
+    search_hedging: bool = Field(default=False)
+    search_hedge_delay_ms: int = Field(default=2000)
     request_timeout_sec: int = Field(default=30)
+    http_connect_timeout_sec: int = Field(default=5)
+    http_pool_maxsize: int = Field(default=10)
     retry_max_attempts: int = Field(default=3)
     retry_base_delay_sec: float = Field(default=1.0)
 
@@ -46,6 +64,20 @@ class AppConfig(BaseModel):
     transcript_cache_ttl_sec: int = Field(default=2592000)
     failure_cache_ttl_sec: int = Field(default=3600)
     provider_cooldown_sec: int = Field(default=900)
+    search_cache_stale_grace_sec: int = Field(default=86400)
+    metadata_cache_stale_grace_sec: int = Field(default=86400)
+    cache_refresh_workers: int = Field(default=2)
+    result_cache_ttl_sec: int = Field(default=3600)
+    cache_max_db_size_mb: int = Field(default=1024)
+    memory_cache_max_entries: int = Field(default=4096)
+    memory_cache_max_mb: int = Field(default=64)
+    transcript_codec: str = Field(default="zlib")
+    run_journal_queue_size: int = Field(default=1000)
+    cache_payload_codec: str = Field(default="json")
+    local_index_mode: str = Field(default="off")
+    local_index_min_results: int = Field(default=10)
+    cache_maintenance_interval_sec: int = Field(default=3600)
+    cache_purge_batch_size: int = Field(default=500)
 
     youtube_playlist_privacy_status: str = Field(default="private")
 
@@ -57,11 +89,59 @@ class AppConfig(BaseModel):
             raise ValueError(f"ASR_BACKEND must be one of {sorted(allowed)}")
         return value
 
+    @field_validator("transcript_codec")
+    @classmethod
+    def validate_transcript_codec(cls, value: str) -> str:
+        allowed = {"zlib", "zstd"}
+        if value not in allowed:
+            raise ValueError(f"TRANSCRIPT_CODEC must be one of {sorted(allowed)}")
+        return value
+
+    @field_validator("cache_payload_codec")
+    @classmethod
+    def validate_cache_payload_codec(cls, value: str) -> str:
+        allowed = {"json", "msgpack"}
+        if value not in allowed:
+            raise ValueError(f"CACHE_PAYLOAD_CODEC must be one of {sorted(allowed)}")
+        return value
+
+    @field_validator("local_index_mode")
+    @classmethod
+    def validate_local_index_mode(cls, value: str) -> str:
+        allowed = {"off", "first", "offline"}
+        if value not in allowed:
+            raise ValueError(f"LOCAL_INDEX_MODE must be one of {sorted(allowed)}")
+        return value
+
+    @field_validator("transcript_enrichment_mode")
+    @classmethod
+    def validate_transcript_enrichment_mode(cls, value: str) -> str:
+        allowed = {"eager", "lazy"}
+        if value not in allowed:
+            raise ValueError(f"TRANSCRIPT_ENRICHMENT_MODE must be one of {sorted(allowed)}")
+        return value
+
+    @field_validator("run_priority")
+    @classmethod
+    def validate_run_priority(cls, value: str) -> str:
+        allowed = {"interactive", "batch"}
+        if value not in allowed:
+            raise ValueError(f"RUN_PRIORITY must be one of {sorted(allowed)}")
+        return value
+
     @field_validator("search_candidates_per_subtopic")
     @classmethod
     def validate_search_candidates_per_subtopic(cls, value: int) -> int:
-        if not 10 <= value <= 20:
-            raise ValueError("SEARCH_CANDIDATES_PER_SUBTOPIC must be between 10 and 20")
+        # One search page; the YouTube Data API returns at most 50 results per page.
+        if not 1 <= value <= 50:
+            raise ValueError("SEARCH_CANDIDATES_PER_SUBTOPIC must be between 1 and 50")
+        return value
+
+    @field_validator("search_max_pages")
+    @classmethod
+    def validate_search_max_pages(cls, value: int) -> int:
+        if not 1 <= value <= 10:
+            raise ValueError("SEARCH_MAX_PAGES must be between 1 and 10")
         return value
 
     @field_validator("metadata_top_k")
@@ -71,13 +151,49 @@ class AppConfig(BaseModel):
             raise ValueError("METADATA_TOP_K must be between 1 and 10")
         return value
 
-    @field_validator("request_timeout_sec", "retry_max_attempts")
+    @field_validator(
+        "request_timeout_sec",
+        "search_hedge_delay_ms",
+        "youtube_data_api_daily_quota",
+        "youtube_data_api_requests_per_sec",
+        "http_connect_timeout_sec",
+        "http_pool_maxsize",
+        "retry_max_attempts",
+        "cache_purge_batch_size",
+        "cache_refresh_workers",
+        "subtopic_workers",
+        "transcript_workers",
+        "transcript_api_concurrency",
+        "ytdlp_subtitle_concurrency",
+        "asr_concurrency",
+    )
     @classmethod
     def validate_positive_ints(cls, value: int) -> int:
         if value <= 0:
             raise ValueError("Value must be greater than 0")
         return value
 
+    @field_validator(
+        "sqlite_busy_timeout_ms",
+        "sqlite_cache_size_kib",
+        "sqlite_mmap_size_mb",
+        "cache_max_db_size_mb",
+        "cache_maintenance_interval_sec",
+        "memory_cache_max_entries",
+        "memory_cache_max_mb",
+        "run_journal_queue_size",
+        "youtube_data_api_interactive_reserve",
+        "local_index_min_results",
+        "search_cache_stale_grace_sec",
+        "metadata_cache_stale_grace_sec",
+        "result_cache_ttl_sec",
+    )
+    @classmethod
+    def validate_non_negative_ints(cls, value: int) -> int:
+        if value < 0:
+            raise ValueError("Value must not be negative")
+        return value
+
     @field_validator("retry_base_delay_sec")
     @classmethod
     def validate_retry_base_delay_sec(cls, value: float) -> float:
@@ -108,6 +224,10 @@ def load_config() -> AppConfig:
         "gemini_api_key": os.getenv("GEMINI_API_KEY"),
         "gemini_model": os.getenv("GEMINI_MODEL", "gemini-2.5-flash"),
         "youtube_data_api_key": os.getenv("YOUTUBE_DATA_API_KEY"),
+        "youtube_data_api_daily_quota": os.getenv("YOUTUBE_DATA_API_DAILY_QUOTA", "10000"),
+        "youtube_data_api_interactive_reserve": os.getenv("YOUTUBE_DATA_API_INTERACTIVE_RESERVE", "1000"),
+        "youtube_data_api_requests_per_sec": os.getenv("YOUTUBE_DATA_API_REQUESTS_PER_SEC", "5"),
+        "run_priority": os.getenv("RUN_PRIORITY", "interactive"),
         "youtube_oauth_client_secret_file": os.getenv("YOUTUBE_OAUTH_CLIENT_SECRET_FILE"),
         "youtube_oauth_client_id": os.getenv("YOUTUBE_OAUTH_CLIENT_ID"),
         "youtube_oauth_client_secret": os.getenv("YOUTUBE_OAUTH_CLIENT_SECRET"),
@@ -126,9 +246,37 @@ def load_config() -> AppConfig:
         "allow_unsafe_openmp_workaround": os.getenv("ALLOW_UNSAFE_OPENMP_WORKAROUND", "true"),
         "data_dir": os.getenv("DATA_DIR", "data"),
         "sqlite_path": os.getenv("SQLITE_PATH", "data/cache/app.db"),
+        "sqlite_busy_timeout_ms": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+        "sqlite_cache_size_kib": os.getenv("SQLITE_CACHE_SIZE_KIB", "16384"),
+        "sqlite_mmap_size_mb": os.getenv("SQLITE_MMAP_SIZE_MB", "128"),
+        "cache_max_db_size_mb": os.getenv("CACHE_MAX_DB_SIZE_MB", "1024"),
+        "cache_maintenance_interval_sec": os.getenv("CACHE_MAINTENANCE_INTERVAL_SEC", "3600"),
+        "cache_purge_batch_size": os.getenv("CACHE_PURGE_BATCH_SIZE", "500"),
+        "memory_cache_max_entries": os.getenv("MEMORY_CACHE_MAX_ENTRIES", "4096"),
+        "memory_cache_max_mb": os.getenv("MEMORY_CACHE_MAX_MB", "64"),
+        "transcript_codec": os.getenv("TRANSCRIPT_CODEC", "zlib"),
+        "run_journal_queue_size": os.getenv("RUN_JOURNAL_QUEUE_SIZE", "1000"),
+        "cache_payload_codec": os.getenv("CACHE_PAYLOAD_CODEC", "json"),
+        "local_index_mode": os.getenv("LOCAL_INDEX_MODE", "off"),
+        "local_index_min_results": os.getenv("LOCAL_INDEX_MIN_RESULTS", "10"),
+        "search_cache_stale_grace_sec": os.getenv("SEARCH_CACHE_STALE_GRACE_SEC", "86400"),
+        "metadata_cache_stale_grace_sec": os.getenv("METADATA_CACHE_STALE_GRACE_SEC", "86400"),
+        "cache_refresh_workers": os.getenv("CACHE_REFRESH_WORKERS", "2"),
+        "result_cache_ttl_sec": os.getenv("RESULT_CACHE_TTL_SEC", "3600"),
         "search_candidates_per_subtopic": os.getenv("SEARCH_CANDIDATES_PER_SUBTOPIC", "12"),
+        "search_max_pages": os.getenv("SEARCH_MAX_PAGES", "1"),
         "metadata_top_k": os.getenv("METADATA_TOP_K", "4"),
+        "subtopic_workers": os.getenv("SUBTOPIC_WORKERS", "1"),
+        "transcript_enrichment_mode": os.getenv("TRANSCRIPT_ENRICHMENT_MODE", "eager"),
+        "transcript_workers": os.getenv("TRANSCRIPT_WORKERS", "4"),
+        "transcript_api_concurrency": os.getenv("TRANSCRIPT_API_CONCURRENCY", "8"),
+        "ytdlp_subtitle_concurrency": os.getenv("YTDLP_SUBTITLE_CONCURRENCY", "4"),
+        "asr_concurrency": os.getenv("ASR_CONCURRENCY", "1"),
+        "search_hedging": os.getenv("SEARCH_HEDGING", "false"),
+        "search_hedge_delay_ms": os.getenv("SEARCH_HEDGE_DELAY_MS", "2000"),
         "request_timeout_sec": os.getenv("REQUEST_TIMEOUT_SEC", "30"),
+        "http_connect_timeout_sec": os.getenv("HTTP_CONNECT_TIMEOUT_SEC", "5"),
+        "http_pool_maxsize": os.getenv("HTTP_POOL_MAXSIZE", "10"),
         "retry_max_attempts": os.getenv("RETRY_MAX_ATTEMPTS", "3"),
         "retry_base_delay_sec": os.getenv("RETRY_BASE_DELAY_SEC", "1.0"),
     }
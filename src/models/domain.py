@@ -119,6 +119,7 @@ class PlaylistResult(BaseModel):
     warnings: list[str] = Field(default_factory=list)
     exports: ExportArtifacts | None = None
     published_playlist_url: str | None = None
+    reused_from_run_id: str | None = None
 
 
 class ProgressEvent(BaseModel):
@@ -127,6 +128,7 @@ class ProgressEvent(BaseModel):
     progress: float
     current: int | None = None
     total: int | None = None
+    run_id: str | None = None
 
     @field_validator("progress")
     @classmethod
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, Protocol
+
+from src.models import FilterOptions, TranscriptResult, VideoCandidate
+from src.providers.llm_provider import AsyncLLMProvider, LLMProvider
+from src.providers.search_cache_policy import SearchCachePolicy
+
+
+class AsyncSearchProvider(Protocol):
+    name: str
+    cache_policy: SearchCachePolicy
+
+    def is_configured(self) -> bool:
+        raise NotImplementedError
+
+    async def search_async(self, query: str, filters: FilterOptions, limit: int) -> list[VideoCandidate]:
+        raise NotImplementedError
+
+
+class AsyncTranscriptProvider(Protocol):
+    name: str
+
+    async def fetch_async(self, candidate: VideoCandidate) -> TranscriptResult:
+        raise NotImplementedError
+
+
+@dataclass
+class ThreadedSearchProvider:
+    # Offloads a blocking search provider (requests, yt-dlp) to the default executor.
+    provider: Any
+
+    @property
+    def name(self) -> str:
+        return self.provider.name
+
+    @property
+    def cache_policy(self) -> SearchCachePolicy:
+        return self.provider.cache_policy
+
+    def is_configured(self) -> bool:
+        is_configured = getattr(self.provider, "is_configured", None)
+        return is_configured() if is_configured else True
+
+    async def search_async(self, query: str, filters: FilterOptions, limit: int) -> list[VideoCandidate]:
+        return await asyncio.to_thread(self.provider.search, query, filters, limit)
+
+    async def search_page_async(
+        self,
+        query: str,
+        filters: FilterOptions,
+        limit: int,
+        page_token: str | None = None,
+    ) -> tuple[list[VideoCandidate], str | None]:
+        return await asyncio.to_thread(self.provider.search_page, query, filters, limit, page_token)
+
+
+@dataclass
+class ThreadedTranscriptProvider:
+    name: str
+    fetch: Callable[[VideoCandidate], TranscriptResult]
+
+    async def fetch_async(self, candidate: VideoCandidate) -> TranscriptResult:
+        return await asyncio.to_thread(self.fetch, candidate)
+
+
+@dataclass
+class ThreadedLLMProvider:
+    provider: LLMProvider
+
+    @property
+    def config(self):
+        return getattr(self.provider, "config", None)
+
+    async def generate_subtopics_async(self, topic: str, language: str) -> list[str]:
+        return await asyncio.to_thread(self.provider.generate_subtopics, topic, language)
+
+
+def as_async_search_provider(provider: Any) -> AsyncSearchProvider:
+    return provider if hasattr(provider, "search_async") else ThreadedSearchProvider(provider)
+
+
+def as_async_llm_provider(provider: Any) -> AsyncLLMProvider:
+    # Providers with a native async client (Gemini) are used as-is; the rest run on a worker thread.
+    return provider if hasattr(provider, "generate_subtopics_async") else ThreadedLLMProvider(provider)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import threading
 from dataclasses import dataclass
 
 from src.config import AppConfig
@@ -25,12 +26,10 @@ class FasterWhisperProvider:
             # Work around duplicate Intel OpenMP DLL loads seen in mixed TensorFlow/ASR Conda environments.
             os.environ.setdefault("KMP_DUPLICATE_LIB_OK", "TRUE")
 
-        from faster_whisper import WhisperModel
-
-        model = WhisperModel(
+        model = _load_model(
             self.config.faster_whisper_model_size,
-            device=self.config.faster_whisper_device,
-            compute_type=self.config.faster_whisper_compute_type,
+            self.config.faster_whisper_device,
+            self.config.faster_whisper_compute_type,
         )
         segments, info = model.transcribe(audio_path)
         text = normalize_text(" ".join(segment.text for segment in segments))
@@ -50,3 +49,18 @@ class FasterWhisperProvider:
             language=getattr(info, "language", None),
             text=text,
         )
+
+
+_MODELS: dict[tuple[str, str, str], object] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def _load_model(model_size: str, device: str, compute_type: str):
+    # Loading weights dominates short transcriptions, so one model per settings is kept for the whole process.
+    key = (model_size, device, compute_type)
+    with _MODELS_LOCK:
+        if key not in _MODELS:
+            from faster_whisper import WhisperModel
+
+            _MODELS[key] = WhisperModel(model_size, device=device, compute_type=compute_type)
+        return _MODELS[key]
@@ -12,6 +12,17 @@ class LLMProvider(Protocol):
         raise NotImplementedError
 
 
+class AsyncLLMProvider(Protocol):
+    async def generate_subtopics_async(self, topic: str, language: str) -> list[str]:
+        raise NotImplementedError
+
+
+_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "system_instruction": "Return only valid JSON.",
+}
+
+
 class GeminiLLMProvider:
     def __init__(self, config: AppConfig):
         with warnings.catch_warnings():
@@ -27,32 +38,33 @@ class GeminiLLMProvider:
         self.fallback_model = "gemini-2.5-flash"
 
     def generate_subtopics(self, topic: str, language: str) -> list[str]:
-        prompt = (
-            "You are planning a learning playlist. "
-            "Return a JSON array of concise subtopics that cover the topic end-to-end. "
-            "Avoid duplicates, near-duplicates, and overly generic labels. "
-            f"Preferred output language: {language}. "
-            f"Topic: {topic}"
-        )
-
+        prompt = _subtopic_prompt(topic, language)
         errors: list[str] = []
         for model_name in self._candidate_models():
             try:
                 response = self.client.models.generate_content(
                     model=model_name,
                     contents=prompt,
-                    config={
-                        "response_mime_type": "application/json",
-                        "system_instruction": "Return only valid JSON.",
-                    },
+                    config=_GENERATION_CONFIG,
+                )
+                return _parse_subtopics(response.text)
+            except Exception as exc:
+                errors.append(f"{model_name}: {exc}")
+                if not _is_model_not_found_error(exc):
+                    raise
+        raise RuntimeError("No usable Gemini model found. " + " | ".join(errors))
+
+    async def generate_subtopics_async(self, topic: str, language: str) -> list[str]:
+        prompt = _subtopic_prompt(topic, language)
+        errors: list[str] = []
+        for model_name in self._candidate_models():
+            try:
+                response = await self.client.aio.models.generate_content(
+                    model=model_name,
+                    contents=prompt,
+                    config=_GENERATION_CONFIG,
                 )
-                text = (response.text or "").strip()
-                if not text:
-                    raise ValueError("Empty Gemini response")
-                payload = json.loads(text)
-                if not isinstance(payload, list):
-                    raise ValueError("Gemini response was not a JSON array")
-                return [str(item).strip() for item in payload if str(item).strip()]
+                return _parse_subtopics(response.text)
             except Exception as exc:
                 errors.append(f"{model_name}: {exc}")
                 if not _is_model_not_found_error(exc):
@@ -67,6 +79,26 @@ class GeminiLLMProvider:
         return models
 
 
+def _subtopic_prompt(topic: str, language: str) -> str:
+    return (
+        "You are planning a learning playlist. "
+        "Return a JSON array of concise subtopics that cover the topic end-to-end. "
+        "Avoid duplicates, near-duplicates, and overly generic labels. "
+        f"Preferred output language: {language}. "
+        f"Topic: {topic}"
+    )
+
+
+def _parse_subtopics(text: str | None) -> list[str]:
+    text = (text or "").strip()
+    if not text:
+        raise ValueError("Empty Gemini response")
+    payload = json.loads(text)
+    if not isinstance(payload, list):
+        raise ValueError("Gemini response was not a JSON array")
+    return [str(item).strip() for item in payload if str(item).strip()]
+
+
 def _is_model_not_found_error(exc: Exception) -> bool:
     message = str(exc).lower()
     return "not_found" in message or "is not found for api version" in message or "404" in message
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from src.config import AppConfig
+from src.models import FilterOptions, VideoCandidate
+from src.storage import SQLiteStore
+from src.utils.text_utils import language_matches
+
+
+@dataclass
+class LocalIndexProvider:
+    config: AppConfig
+    store: SQLiteStore
+
+    name: str = "local_index"
+
+    def is_configured(self) -> bool:
+        return self.config.local_index_mode != "off" and self.store.has_full_text_index()
+
+    def search(self, query: str, filters: FilterOptions, limit: int) -> list[VideoCandidate]:
+        candidates: list[VideoCandidate] = []
+        for candidate in self.store.search_local_index(query, limit * 2):
+            if candidate.language and not language_matches(candidate.language, filters.language):
+                continue
+            candidate.discovery_provider = self.name
+            candidates.append(candidate)
+            if len(candidates) >= limit:
+                break
+        return candidates
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from src.models import FilterOptions
+from src.utils.text_utils import canonicalize_query
+
+
+@dataclass(frozen=True)
+class SearchCachePolicy:
+    # Only the filter fields a provider actually sends upstream belong in its search cache key.
+    filter_fields: tuple[str, ...] = ("language",)
+    lowercase: bool = True
+    collapse_whitespace: bool = True
+    sort_tokens: bool = False
+
+    def cache_query(self, query: str) -> str:
+        return canonicalize_query(
+            query,
+            lowercase=self.lowercase,
+            collapse_whitespace=self.collapse_whitespace,
+            sort_tokens=self.sort_tokens,
+        )
+
+    def cache_filters(self, filters: FilterOptions) -> dict[str, Any]:
+        values = filters.model_dump()
+        return {field: values[field] for field in self.filter_fields}
+
+
+# YouTube search is case-insensitive and ignores extra whitespace, but token order still shifts its ranking.
+YOUTUBE_SEARCH_CACHE_POLICY = SearchCachePolicy()
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from typing import Any, Callable
 
 import requests
 
 from src.config import AppConfig
 from src.models import FilterOptions, VideoCandidate
+from src.providers.search_cache_policy import YOUTUBE_SEARCH_CACHE_POLICY, SearchCachePolicy
+from src.providers.youtube_quota import SEARCH_UNITS, VIDEOS_LIST_UNITS, DataApiQuota, shared_data_api_quota
+from src.utils.http_client import HttpClient, shared_http_client
 
 
 class ProviderTemporaryError(RuntimeError):
@@ -17,16 +20,58 @@ class ProviderPermanentError(Exception):
     pass
 
 
+class QuotaExhaustedError(ProviderPermanentError):
+    pass
+
+
 @dataclass
 class YouTubeDataAPIProvider:
     config: AppConfig
 
     name: str = "youtube_data_api"
+    cache_policy: SearchCachePolicy = YOUTUBE_SEARCH_CACHE_POLICY
+    http: HttpClient | None = field(default=None, repr=False)
+    quota: DataApiQuota | None = field(default=None, repr=False)
+    # Resolves search hits to full details; defaults to a videos.list call per page. The search service swaps in a
+    # metadata-cache-aware (and, for parallel subtopics, batched) lookup.
+    details_lookup: Callable[[list[str]], dict[str, VideoCandidate]] | None = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.http is None:
+            self.http = shared_http_client(self.config)
 
     def is_configured(self) -> bool:
         return bool(self.config.youtube_data_api_key)
 
     def search(self, query: str, filters: FilterOptions, limit: int) -> list[VideoCandidate]:
+        return self.search_page(query, filters, limit)[0]
+
+    def search_page(
+        self,
+        query: str,
+        filters: FilterOptions,
+        limit: int,
+        page_token: str | None = None,
+    ) -> tuple[list[VideoCandidate], str | None]:
+        stubs, next_page_token = self.search_snippets(query, filters, limit, page_token)
+        if not stubs:
+            return [], next_page_token
+        video_ids = [stub.video_id for stub in stubs]
+        if self.details_lookup is not None:
+            details = self.details_lookup(video_ids)
+        else:
+            details = {candidate.video_id: candidate for candidate in self.fetch_videos(video_ids)}
+        return merge_video_details(stubs, details), next_page_token
+
+    def search_snippets(
+        self,
+        query: str,
+        filters: FilterOptions,
+        limit: int,
+        page_token: str | None = None,
+    ) -> tuple[list[VideoCandidate], str | None]:
+        # search.list only: candidates lack duration, views and language until merged with video details. Returns
+        # the page's stubs and the token for the next page (None on the last one).
         if not self.is_configured():
             raise ProviderPermanentError("YOUTUBE_DATA_API_KEY is not configured")
 
@@ -34,17 +79,17 @@ class YouTubeDataAPIProvider:
             "part": "snippet",
             "q": query,
             "type": "video",
-            "maxResults": min(limit, 20),
+            "maxResults": min(limit, 50),
             "key": self.config.youtube_data_api_key,
             "relevanceLanguage": filters.language,
             "safeSearch": "moderate",
         }
+        if page_token:
+            params["pageToken"] = page_token
+        self._admit(SEARCH_UNITS)
         try:
-            search_resp = requests.get(
-                "https://www.googleapis.com/youtube/v3/search",
-                params=params,
-                timeout=self.config.request_timeout_sec,
-            )
+            search_resp = self.http.get("https://www.googleapis.com/youtube/v3/search", params=params)
+            self._check_quota_response(search_resp)
             if search_resp.status_code in {403, 429, 500, 503}:
                 raise ProviderTemporaryError(f"YouTube Data API search failed: {search_resp.status_code}")
             search_resp.raise_for_status()
@@ -52,36 +97,49 @@ class YouTubeDataAPIProvider:
         except requests.RequestException as exc:
             raise ProviderTemporaryError(f"YouTube Data API search request failed: {exc}") from exc
 
-        video_ids = [item["id"]["videoId"] for item in search_data.get("items", []) if item.get("id", {}).get("videoId")]
-        if not video_ids:
-            return []
-        details = self._fetch_video_details(video_ids)
-        detail_map = {item["id"]: item for item in details}
-        candidates: list[VideoCandidate] = []
+        stubs: list[VideoCandidate] = []
         for item in search_data.get("items", []):
             video_id = item.get("id", {}).get("videoId")
-            if not video_id or video_id not in detail_map:
+            if not video_id:
                 continue
             snippet = item.get("snippet", {})
-            detail = detail_map[video_id]
-            content_details = detail.get("contentDetails", {})
-            statistics = detail.get("statistics", {})
-            snippet_detail = detail.get("snippet", {})
-            candidates.append(
+            stubs.append(
                 VideoCandidate(
                     video_id=video_id,
                     url=f"https://www.youtube.com/watch?v={video_id}",
                     title=snippet.get("title", ""),
                     description=snippet.get("description", ""),
                     channel=snippet.get("channelTitle"),
-                    duration_sec=_parse_iso_duration_seconds(content_details.get("duration")),
-                    view_count=_safe_int(statistics.get("viewCount")),
-                    publish_date=snippet_detail.get("publishedAt") or snippet.get("publishedAt"),
-                    language=snippet_detail.get("defaultAudioLanguage") or snippet_detail.get("defaultLanguage"),
+                    publish_date=snippet.get("publishedAt"),
                     is_live=snippet.get("liveBroadcastContent") == "live",
                     discovery_provider=self.name,
                 )
             )
+        return stubs, search_data.get("nextPageToken")
+
+    def fetch_videos(self, video_ids: list[str]) -> list[VideoCandidate]:
+        if not self.is_configured():
+            raise ProviderPermanentError("YOUTUBE_DATA_API_KEY is not configured")
+        candidates: list[VideoCandidate] = []
+        for start in range(0, len(video_ids), 50):
+            self._admit(VIDEOS_LIST_UNITS)
+            for detail in self._fetch_video_details(video_ids[start : start + 50]):
+                snippet = detail.get("snippet", {})
+                candidates.append(
+                    VideoCandidate(
+                        video_id=detail["id"],
+                        url=f"https://www.youtube.com/watch?v={detail['id']}",
+                        title=snippet.get("title", ""),
+                        description=snippet.get("description", ""),
+                        channel=snippet.get("channelTitle"),
+                        duration_sec=_parse_iso_duration_seconds(detail.get("contentDetails", {}).get("duration")),
+                        view_count=_safe_int(detail.get("statistics", {}).get("viewCount")),
+                        publish_date=snippet.get("publishedAt"),
+                        language=snippet.get("defaultAudioLanguage") or snippet.get("defaultLanguage"),
+                        is_live=snippet.get("liveBroadcastContent") == "live",
+                        discovery_provider=self.name,
+                    )
+                )
         return candidates
 
     def _fetch_video_details(self, video_ids: list[str]) -> list[dict[str, Any]]:
@@ -92,11 +150,8 @@ class YouTubeDataAPIProvider:
             "maxResults": len(video_ids),
         }
         try:
-            response = requests.get(
-                "https://www.googleapis.com/youtube/v3/videos",
-                params=params,
-                timeout=self.config.request_timeout_sec,
-            )
+            response = self.http.get("https://www.googleapis.com/youtube/v3/videos", params=params)
+            self._check_quota_response(response)
             if response.status_code in {403, 429, 500, 503}:
                 raise ProviderTemporaryError(f"YouTube Data API video details failed: {response.status_code}")
             response.raise_for_status()
@@ -104,6 +159,54 @@ class YouTubeDataAPIProvider:
         except requests.RequestException as exc:
             raise ProviderTemporaryError(f"YouTube Data API video details request failed: {exc}") from exc
 
+    def _quota(self) -> DataApiQuota:
+        if self.quota is None:
+            self.quota = shared_data_api_quota(self.config)
+        return self.quota
+
+    def _admit(self, units: int) -> None:
+        # Checked before the request, so an exhausted budget falls back to yt-dlp without spending a 403.
+        interactive = self.config.run_priority == "interactive"
+        quota = self._quota()
+        if not quota.admit(units, interactive=interactive):
+            scope = "" if interactive else " outside the interactive reserve"
+            raise QuotaExhaustedError(
+                f"YouTube Data API quota exhausted: {quota.remaining(interactive)} units left today{scope}, "
+                f"{units} needed"
+            )
+
+    def _check_quota_response(self, response: requests.Response) -> None:
+        if response.status_code != 403:
+            return
+        try:
+            reasons = {error.get("reason") for error in response.json().get("error", {}).get("errors", [])}
+        except ValueError:
+            return
+        if reasons & {"quotaExceeded", "dailyLimitExceeded"}:
+            self._quota().mark_exhausted()
+            raise QuotaExhaustedError("YouTube Data API daily quota exceeded")
+
+
+def merge_video_details(stubs: list[VideoCandidate], details: dict[str, VideoCandidate]) -> list[VideoCandidate]:
+    # Search snippets keep their title, description, channel and live flag; details add the rest. Videos without
+    # details (deleted or private since indexing) are dropped.
+    candidates: list[VideoCandidate] = []
+    for stub in stubs:
+        detail = details.get(stub.video_id)
+        if detail is None:
+            continue
+        candidates.append(
+            stub.model_copy(
+                update={
+                    "duration_sec": detail.duration_sec,
+                    "view_count": detail.view_count,
+                    "publish_date": detail.publish_date or stub.publish_date,
+                    "language": detail.language,
+                }
+            )
+        )
+    return candidates
+
 
 def _safe_int(value: Any) -> int | None:
     try:
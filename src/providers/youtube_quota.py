@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone, tzinfo
+
+from src.config import AppConfig
+from src.storage import SQLiteStore
+from src.utils.rate_limit import TokenBucket
+
+SEARCH_UNITS = 100
+VIDEOS_LIST_UNITS = 1
+
+
+class DataApiQuota:
+    # Daily unit ledger for one API key, persisted in SQLite so every process sharing the database draws from the
+    # same budget. Batch runs stop `interactive_reserve` units early, leaving the rest of the day to UI runs.
+    def __init__(
+        self,
+        store: SQLiteStore,
+        api_key: str,
+        daily_limit: int,
+        interactive_reserve: int = 0,
+        requests_per_sec: float = 5,
+    ):
+        self.store = store
+        self.key_id = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        self.daily_limit = daily_limit
+        self.interactive_reserve = interactive_reserve
+        self.bucket = TokenBucket(requests_per_sec)
+
+    def remaining(self, interactive: bool = True) -> int:
+        left = self.daily_limit - self.store.get_api_quota_used(self.key_id, quota_day())
+        return max(0, left if interactive else left - self.interactive_reserve)
+
+    def admit(self, units: int, interactive: bool = True) -> bool:
+        limit = self.daily_limit if interactive else self.daily_limit - self.interactive_reserve
+        if not self.store.reserve_api_quota(self.key_id, quota_day(), units, limit):
+            return False
+        self.bucket.acquire(interactive)
+        return True
+
+    def mark_exhausted(self) -> None:
+        # Google reported quotaExceeded: the ledger undercounted (another client, or usage before the ledger).
+        self.store.set_api_quota_used(self.key_id, quota_day(), self.daily_limit)
+
+
+def quota_day(now: datetime | None = None) -> str:
+    # Data API quotas reset at midnight Pacific time.
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(_pacific()).date().isoformat()
+
+
+def _pacific() -> tzinfo:
+    try:
+        from zoneinfo import ZoneInfo
+
+        return ZoneInfo("America/Los_Angeles")
+    except Exception:
+        # No tz database (e.g. Windows without tzdata): PST, an hour early during daylight saving time.
+        return timezone(timedelta(hours=-8))
+
+
+_shared_lock = threading.Lock()
+_shared_quotas: dict[tuple[str, str], DataApiQuota] = {}
+
+
+def shared_data_api_quota(config: AppConfig) -> DataApiQuota:
+    key = (config.sqlite_path, config.youtube_data_api_key or "")
+    with _shared_lock:
+        quota = _shared_quotas.get(key)
+        if quota is None:
+            quota = DataApiQuota(
+                SQLiteStore.from_config(config),
+                config.youtube_data_api_key or "",
+                daily_limit=config.youtube_data_api_daily_quota,
+                interactive_reserve=config.youtube_data_api_interactive_reserve,
+                requests_per_sec=config.youtube_data_api_requests_per_sec,
+            )
+            _shared_quotas[key] = quota
+        return quota
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
-import requests
 import yt_dlp
 
 from src.config import AppConfig
 from src.models import FilterOptions, TranscriptResult, VideoCandidate
+from src.providers.search_cache_policy import YOUTUBE_SEARCH_CACHE_POLICY, SearchCachePolicy
+from src.utils.http_client import HttpClient, shared_http_client
 from src.utils.text_utils import normalize_text
 from src.utils.ytdlp_options import build_ydl_common_options
 
@@ -18,16 +19,36 @@ class YtDlpProvider:
     config: AppConfig
 
     name: str = "yt_dlp"
+    cache_policy: SearchCachePolicy = YOUTUBE_SEARCH_CACHE_POLICY
+    http: HttpClient | None = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.http is None:
+            self.http = shared_http_client(self.config)
 
     def search(self, query: str, filters: FilterOptions, limit: int) -> list[VideoCandidate]:
+        return self.search_page(query, filters, limit)[0]
+
+    def search_page(
+        self,
+        query: str,
+        filters: FilterOptions,
+        limit: int,
+        page_token: str | None = None,
+    ) -> tuple[list[VideoCandidate], str | None]:
+        # ytsearch has no cursor: page n asks for the first n * limit results and keeps the last limit of them. The
+        # token is simply the next page number.
+        page = int(page_token or 1)
         options = build_ydl_common_options(self.config)
         options["extract_flat"] = True
         options["force_generic_extractor"] = True
-        search_url = f"ytsearch{limit}:{query}"
+        search_url = f"ytsearch{limit * page}:{query}"
         with yt_dlp.YoutubeDL(options) as ydl:
             info = ydl.extract_info(search_url, download=False)
+        entries = info.get("entries", []) or []
+        next_page_token = str(page + 1) if len(entries) >= limit * page else None
         candidates: list[VideoCandidate] = []
-        for entry in info.get("entries", []) or []:
+        for entry in entries[limit * (page - 1) :]:
             if not entry or not entry.get("id"):
                 continue
             candidates.append(
@@ -45,7 +66,7 @@ class YtDlpProvider:
                     discovery_provider=self.name,
                 )
             )
-        return candidates
+        return candidates, next_page_token
 
     def fetch_subtitles(self, url: str, video_id: str) -> TranscriptResult | None:
         options = build_ydl_common_options(self.config)
@@ -59,7 +80,7 @@ class YtDlpProvider:
         vtt_url = next((item.get("url") for item in formats if item.get("ext") == "vtt" and item.get("url")), None)
         if not vtt_url:
             return None
-        response = requests.get(vtt_url, timeout=self.config.request_timeout_sec)
+        response = self.http.get(vtt_url)
         response.raise_for_status()
         text = _vtt_to_text(response.text)
         if len(text) < 50:
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from src.config import AppConfig
+from src.models import FilterOptions, PlaylistRequest, PlaylistResult
+from src.providers import GeminiLLMProvider
+from src.providers.youtube_data_api_provider import YouTubeDataAPIProvider
+from src.providers.youtube_quota import SEARCH_UNITS, shared_data_api_quota
+from src.services.fetch_memo import FetchMemo
+from src.services.playlist_service import PipelineResources, build_playlist
+from src.services.search_hedging import shared_search_hedger
+from src.storage import CacheStats, SQLiteStore
+from src.utils.http_client import HttpStats, shared_http_client
+
+_FILTER_COLUMNS = ("language", "difficulty", "max_duration_minutes", "freshness_preference")
+
+
+@dataclass
+class BatchSummary:
+    results: list[PlaylistResult] = field(default_factory=list)
+    failures: list[tuple[PlaylistRequest, str]] = field(default_factory=list)
+    elapsed_sec: float = 0.0
+    deduplicated: dict[str, int] = field(default_factory=dict)
+    cache_stats: dict[str, CacheStats] = field(default_factory=dict)
+    http_stats: HttpStats = field(default_factory=HttpStats)
+    quota_remaining: int | None = None
+    hedge_wins: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def runs_per_min(self) -> float:
+        return len(self.results) / (self.elapsed_sec / 60) if self.elapsed_sec else 0.0
+
+
+def load_batch_requests(path: str | Path) -> list[PlaylistRequest]:
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as handle:
+            return [_request_from_row(row) for row in csv.DictReader(handle) if (row.get("topic") or "").strip()]
+    with path.open(encoding="utf-8") as handle:
+        return [PlaylistRequest.model_validate(json.loads(line)) for line in handle if line.strip()]
+
+
+def run_batch(
+    config: AppConfig,
+    requests: list[PlaylistRequest],
+    workers: int = 4,
+    on_result: Callable[[PlaylistRequest, PlaylistResult | None, str | None], None] | None = None,
+) -> BatchSummary:
+    # Every run shares one store, one LLM client and one FetchMemo, so topics that overlap (same subtopic queries,
+    # same videos) search and fetch transcripts once per batch.
+    # Batch runs leave the interactive quota reserve to UI sessions and yield to them for Data API rate tokens.
+    config = config.model_copy(update={"run_priority": "batch"})
+    store = SQLiteStore.from_config(config)
+    resources = PipelineResources(store=store, llm=GeminiLLMProvider(config), fetches=FetchMemo())
+    summary = BatchSummary()
+    http_before = shared_http_client(config).stats()
+    hedge_before = shared_search_hedger().wins()
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch") as executor:
+            futures = {
+                executor.submit(build_playlist, config, request, resources=resources): request for request in requests
+            }
+            for future in as_completed(futures):
+                request = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    summary.failures.append((request, str(exc)))
+                    if on_result:
+                        on_result(request, None, str(exc))
+                    continue
+                summary.results.append(result)
+                if on_result:
+                    on_result(request, result, None)
+    finally:
+        summary.elapsed_sec = time.monotonic() - started
+        summary.deduplicated = resources.fetches.saved()
+        summary.cache_stats = store.cache_stats()
+        summary.quota_remaining = batch_quota_remaining(config)
+        summary.hedge_wins = {
+            provider: wins - hedge_before.get(provider, 0)
+            for provider, wins in shared_search_hedger().wins().items()
+            if wins > hedge_before.get(provider, 0)
+        }
+        http_after = shared_http_client(config).stats()
+        summary.http_stats = HttpStats(
+            http_after.requests - http_before.requests, http_after.connections - http_before.connections
+        )
+        store.close()
+    return summary
+
+
+def batch_quota_remaining(config: AppConfig) -> int | None:
+    if not YouTubeDataAPIProvider(config).is_configured():
+        return None
+    return shared_data_api_quota(config).remaining(interactive=False)
+
+
+def format_batch_summary(summary: BatchSummary) -> str:
+    lines = [
+        f"Runs: {len(summary.results)} completed, {len(summary.failures)} failed in {summary.elapsed_sec:.1f}s "
+        f"({summary.runs_per_min:.2f} runs/min)",
+        "Lookups saved by cross-run deduplication: "
+        + ", ".join(
+            f"{kind} {summary.deduplicated.get(kind, 0)}" for kind in ("subtopics", "search", "transcript")
+        ),
+    ]
+    if summary.http_stats.requests:
+        lines.append(
+            f"HTTP: {summary.http_stats.requests} requests over {summary.http_stats.connections} connections "
+            f"({summary.http_stats.reused} handshakes saved by keep-alive)"
+        )
+    if summary.hedge_wins:
+        lines.append(
+            "Hedged searches won by: "
+            + ", ".join(f"{provider} {wins}" for provider, wins in sorted(summary.hedge_wins.items()))
+        )
+    if summary.quota_remaining is not None:
+        lines.append(
+            f"YouTube Data API quota left for batch jobs today: {summary.quota_remaining} units "
+            f"(~{summary.quota_remaining // SEARCH_UNITS} searches)"
+        )
+    for table, stats in sorted(summary.cache_stats.items()):
+        lookups = stats.hits + stats.misses
+        rate = stats.hits / lookups if lookups else 0.0
+        lines.append(f"Memory cache {table}: {rate:.0%} hit rate ({stats.hits}/{lookups})")
+    return "\n".join(lines)
+
+
+def _request_from_row(row: dict[str, str]) -> PlaylistRequest:
+    filters = {column: row[column] for column in _FILTER_COLUMNS if (row.get(column) or "").strip()}
+    return PlaylistRequest(
+        topic=row["topic"].strip(),
+        filters=FilterOptions.model_validate(filters),
+        create_youtube_playlist=(row.get("create_youtube_playlist") or "").strip().lower() in {"1", "true", "yes"},
+    )
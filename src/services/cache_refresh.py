@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Hashable
+
+
+@dataclass
+class RefreshStats:
+    stale_served: int = 0
+    scheduled: int = 0
+    deduplicated: int = 0
+    failed: int = 0
+
+
+class CacheRefresher:
+    # Runs stale-while-revalidate refreshes off the request path, at most one in flight per cache key.
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cache-refresh")
+        self._in_flight: set[tuple[str, Hashable]] = set()
+        self._futures: set[Future] = set()
+        self._stats: dict[str, RefreshStats] = {}
+        self._lock = threading.Lock()
+
+    def record_stale(self, cache: str, count: int = 1) -> None:
+        with self._lock:
+            self._stats.setdefault(cache, RefreshStats()).stale_served += count
+
+    def schedule(
+        self,
+        cache: str,
+        keys: list[Hashable],
+        refresh: Callable[[list[Hashable]], None],
+        logger=None,
+    ) -> list[Hashable]:
+        with self._lock:
+            stats = self._stats.setdefault(cache, RefreshStats())
+            claimed = [key for key in dict.fromkeys(keys) if (cache, key) not in self._in_flight]
+            stats.deduplicated += len(set(keys)) - len(claimed)
+            if not claimed:
+                return []
+            self._in_flight.update((cache, key) for key in claimed)
+            stats.scheduled += len(claimed)
+
+        def run() -> None:
+            try:
+                refresh(claimed)
+            except Exception as exc:
+                with self._lock:
+                    stats.failed += len(claimed)
+                if logger:
+                    logger.warning("Background refresh of %s failed: %s", cache, exc)
+            finally:
+                with self._lock:
+                    self._in_flight.difference_update((cache, key) for key in claimed)
+
+        future = self._executor.submit(run)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard_future)
+        return claimed
+
+    def wait(self, timeout: float | None = None) -> None:
+        with self._lock:
+            pending = list(self._futures)
+        for future in pending:
+            future.result(timeout=timeout)
+
+    def stats(self) -> dict[str, RefreshStats]:
+        with self._lock:
+            return {
+                cache: RefreshStats(stats.stale_served, stats.scheduled, stats.deduplicated, stats.failed)
+                for cache, stats in self._stats.items()
+            }
+
+    def _discard_future(self, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+
+_shared_lock = threading.Lock()
+_shared_refresher: CacheRefresher | None = None
+
+
+def shared_cache_refresher(max_workers: int) -> CacheRefresher:
+    global _shared_refresher
+    with _shared_lock:
+        if _shared_refresher is None:
+            _shared_refresher = CacheRefresher(max_workers=max_workers)
+        return _shared_refresher
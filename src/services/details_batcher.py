@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+from src.models import VideoCandidate
+
+# Upper bound on how long a lookup waits for other searches to join it, e.g. when a participant is stuck behind a
+# coalesced search that will never reach the batcher itself.
+DEFAULT_MAX_WAIT_SEC = 1.0
+
+
+class _Batch:
+    def __init__(self):
+        self.video_ids: dict[str, None] = {}
+        self.callers = 0
+        self.future: Future = Future()
+
+
+class DetailsBatcher:
+    # Collects the video ids that concurrent searches need details for, so subtopics searched in parallel share one
+    # metadata-cache pass and full 50-id videos.list batches. Each search stays on its own thread (and keeps its
+    # coalescing and hedging); only the detail lookup waits, until every active participant has either joined the
+    # batch or finished searching.
+    def __init__(
+        self,
+        lookup: Callable[[list[str]], dict[str, VideoCandidate]],
+        max_wait_sec: float = DEFAULT_MAX_WAIT_SEC,
+    ):
+        self._lookup = lookup
+        self.max_wait_sec = max_wait_sec
+        self._active = 0
+        self._pending: _Batch | None = None
+        self._condition = threading.Condition()
+        self.batches = 0
+
+    def enter(self, count: int = 1) -> None:
+        with self._condition:
+            self._active += count
+
+    def leave(self) -> None:
+        with self._condition:
+            self._active -= 1
+            self._condition.notify_all()
+
+    def lookup(self, video_ids: list[str]) -> dict[str, VideoCandidate]:
+        with self._condition:
+            batch = self._pending
+            leader = batch is None
+            if leader:
+                batch = self._pending = _Batch()
+            batch.video_ids.update(dict.fromkeys(video_ids))
+            batch.callers += 1
+            self._condition.notify_all()
+            if leader:
+                deadline = time.monotonic() + self.max_wait_sec
+                while batch.callers < self._active:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                self._pending = None
+                self.batches += 1
+        if leader:
+            try:
+                batch.future.set_result(self._lookup(list(batch.video_ids)))
+            except BaseException as exc:
+                batch.future.set_exception(exc)
+        details = batch.future.result()
+        return {video_id: details[video_id] for video_id in video_ids if video_id in details}
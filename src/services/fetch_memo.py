@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class FetchMemo:
+    # Lookups shared by every run that holds this memo (e.g. a batch): the first caller for a key fetches, and
+    # concurrent or later callers reuse its result. Failed fetches are forgotten so a later caller can retry.
+    def __init__(self):
+        self._futures: dict[tuple[str, Hashable], Future] = {}
+        self._lock = threading.Lock()
+        self._saved: Counter[str] = Counter()
+
+    def get(self, kind: str, key: Hashable, fetch: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._futures.get((kind, key))
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[(kind, key)] = future
+            else:
+                self._saved[kind] += 1
+        if owner:
+            try:
+                future.set_result(fetch())
+            except BaseException as exc:
+                with self._lock:
+                    self._futures.pop((kind, key), None)
+                future.set_exception(exc)
+        return future.result()
+
+    def saved(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._saved)
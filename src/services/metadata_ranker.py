@@ -3,7 +3,10 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from src.models import FilterOptions, MetadataScore, VideoCandidate
-from src.utils.text_utils import keyword_overlap_score, normalize_text
+from src.utils.text_utils import keyword_overlap_score, language_matches, normalize_text
+
+# Bump whenever scoring changes, so cached playlist results built with the old ranking are not reused.
+RANKER_VERSION = 1
 
 
 def rank_candidates(
@@ -22,6 +25,13 @@ def rank_candidates(
     return ranked
 
 
+def meets_hard_filters(candidate: VideoCandidate, filters: FilterOptions) -> bool:
+    # Ranking treats filters as soft scores; these are the cases where a pick plainly breaks the request.
+    if candidate.is_live:
+        return False
+    return not candidate.duration_sec or candidate.duration_sec <= filters.max_duration_minutes * 60
+
+
 def score_candidate(candidate: VideoCandidate, query_terms: str, filters: FilterOptions) -> MetadataScore:
     title_relevance = 4.0 * keyword_overlap_score(candidate.title, query_terms)
     description_relevance = 2.0 * keyword_overlap_score(candidate.description, query_terms)
@@ -100,7 +110,7 @@ def _duration_fit_score(duration_sec: int | None, max_duration_minutes: int) ->
 def _language_match_score(candidate_language: str | None, requested_language: str) -> float:
     if not candidate_language:
         return 0.25
-    if candidate_language.lower().startswith(requested_language.lower()):
+    if language_matches(candidate_language, requested_language):
         return 1.5
     return -0.2
 
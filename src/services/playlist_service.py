@@ -1,160 +1,741 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
+from typing import Any, Callable, Generator, Hashable, Iterator, TypeVar
 from uuid import uuid4
 
 from src.config import AppConfig
 from src.models import (
     ExportArtifacts,
+    MetadataScore,
     PlaylistRequest,
     PlaylistResult,
     ProgressEvent,
     Recommendation,
+    Subtopic,
     SubtopicResult,
     TranscriptResult,
+    VideoCandidate,
+    now_utc_iso,
 )
 from src.providers import GeminiLLMProvider
-from src.services.metadata_ranker import rank_candidates
+from src.providers.async_providers import as_async_llm_provider
+from src.providers.youtube_data_api_provider import YouTubeDataAPIProvider
+from src.providers.youtube_quota import SEARCH_UNITS, VIDEOS_LIST_UNITS, shared_data_api_quota
+from src.services.cache_refresh import shared_cache_refresher
+from src.services.details_batcher import DetailsBatcher
+from src.services.fetch_memo import FetchMemo
+from src.services.metadata_ranker import RANKER_VERSION, meets_hard_filters, rank_candidates
 from src.services.playlist_publish_service import create_youtube_playlist
-from src.services.recommendation_service import select_recommendation
-from src.services.topic_service import generate_subtopics
-from src.services.transcript_service import RunTranscriptState, get_transcript
-from src.services.youtube_search_service import search_candidates
-from src.storage import SQLiteStore
+from src.services.recommendation_service import pick_candidate, select_recommendation
+from src.services.topic_service import generate_subtopics, generate_subtopics_async
+from src.services.transcript_service import RunTranscriptState, get_transcript, get_transcript_async
+from src.services.youtube_search_service import (
+    details_batcher,
+    search_candidates,
+    search_candidates_async,
+    search_more_candidates,
+)
+from src.storage import RunCheckpoint, SQLiteStore
 from src.utils.logging_utils import run_log_path, setup_logger
+from src.utils.text_utils import canonicalize_query
+
+T = TypeVar("T")
+
+
+@dataclass
+class PipelineResources:
+    # Long-lived objects shared by many runs, e.g. a batch: one store, one LLM client and, optionally, a memo that
+    # deduplicates identical subtopic, search and transcript lookups across runs.
+    store: SQLiteStore
+    llm: Any = None
+    fetches: FetchMemo | None = None
+
+
+def build_playlist(
+    config: AppConfig,
+    request: PlaylistRequest,
+    progress_callback=None,
+    resume_run_id: str | None = None,
+    resources: PipelineResources | None = None,
+    force_refresh: bool = False,
+) -> PlaylistResult:
+    result = None
+    for item in iter_playlist(
+        config,
+        request,
+        progress_callback=progress_callback,
+        resume_run_id=resume_run_id,
+        resources=resources,
+        force_refresh=force_refresh,
+    ):
+        result = item
+    return result
+
+
+def iter_playlist(
+    config: AppConfig,
+    request: PlaylistRequest,
+    progress_callback=None,
+    resume_run_id: str | None = None,
+    resources: PipelineResources | None = None,
+    force_refresh: bool = False,
+) -> Iterator[SubtopicResult | Recommendation | PlaylistResult]:
+    # Yields each subtopic's SubtopicResult (and Recommendation, if any) as soon as it is decided, then the final
+    # PlaylistResult once publishing and export are done.
+    run = _start_run(config, request, progress_callback, resume_run_id, resources, force_refresh)
+    if run.reused_result is not None:
+        result = _reuse_result(run, run.reused_result)
+        for subtopic_result, recommendation in _result_items(result):
+            yield subtopic_result
+            if recommendation is not None:
+                yield recommendation
+    else:
+        result = yield from _select_playlist(config, request, run, resources)
+
+    if request.create_youtube_playlist:
+        try:
+            result.published_playlist_url = create_youtube_playlist(config, result, logger=run.logger)
+        except Exception as exc:
+            result.warnings.append(f"YouTube playlist creation failed: {exc}")
+    yield _complete_run(config, run, result)
+
+
+def _select_playlist(
+    config: AppConfig,
+    request: PlaylistRequest,
+    run: _Run,
+    resources: PipelineResources | None,
+) -> Generator[SubtopicResult | Recommendation, None, PlaylistResult]:
+    run.emit("topic_planning", "Generating subtopics", 0.05)
+    if run.checkpoint is not None and run.checkpoint.subtopics is not None:
+        subtopics = run.checkpoint.subtopics
+    else:
+        llm = resources.llm if resources is not None and resources.llm is not None else GeminiLLMProvider(config)
+        subtopics = run.fetch(
+            "subtopics",
+            (request.topic, request.filters.language),
+            lambda: generate_subtopics(llm, request.topic, request.filters.language, logger=run.logger),
+        )
+        run.store.set_run_subtopics(run.run_id, subtopics)
+
+    transcript_state = RunTranscriptState.from_config(config)
+
+    def fetch_transcript(candidate: VideoCandidate) -> TranscriptResult:
+        transcript = run.fetch(
+            "transcript",
+            candidate.video_id,
+            lambda: get_transcript(config, run.store, candidate, str(run.run_dir), transcript_state, logger=run.logger),
+        )
+        run.store.add_run_video(run.run_id, "transcript", candidate.video_id, transcript.model_dump())
+        return transcript
+
+    transcript_memo = _TranscriptMemo(fetch_transcript, max_workers=config.transcript_workers)
+    selection = _Selection(config, run, request)
+    try:
+        if run.checkpoint is not None:
+            transcript_memo.seed(run.checkpoint.transcripts)
+            for subtopic_result, recommendation in selection.restore(run.checkpoint):
+                yield subtopic_result
+                if recommendation is not None:
+                    yield recommendation
+        remaining = subtopics[selection.completed :]
+        _report_quota_shortfall(config, run, len(remaining))
+        if config.subtopic_workers > 1 and len(remaining) > 1:
+            if YouTubeDataAPIProvider(config).is_configured():
+                # Subtopics searching at the same time pool their Data API detail lookups into shared batches.
+                run.details = details_batcher(config, run.store, logger=run.logger)
+            prepared = _prepare_subtopics_parallel(config, run, request, remaining, transcript_memo, selection)
+        else:
+            prepared = _prepare_subtopics_serial(config, run, request, remaining, transcript_memo, selection)
+        for work in prepared:
+            while _needs_more_candidates(config, request, work, selection.used_video_ids):
+                more = _fetch_next_page(config, run, request, work)
+                work = _extend_pool(config, request, work, more, selection.used_video_ids)
+                targets = _transcript_targets(config, work.shortlisted, selection.used_video_ids)
+                work.transcripts.update(transcript_memo.get_many(targets))
+            missing = selection.missing_transcript(work)
+            if missing is not None:
+                work.transcripts.update(transcript_memo.get_many([missing]))
+            subtopic_result, recommendation = selection.add(work)
+            yield subtopic_result
+            if recommendation is not None:
+                yield recommendation
+    finally:
+        transcript_memo.close()
+    return selection.finish()
+
+
+async def build_playlist_async(
+    config: AppConfig,
+    request: PlaylistRequest,
+    progress_callback=None,
+    resume_run_id: str | None = None,
+    force_refresh: bool = False,
+) -> PlaylistResult:
+    # Same pipeline as build_playlist, but subtopics and shortlisted transcripts overlap on the event loop; only
+    # blocking libraries (requests, yt-dlp, youtube-transcript-api, ASR) are pushed to worker threads.
+    run = _start_run(config, request, progress_callback, resume_run_id, force_refresh=force_refresh)
+    if run.reused_result is not None:
+        result = _reuse_result(run, run.reused_result)
+    else:
+        result = await _select_playlist_async(config, request, run)
+    if request.create_youtube_playlist:
+        try:
+            result.published_playlist_url = await asyncio.to_thread(
+                create_youtube_playlist, config, result, logger=run.logger
+            )
+        except Exception as exc:
+            result.warnings.append(f"YouTube playlist creation failed: {exc}")
+    return _complete_run(config, run, result)
+
+
+async def _select_playlist_async(config: AppConfig, request: PlaylistRequest, run: _Run) -> PlaylistResult:
+    run.emit("topic_planning", "Generating subtopics", 0.05)
+    if run.checkpoint is not None and run.checkpoint.subtopics is not None:
+        subtopics = run.checkpoint.subtopics
+    else:
+        llm = as_async_llm_provider(GeminiLLMProvider(config))
+        subtopics = await generate_subtopics_async(llm, request.topic, request.filters.language, logger=run.logger)
+        run.store.set_run_subtopics(run.run_id, subtopics)
+
+    transcript_state = RunTranscriptState.from_config(config)
+    transcript_tasks: dict[str, asyncio.Future] = {}
+    selection = _Selection(config, run, request)
+    if run.checkpoint is not None:
+        for video_id, transcript in run.checkpoint.transcripts.items():
+            transcript_tasks[video_id] = asyncio.get_running_loop().create_future()
+            transcript_tasks[video_id].set_result(transcript)
+        selection.restore(run.checkpoint)
+    remaining = subtopics[selection.completed :]
+    _report_quota_shortfall(config, run, len(remaining))
+    progress = _StageProgress(run.emit, len(remaining))
+
+    async def fetch_transcript(candidate: VideoCandidate) -> TranscriptResult:
+        transcript = await get_transcript_async(
+            config, run.store, candidate, str(run.run_dir), transcript_state, logger=run.logger
+        )
+        run.store.add_run_video(run.run_id, "transcript", candidate.video_id, transcript.model_dump())
+        return transcript
+
+    async def prepare(subtopic: Subtopic) -> _PreparedSubtopic:
+        query = _subtopic_query(request, subtopic)
+        progress.reached("candidate_search", f"Searching candidates for {subtopic.title}")
+        candidates = await search_candidates_async(config, run.store, query, request.filters, logger=run.logger)
+
+        progress.reached("metadata_ranking", f"Ranking metadata for {subtopic.title}")
+        ranked = rank_candidates(candidates, request.topic, subtopic.title, request.filters)
+        shortlisted = ranked[: config.metadata_top_k]
+
+        progress.reached("transcript_enrichment", f"Enriching top candidates for {subtopic.title}")
+        targets = _transcript_targets(config, shortlisted, selection.used_video_ids)
+        return _PreparedSubtopic(subtopic, query, candidates, shortlisted, await enrich(targets))
+
+    async def enrich(targets: list[VideoCandidate]) -> dict[str, TranscriptResult]:
+        for candidate in targets:
+            if candidate.video_id not in transcript_tasks:
+                transcript_tasks[candidate.video_id] = asyncio.ensure_future(fetch_transcript(candidate))
+        results = await asyncio.gather(*(transcript_tasks[candidate.video_id] for candidate in targets))
+        return {candidate.video_id: result for candidate, result in zip(targets, results)}
+
+    for work in await asyncio.gather(*(prepare(subtopic) for subtopic in remaining)):
+        while _needs_more_candidates(config, request, work, selection.used_video_ids):
+            more = await asyncio.to_thread(_fetch_next_page, config, run, request, work)
+            work = _extend_pool(config, request, work, more, selection.used_video_ids)
+            targets = _transcript_targets(config, work.shortlisted, selection.used_video_ids)
+            work.transcripts.update(await enrich(targets))
+        missing = selection.missing_transcript(work)
+        if missing is not None:
+            work.transcripts.update(await enrich([missing]))
+        selection.add(work)
+    return selection.finish()
 
 
-def build_playlist(config: AppConfig, request: PlaylistRequest, progress_callback=None) -> PlaylistResult:
+_STAGE_BASE = {"candidate_search": 0.1, "metadata_ranking": 0.32, "transcript_enrichment": 0.54}
+
+
+@dataclass
+class _Run:
+    run_id: str
+    run_dir: Path
+    store: SQLiteStore
+    logger: Any
+    emit: Callable[..., None]
+    checkpoint: RunCheckpoint | None = None
+    fetches: FetchMemo | None = None
+    reused_result: PlaylistResult | None = None
+    details: DetailsBatcher | None = None
+
+    def fetch(self, kind: str, key: Hashable, fetch: Callable[[], T]) -> T:
+        return fetch() if self.fetches is None else self.fetches.get(kind, key, fetch)
+
+
+@dataclass
+class _PreparedSubtopic:
+    subtopic: Subtopic
+    query: str
+    candidates: list[VideoCandidate]
+    shortlisted: list[tuple[VideoCandidate, MetadataScore]]
+    transcripts: dict[str, TranscriptResult]
+    pages: int = 1
+
+
+def _start_run(
+    config: AppConfig,
+    request: PlaylistRequest,
+    progress_callback=None,
+    resume_run_id: str | None = None,
+    resources: PipelineResources | None = None,
+    force_refresh: bool = False,
+) -> _Run:
     if os.name == "nt" and config.allow_unsafe_openmp_workaround:
         os.environ.setdefault("KMP_DUPLICATE_LIB_OK", "TRUE")
 
-    run_id = uuid4().hex
+    store = resources.store if resources is not None else SQLiteStore.from_config(config)
+    checkpoint = None
+    if resume_run_id:
+        checkpoint = store.load_run_checkpoint(resume_run_id)
+        if checkpoint is None:
+            raise ValueError(f"Run {resume_run_id} was not found in the run journal")
+        if checkpoint.topic != request.topic or checkpoint.filters != request.filters.model_dump():
+            raise ValueError(f"Run {resume_run_id} was started for a different topic or filters")
+    run_id = resume_run_id or uuid4().hex
     run_dir = config.runs_dir / run_id
     run_dir.mkdir(parents=True, exist_ok=True)
 
-    store = SQLiteStore(config.sqlite_path)
     logger = setup_logger("playlist", run_log_path(str(run_dir)))
-    store.create_run(run_id, request.topic, request.filters.model_dump())
+    store.maybe_run_maintenance(config, logger=logger)
+    reused_result = None
+    request_key = _request_key(config, request)
+    if checkpoint is None and not force_refresh and config.result_cache_ttl_sec > 0:
+        reused_result = store.get_recent_run_result(request_key, config.result_cache_ttl_sec)
+    if checkpoint is None:
+        # Only computed runs carry the request key, so reusing a result never extends how long it can be reused.
+        store.create_run(
+            run_id,
+            request.topic,
+            request.filters.model_dump(),
+            request_key=None if reused_result is not None else request_key,
+        )
+    else:
+        logger.info("Resuming run %s after %s completed subtopics", run_id, len(checkpoint.completed))
 
     def emit(stage: str, message: str, progress: float, current: int | None = None, total: int | None = None) -> None:
         if progress_callback:
             progress_callback(
-                ProgressEvent(stage=stage, message=message, progress=progress, current=current, total=total)
+                ProgressEvent(
+                    stage=stage, message=message, progress=progress, current=current, total=total, run_id=run_id
+                )
             )
 
-    emit("topic_planning", "Generating subtopics", 0.05)
-    llm = GeminiLLMProvider(config)
-    subtopics = generate_subtopics(llm, request.topic, request.filters.language, logger=logger)
+    return _Run(
+        run_id=run_id,
+        run_dir=run_dir,
+        store=store,
+        logger=logger,
+        emit=emit,
+        checkpoint=checkpoint,
+        fetches=resources.fetches if resources is not None else None,
+        reused_result=reused_result,
+    )
 
-    transcript_state = RunTranscriptState()
-    transcript_results_by_video: dict[str, TranscriptResult] = {}
-    recommendations: list[Recommendation] = []
-    subtopic_results: list[SubtopicResult] = []
-    warnings: list[str] = []
-    used_video_ids: set[str] = set()
 
-    total_subtopics = len(subtopics) or 1
-    for index, subtopic in enumerate(subtopics, start=1):
-        query = f"{request.topic} {subtopic.title}"
-        emit(
-            "candidate_search",
-            f"Searching candidates for {subtopic.title}",
-            0.1 + ((index - 1) / total_subtopics) * 0.22,
-            index,
-            total_subtopics,
-        )
-        candidates = search_candidates(config, store, query, request.filters, logger=logger)
-
-        emit(
-            "metadata_ranking",
-            f"Ranking metadata for {subtopic.title}",
-            0.32 + ((index - 1) / total_subtopics) * 0.22,
-            index,
-            total_subtopics,
-        )
-        ranked = rank_candidates(candidates, request.topic, subtopic.title, request.filters)
-        shortlisted = ranked[: config.metadata_top_k]
+def _request_key(config: AppConfig, request: PlaylistRequest) -> str:
+    # Everything that changes the selected videos: the normalized request, the subtopic model and the ranking setup.
+    payload = {
+        "topic": canonicalize_query(request.topic),
+        "filters": request.filters.model_dump(),
+        "llm_model": config.gemini_model,
+        "ranker_version": RANKER_VERSION,
+        "search_candidates_per_subtopic": config.search_candidates_per_subtopic,
+        "search_max_pages": config.search_max_pages,
+        "metadata_top_k": config.metadata_top_k,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
 
-        transcripts: dict[str, TranscriptResult] = {}
-        emit(
-            "transcript_enrichment",
-            f"Enriching top candidates for {subtopic.title}",
-            0.54 + ((index - 1) / total_subtopics) * 0.22,
-            index,
-            total_subtopics,
-        )
-        for candidate, _metadata_score in shortlisted:
-            if candidate.video_id not in transcript_results_by_video:
-                transcript_results_by_video[candidate.video_id] = get_transcript(
-                    config,
-                    store,
-                    candidate,
-                    str(run_dir),
-                    transcript_state,
-                    logger=logger,
-                )
-                store.add_run_video(
-                    run_id,
-                    "transcript",
-                    candidate.video_id,
-                    transcript_results_by_video[candidate.video_id].model_dump(),
+
+def _reuse_result(run: _Run, cached: PlaylistResult) -> PlaylistResult:
+    run.logger.info("Reusing the result of run %s", cached.run_id)
+    run.emit("final_playlist_assembly", "Reusing a recent playlist for the same request", 0.9)
+    result = cached.model_copy(
+        update={
+            "run_id": run.run_id,
+            "created_at": now_utc_iso(),
+            "exports": None,
+            "published_playlist_url": None,
+            "reused_from_run_id": cached.run_id,
+        }
+    )
+    # Journal the reused selections so the new run reads like any other.
+    run.store.set_run_subtopics(run.run_id, [item.subtopic for item in result.subtopics])
+    for index, (subtopic_result, recommendation) in enumerate(_result_items(result), start=1):
+        if recommendation is not None:
+            run.store.add_run_video(
+                run.run_id, "recommendation", recommendation.video.video_id, recommendation.model_dump()
+            )
+        run.store.add_run_subtopic(run.run_id, index, subtopic_result.model_dump())
+    return result
+
+
+def _result_items(result: PlaylistResult) -> list[tuple[SubtopicResult, Recommendation | None]]:
+    recommendations = {recommendation.video.video_id: recommendation for recommendation in result.recommendations}
+    return [(item, recommendations.get(item.selected_video_id)) for item in result.subtopics]
+
+
+class _Selection:
+    # Deduplication depends on which videos earlier subtopics took, so subtopics must be added in order.
+    def __init__(self, config: AppConfig, run: _Run, request: PlaylistRequest):
+        self._config = config
+        self._run = run
+        self._request = request
+        self._recommendations: list[Recommendation] = []
+        self._subtopic_results: list[SubtopicResult] = []
+        self._warnings: list[str] = []
+        self.used_video_ids: set[str] = set()
+
+    @property
+    def completed(self) -> int:
+        return len(self._subtopic_results)
+
+    def restore(self, checkpoint: RunCheckpoint) -> list[tuple[SubtopicResult, Recommendation | None]]:
+        # Replays subtopics already selected (and journaled) by an interrupted run of the same request.
+        for subtopic_result, recommendation in checkpoint.completed:
+            self._subtopic_results.append(subtopic_result)
+            if recommendation is None:
+                self._warnings.append(
+                    f"No unique recommendation found for subtopic '{subtopic_result.subtopic.title}'."
                 )
-            transcript = transcript_results_by_video[candidate.video_id]
-            transcripts[candidate.video_id] = transcript
+            else:
+                self._recommendations.append(recommendation)
+                self.used_video_ids.add(recommendation.video.video_id)
+        return checkpoint.completed
 
-        recommendation = select_recommendation(subtopic.title, shortlisted, transcripts, used_video_ids, index)
+    def missing_transcript(self, work: _PreparedSubtopic) -> VideoCandidate | None:
+        # Lazy enrichment guesses the pick before earlier subtopics are decided; fetch the real one if it differs.
+        if self._config.transcript_enrichment_mode != "lazy":
+            return None
+        picked = pick_candidate(work.shortlisted, self.used_video_ids)
+        if picked is None or picked[0].video_id in work.transcripts:
+            return None
+        return picked[0]
+
+    def add(self, work: _PreparedSubtopic) -> tuple[SubtopicResult, Recommendation | None]:
+        run = self._run
+        index = len(self._subtopic_results) + 1
+        subtopic = work.subtopic
+        shortlisted = work.shortlisted
+        recommendation = select_recommendation(
+            subtopic.title, shortlisted, work.transcripts, self.used_video_ids, index
+        )
         if recommendation is None:
-            warnings.append(f"No unique recommendation found for subtopic '{subtopic.title}'.")
+            self._warnings.append(f"No unique recommendation found for subtopic '{subtopic.title}'.")
             subtopic_result = SubtopicResult(
                 subtopic=subtopic,
-                query=query,
-                candidates_considered=len(candidates),
+                query=work.query,
+                candidates_considered=len(work.candidates),
                 shortlisted_candidates=[candidate for candidate, _score in shortlisted],
                 selected_video_id=None,
                 transcript_status="unavailable",
                 notes=["No unique candidate survived ranking and deduplication."],
             )
         else:
-            recommendations.append(recommendation)
+            self._recommendations.append(recommendation)
             subtopic_result = SubtopicResult(
                 subtopic=subtopic,
-                query=query,
-                candidates_considered=len(candidates),
+                query=work.query,
+                candidates_considered=len(work.candidates),
                 shortlisted_candidates=[candidate for candidate, _score in shortlisted],
                 selected_video_id=recommendation.video.video_id,
                 transcript_status=recommendation.transcript_status,
                 notes=[recommendation.why_selected],
             )
-            store.add_run_video(run_id, "recommendation", recommendation.video.video_id, recommendation.model_dump())
-        subtopic_results.append(subtopic_result)
-        store.add_run_subtopic(run_id, index, subtopic_result.model_dump())
+            run.store.add_run_video(
+                run.run_id, "recommendation", recommendation.video.video_id, recommendation.model_dump()
+            )
+        self._subtopic_results.append(subtopic_result)
+        run.store.add_run_subtopic(run.run_id, index, subtopic_result.model_dump())
+        # Each selected subtopic is a checkpoint: make it durable before the caller moves on.
+        run.store.flush_journal()
+        return subtopic_result, recommendation
 
-    emit("final_playlist_assembly", "Assembling final playlist", 0.9)
-    result = PlaylistResult(
-        run_id=run_id,
-        topic=request.topic,
-        filters=request.filters,
-        subtopics=subtopic_results,
-        recommendations=recommendations,
-        warnings=warnings,
-    )
+    def finish(self) -> PlaylistResult:
+        self._run.emit("final_playlist_assembly", "Assembling final playlist", 0.9)
+        return PlaylistResult(
+            run_id=self._run.run_id,
+            topic=self._request.topic,
+            filters=self._request.filters,
+            subtopics=self._subtopic_results,
+            recommendations=self._recommendations,
+            warnings=self._warnings,
+        )
 
-    if request.create_youtube_playlist:
-        try:
-            result.published_playlist_url = create_youtube_playlist(config, result, logger=logger)
-        except Exception as exc:
-            warnings.append(f"YouTube playlist creation failed: {exc}")
 
-    exports = export_playlist_artifacts(run_dir, result)
+def _complete_run(config: AppConfig, run: _Run, result: PlaylistResult) -> PlaylistResult:
+    exports = export_playlist_artifacts(run.run_dir, result)
     result.exports = exports
 
-    store.finalize_run(run_id, result)
-    emit("done", "Playlist created", 1.0)
+    run.store.finalize_run(run.run_id, result)
+    logger = run.logger
+    for table, stats in run.store.cache_stats().items():
+        logger.info("Memory cache %s: %s hits, %s misses", table, stats.hits, stats.misses)
+    for table, stats in shared_cache_refresher(config.cache_refresh_workers).stats().items():
+        logger.info(
+            "Stale %s: %s served, %s refreshes scheduled, %s deduplicated, %s failed",
+            table,
+            stats.stale_served,
+            stats.scheduled,
+            stats.deduplicated,
+            stats.failed,
+        )
+    run.emit("done", "Playlist created", 1.0)
     return result
 
 
+class _StageProgress:
+    # Completion-ordered progress for concurrent subtopics: monotonic overall, with per-stage current/total.
+    def __init__(self, emit: Callable[..., None], total: int):
+        self._emit = emit
+        self._total = total or 1
+        self._reached = {stage: 0 for stage in _STAGE_BASE}
+
+    def reached(self, stage: str, message: str) -> None:
+        self._reached[stage] += 1
+        progress = 0.1 + (sum(self._reached.values()) - 1) / (self._total * len(_STAGE_BASE)) * 0.66
+        self._emit(stage, message, progress, self._reached[stage], self._total)
+
+
+class _TranscriptMemo:
+    # One transcript lookup per video per run; concurrent callers for the same video wait on the first one.
+    def __init__(self, fetch: Callable[[VideoCandidate], TranscriptResult], max_workers: int = 1):
+        self._fetch = fetch
+        self._futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcript") if max_workers > 1 else None
+        )
+
+    def seed(self, transcripts: dict[str, TranscriptResult]) -> None:
+        with self._lock:
+            for video_id, transcript in transcripts.items():
+                future = Future()
+                future.set_result(transcript)
+                self._futures.setdefault(video_id, future)
+
+    def get(self, candidate: VideoCandidate) -> TranscriptResult:
+        with self._lock:
+            future = self._futures.get(candidate.video_id)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[candidate.video_id] = future
+        if owner:
+            try:
+                future.set_result(self._fetch(candidate))
+            except BaseException as exc:
+                future.set_exception(exc)
+        return future.result()
+
+    def get_many(self, candidates: list[VideoCandidate]) -> dict[str, TranscriptResult]:
+        # Shortlisted videos are fetched concurrently; per-provider limits live in RunTranscriptState.
+        if self._executor is None or len(candidates) <= 1:
+            return {candidate.video_id: self.get(candidate) for candidate in candidates}
+        futures = {candidate.video_id: self._executor.submit(self.get, candidate) for candidate in candidates}
+        return {video_id: future.result() for video_id, future in futures.items()}
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+def _subtopic_query(request: PlaylistRequest, subtopic: Subtopic) -> str:
+    return f"{request.topic} {subtopic.title}"
+
+
+def _report_quota_shortfall(config: AppConfig, run: _Run, subtopic_count: int) -> None:
+    # Upper bound: cached and local-index searches spend nothing.
+    if not subtopic_count or not YouTubeDataAPIProvider(config).is_configured():
+        return
+    needed = subtopic_count * (SEARCH_UNITS + VIDEOS_LIST_UNITS)
+    left = shared_data_api_quota(config).remaining(interactive=config.run_priority == "interactive")
+    if left < needed:
+        message = (
+            f"YouTube Data API quota low: {left} units left today, up to {needed} needed; "
+            "searches beyond that use yt-dlp"
+        )
+        run.logger.warning(message)
+        run.emit("candidate_search", message, _STAGE_BASE["candidate_search"])
+
+
+def _prepare_subtopic(
+    config: AppConfig,
+    run: _Run,
+    request: PlaylistRequest,
+    subtopic: Subtopic,
+    transcript_memo: _TranscriptMemo,
+    used_video_ids: set[str],
+    on_stage: Callable[[str, str], None],
+) -> _PreparedSubtopic:
+    query = _subtopic_query(request, subtopic)
+    on_stage("candidate_search", f"Searching candidates for {subtopic.title}")
+
+    def search() -> list[VideoCandidate]:
+        if run.details is None:
+            return search_candidates(config, run.store, query, request.filters, logger=run.logger)
+        # Counted only while searching, so a batched detail lookup never waits on ranking or transcripts.
+        run.details.enter()
+        try:
+            return search_candidates(config, run.store, query, request.filters, logger=run.logger, details=run.details)
+        finally:
+            run.details.leave()
+
+    candidates = run.fetch("search", (canonicalize_query(query), request.filters.model_dump_json()), search)
+
+    on_stage("metadata_ranking", f"Ranking metadata for {subtopic.title}")
+    ranked = rank_candidates(candidates, request.topic, subtopic.title, request.filters)
+    shortlisted = ranked[: config.metadata_top_k]
+
+    on_stage("transcript_enrichment", f"Enriching top candidates for {subtopic.title}")
+    transcripts = transcript_memo.get_many(_transcript_targets(config, shortlisted, used_video_ids))
+    return _PreparedSubtopic(subtopic, query, candidates, shortlisted, transcripts)
+
+
+def _needs_more_candidates(
+    config: AppConfig,
+    request: PlaylistRequest,
+    work: _PreparedSubtopic,
+    used_video_ids: set[str],
+) -> bool:
+    # The next page is fetched only once earlier subtopics took every shortlisted video that meets the filters.
+    if work.pages >= config.search_max_pages:
+        return False
+    return not any(
+        candidate.video_id not in used_video_ids and meets_hard_filters(candidate, request.filters)
+        for candidate, _score in work.shortlisted
+    )
+
+
+def _fetch_next_page(
+    config: AppConfig,
+    run: _Run,
+    request: PlaylistRequest,
+    work: _PreparedSubtopic,
+) -> list[VideoCandidate]:
+    page = work.pages + 1
+    return run.fetch(
+        "search",
+        (canonicalize_query(work.query), request.filters.model_dump_json(), page),
+        lambda: search_more_candidates(config, run.store, work.query, request.filters, page, logger=run.logger),
+    )
+
+
+def _extend_pool(
+    config: AppConfig,
+    request: PlaylistRequest,
+    work: _PreparedSubtopic,
+    more: list[VideoCandidate],
+    used_video_ids: set[str],
+) -> _PreparedSubtopic:
+    if not more:
+        return replace(work, pages=config.search_max_pages)
+    known = {candidate.video_id for candidate in work.candidates}
+    candidates = work.candidates + [candidate for candidate in more if candidate.video_id not in known]
+    ranked = rank_candidates(candidates, request.topic, work.subtopic.title, request.filters)
+    # Re-shortlist the whole pool without the videos earlier subtopics already took.
+    shortlisted = [item for item in ranked if item[0].video_id not in used_video_ids][: config.metadata_top_k]
+    return replace(work, candidates=candidates, shortlisted=shortlisted, pages=work.pages + 1)
+
+
+def _transcript_targets(
+    config: AppConfig,
+    shortlisted: list[tuple[VideoCandidate, MetadataScore]],
+    used_video_ids: set[str],
+) -> list[VideoCandidate]:
+    if config.transcript_enrichment_mode == "lazy":
+        # Only the pick's transcript affects the result. used_video_ids may still grow while other subtopics are
+        # selected, in which case the selection step fetches the transcript for the actual pick.
+        picked = pick_candidate(shortlisted, used_video_ids)
+        return [picked[0]] if picked else []
+    return [candidate for candidate, _metadata_score in shortlisted]
+
+
+def _prepare_subtopics_serial(
+    config: AppConfig,
+    run: _Run,
+    request: PlaylistRequest,
+    subtopics: list[Subtopic],
+    transcript_memo: _TranscriptMemo,
+    selection: _Selection,
+) -> Iterator[_PreparedSubtopic]:
+    total_subtopics = len(subtopics) or 1
+    for index, subtopic in enumerate(subtopics, start=1):
+
+        def on_stage(stage: str, message: str, index: int = index) -> None:
+            progress = _STAGE_BASE[stage] + ((index - 1) / total_subtopics) * 0.22
+            run.emit(stage, message, progress, index, total_subtopics)
+
+        yield _prepare_subtopic(
+            config, run, request, subtopic, transcript_memo, selection.used_video_ids, on_stage
+        )
+
+
+def _prepare_subtopics_parallel(
+    config: AppConfig,
+    run: _Run,
+    request: PlaylistRequest,
+    subtopics: list[Subtopic],
+    transcript_memo: _TranscriptMemo,
+    selection: _Selection,
+) -> Iterator[_PreparedSubtopic]:
+    # Workers only queue their stage changes; progress callbacks (e.g. Streamlit widgets) stay on this thread.
+    # Subtopics are yielded in order as soon as they and every earlier subtopic are ready.
+    stage_events: queue.Queue[tuple[str, str]] = queue.Queue()
+    progress = _StageProgress(run.emit, len(subtopics))
+
+    def drain(timeout: float | None) -> None:
+        try:
+            stage, message = stage_events.get(timeout=timeout)
+        except queue.Empty:
+            return
+        while True:
+            progress.reached(stage, message)
+            try:
+                stage, message = stage_events.get_nowait()
+            except queue.Empty:
+                return
+
+    executor = ThreadPoolExecutor(max_workers=config.subtopic_workers, thread_name_prefix="subtopic")
+    try:
+        futures = [
+            executor.submit(
+                _prepare_subtopic,
+                config,
+                run,
+                request,
+                subtopic,
+                transcript_memo,
+                selection.used_video_ids,
+                lambda stage, message: stage_events.put((stage, message)),
+            )
+            for subtopic in subtopics
+        ]
+        for future in futures:
+            while not future.done():
+                drain(timeout=0.05)
+            drain(timeout=0)
+            yield future.result()
+    finally:
+        # A consumer that stops early should not wait for subtopics that have not started yet.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
 def export_playlist_artifacts(run_dir: Path, result: PlaylistResult) -> ExportArtifacts:
     json_path = run_dir / "result.json"
     markdown_path = run_dir / "study_plan.md"
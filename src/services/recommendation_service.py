@@ -11,29 +11,41 @@ def select_recommendation(
     used_video_ids: set[str],
     position: int,
 ) -> Recommendation | None:
+    picked = pick_candidate(ranked_candidates, used_video_ids)
+    if picked is None:
+        return None
+    candidate, metadata_score = picked
+    transcript = transcripts.get(candidate.video_id)
+    transcript_bonus, transcript_reason = _transcript_bonus(transcript, subtopic)
+    confidence = round(min(10.0, metadata_score.total + transcript_bonus), 2)
+    why_parts = metadata_score.rationale[:]
+    if transcript_reason:
+        why_parts.append(transcript_reason)
+    if not why_parts:
+        why_parts.append("selected as the strongest available metadata match")
+    used_video_ids.add(candidate.video_id)
+    return Recommendation(
+        position=position,
+        subtopic=subtopic,
+        video=candidate,
+        why_selected="; ".join(why_parts),
+        confidence_score=confidence,
+        transcript_status=transcript.status if transcript else "unavailable",
+        transcript_source=transcript.source if transcript else None,
+        transcript_backend=transcript.backend if transcript else None,
+        metadata_score=metadata_score,
+    )
+
+
+def pick_candidate(
+    ranked_candidates: list[tuple[VideoCandidate, MetadataScore]],
+    used_video_ids: set[str],
+) -> tuple[VideoCandidate, MetadataScore] | None:
+    # Selection is metadata-first: the best-ranked unused candidate wins, and its transcript only adjusts confidence
+    # and the stated reason, so no other shortlisted transcript can change the pick.
     for candidate, metadata_score in ranked_candidates:
-        if candidate.video_id in used_video_ids:
-            continue
-        transcript = transcripts.get(candidate.video_id)
-        transcript_bonus, transcript_reason = _transcript_bonus(transcript, subtopic)
-        confidence = round(min(10.0, metadata_score.total + transcript_bonus), 2)
-        why_parts = metadata_score.rationale[:]
-        if transcript_reason:
-            why_parts.append(transcript_reason)
-        if not why_parts:
-            why_parts.append("selected as the strongest available metadata match")
-        used_video_ids.add(candidate.video_id)
-        return Recommendation(
-            position=position,
-            subtopic=subtopic,
-            video=candidate,
-            why_selected="; ".join(why_parts),
-            confidence_score=confidence,
-            transcript_status=transcript.status if transcript else "unavailable",
-            transcript_source=transcript.source if transcript else None,
-            transcript_backend=transcript.backend if transcript else None,
-            metadata_score=metadata_score,
-        )
+        if candidate.video_id not in used_video_ids:
+            return candidate, metadata_score
     return None
 
 
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SearchHedger:
+    # Tracks how long the primary search provider takes, so the hedge fires at its p95: roughly one search in twenty
+    # pays for a second provider call. Until enough samples exist the configured delay is used.
+    def __init__(self, window: int = 200, min_samples: int = 20, max_workers: int = 8):
+        self.min_samples = min_samples
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._wins: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search-hedge")
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        return self._executor
+
+    def delay(self, default_sec: float) -> float:
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return default_sec
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def record_win(self, provider: str) -> None:
+        with self._lock:
+            self._wins[provider] += 1
+
+    def wins(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._wins)
+
+
+_shared_lock = threading.Lock()
+_shared_hedger: SearchHedger | None = None
+
+
+def shared_search_hedger() -> SearchHedger:
+    global _shared_hedger
+    with _shared_lock:
+        if _shared_hedger is None:
+            _shared_hedger = SearchHedger()
+        return _shared_hedger
@@ -3,8 +3,8 @@ from __future__ import annotations
 from difflib import SequenceMatcher
 
 from src.models import Subtopic
-from src.providers.llm_provider import LLMProvider
-from src.utils.retry_utils import retry_with_backoff
+from src.providers.llm_provider import AsyncLLMProvider, LLMProvider
+from src.utils.retry_utils import retry_with_backoff, retry_with_backoff_async
 from src.utils.text_utils import normalize_text, slugify_text
 
 
@@ -17,6 +17,27 @@ def generate_subtopics(provider: LLMProvider, topic: str, language: str, logger=
         base_delay=base_delay,
         logger=logger,
     )
+    return _normalize_subtopics(raw_items, logger=logger)
+
+
+async def generate_subtopics_async(
+    provider: AsyncLLMProvider,
+    topic: str,
+    language: str,
+    logger=None,
+) -> list[Subtopic]:
+    attempts = getattr(getattr(provider, "config", None), "retry_max_attempts", 3)
+    base_delay = getattr(getattr(provider, "config", None), "retry_base_delay_sec", 1.0)
+    raw_items = await retry_with_backoff_async(
+        lambda: provider.generate_subtopics_async(topic, language),
+        attempts=attempts,
+        base_delay=base_delay,
+        logger=logger,
+    )
+    return _normalize_subtopics(raw_items, logger=logger)
+
+
+def _normalize_subtopics(raw_items: list[str], logger=None) -> list[Subtopic]:
     results: list[Subtopic] = []
     for item in raw_items:
         title = normalize_text(item)
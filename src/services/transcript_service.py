@@ -1,23 +1,84 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
+from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
 
 from src.config import AppConfig
 from src.models import TranscriptResult, VideoCandidate
+from src.providers.async_providers import AsyncTranscriptProvider, ThreadedTranscriptProvider
 from src.providers.faster_whisper_provider import FasterWhisperProvider
 from src.providers.whisper_cpp_provider import WhisperCppProvider
 from src.providers.youtube_transcript_api_provider import YouTubeTranscriptAPIProvider
 from src.providers.ytdlp_provider import YtDlpProvider
 from src.storage import SQLiteStore
-from src.utils.retry_utils import retry_with_backoff
+from src.utils.retry_utils import retry_with_backoff, retry_with_backoff_async
+from src.utils.single_flight import SingleFlight
+
+# In-flight (video, provider) transcript fetches, shared by every run, thread and event loop in the process.
+_TRANSCRIPT_FLIGHTS = SingleFlight()
 
 
 @dataclass
 class RunTranscriptState:
     attempted_pairs: set[tuple[str, str]] = field(default_factory=set)
     downloaded_audio: dict[str, str] = field(default_factory=dict)
+    # Per-provider cap on concurrent fetches for the whole run; providers not listed are unbounded.
+    provider_limits: dict[str, int] = field(default_factory=dict)
+    cooled_down_providers: set[str] = field(default_factory=set)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _slots: dict[str, threading.BoundedSemaphore] = field(default_factory=dict, init=False, repr=False)
+    _async_slots: dict[str, asyncio.Semaphore] = field(default_factory=dict, init=False, repr=False)
+
+    @classmethod
+    def from_config(cls, config: AppConfig) -> "RunTranscriptState":
+        return cls(
+            provider_limits={
+                "youtube_transcript_api": config.transcript_api_concurrency,
+                "yt_dlp_subtitles": config.ytdlp_subtitle_concurrency,
+                "asr": config.asr_concurrency,
+            }
+        )
+
+    def claim_attempt(self, video_id: str, provider: str) -> bool:
+        with self._lock:
+            if (video_id, provider) in self.attempted_pairs:
+                return False
+            self.attempted_pairs.add((video_id, provider))
+            return True
+
+    def mark_cooldown(self, provider: str) -> None:
+        with self._lock:
+            self.cooled_down_providers.add(provider)
+
+    def in_cooldown(self, provider: str) -> bool:
+        with self._lock:
+            return provider in self.cooled_down_providers
+
+    @contextmanager
+    def provider_slot(self, provider: str):
+        limit = self.provider_limits.get(provider)
+        if not limit:
+            yield
+            return
+        with self._lock:
+            slot = self._slots.setdefault(provider, threading.BoundedSemaphore(limit))
+        with slot:
+            yield
+
+    @asynccontextmanager
+    async def async_provider_slot(self, provider: str):
+        limit = self.provider_limits.get(provider)
+        if not limit:
+            yield
+            return
+        with self._lock:
+            slot = self._async_slots.setdefault(provider, asyncio.Semaphore(limit))
+        async with slot:
+            yield
 
 
 def select_transcription_backend(config: AppConfig):
@@ -47,57 +108,140 @@ def get_transcript(
         ("yt_dlp_subtitles", lambda: _fetch_ytdlp_subtitles(config, candidate, logger)),
         ("asr", lambda: _fetch_asr_transcript(config, candidate, run_dir, state, logger)),
     ]
+    cached_results = store.get_transcript_cache_many([candidate.video_id], [name for name, _loader in providers])
+    cooldowns = store.get_provider_cooldowns()
     attempted: list[str] = []
     for provider_name, loader in providers:
         attempted.append(provider_name)
-        cached = store.get_transcript_cache(candidate.video_id, provider_name)
-        if cached is not None:
-            cached.attempted_providers = attempted.copy()
-            if cached.status == "available":
-                return cached
-            continue
-
-        if store.get_provider_cooldown(provider_name):
-            result = TranscriptResult(
-                video_id=candidate.video_id,
-                status="cooldown",
-                source=provider_name,
-                attempted_providers=attempted.copy(),
-            )
-            store.put_transcript_cache(result, config.failure_cache_ttl_sec)
-            continue
-
-        if (candidate.video_id, provider_name) in state.attempted_pairs:
-            continue
-        state.attempted_pairs.add((candidate.video_id, provider_name))
+        outcome = _resolve_without_fetch(
+            config, store, state, candidate, provider_name, cached_results, cooldowns, attempted
+        )
+        if outcome is _FETCH:
+            try:
+                result = _TRANSCRIPT_FLIGHTS.do(
+                    (store.db_path, candidate.video_id, provider_name),
+                    lambda: _fetch_in_provider_slot(config, state, provider_name, loader, logger),
+                )
+            except Exception as exc:
+                _record_failure(config, store, state, candidate, provider_name, attempted, exc)
+                continue
+            outcome = _record_result(config, store, candidate, provider_name, attempted, result)
+        if outcome is not None:
+            return outcome
+    return _unavailable_result(candidate, attempted)
 
-        try:
-            result = retry_with_backoff(
-                loader,
-                attempts=config.retry_max_attempts,
-                base_delay=config.retry_base_delay_sec,
-                logger=logger,
-                on_exception=(RuntimeError,),
-            )
-        except Exception as exc:
-            store.mark_provider_cooldown(provider_name, str(exc), config.provider_cooldown_sec)
-            result = TranscriptResult(
-                video_id=candidate.video_id,
-                status="failed_temporary",
-                source=provider_name,
-                error=str(exc),
-                attempted_providers=attempted.copy(),
-            )
-            store.put_transcript_cache(result, config.failure_cache_ttl_sec)
-            continue
-
-        result.attempted_providers = attempted.copy()
-        ttl = config.transcript_cache_ttl_sec if result.status == "available" else config.failure_cache_ttl_sec
-        store.put_transcript_cache(result, ttl)
-        if result.status == "available":
-            store.clear_provider_cooldown(provider_name)
-            return result
 
+async def get_transcript_async(
+    config: AppConfig,
+    store: SQLiteStore,
+    candidate: VideoCandidate,
+    run_dir: str,
+    state: RunTranscriptState,
+    logger=None,
+    providers: list[AsyncTranscriptProvider] | None = None,
+) -> TranscriptResult:
+    # Every transcript backend is a blocking library (or CPU-bound ASR), so each fetch runs on a worker thread.
+    if providers is None:
+        providers = [
+            ThreadedTranscriptProvider("youtube_transcript_api", lambda item: _fetch_youtube_transcript(item, logger)),
+            ThreadedTranscriptProvider("yt_dlp_subtitles", lambda item: _fetch_ytdlp_subtitles(config, item, logger)),
+            ThreadedTranscriptProvider("asr", lambda item: _fetch_asr_transcript(config, item, run_dir, state, logger)),
+        ]
+    cached_results = store.get_transcript_cache_many([candidate.video_id], [provider.name for provider in providers])
+    cooldowns = store.get_provider_cooldowns()
+    attempted: list[str] = []
+    for provider in providers:
+        attempted.append(provider.name)
+        outcome = _resolve_without_fetch(
+            config, store, state, candidate, provider.name, cached_results, cooldowns, attempted
+        )
+        if outcome is _FETCH:
+            try:
+                result = await _TRANSCRIPT_FLIGHTS.do_async(
+                    (store.db_path, candidate.video_id, provider.name),
+                    lambda provider=provider: _fetch_in_async_provider_slot(config, state, provider, candidate, logger),
+                )
+            except Exception as exc:
+                _record_failure(config, store, state, candidate, provider.name, attempted, exc)
+                continue
+            outcome = _record_result(config, store, candidate, provider.name, attempted, result)
+        if outcome is not None:
+            return outcome
+    return _unavailable_result(candidate, attempted)
+
+
+_FETCH = object()
+
+
+def _resolve_without_fetch(
+    config: AppConfig,
+    store: SQLiteStore,
+    state: RunTranscriptState,
+    candidate: VideoCandidate,
+    provider_name: str,
+    cached_results: dict[tuple[str, str], TranscriptResult],
+    cooldowns: dict[str, str],
+    attempted: list[str],
+):
+    # Returns a result to stop with, None to move on to the next provider, or _FETCH to call this one.
+    cached = cached_results.get((candidate.video_id, provider_name))
+    if cached is not None:
+        cached.attempted_providers = attempted.copy()
+        return cached if cached.status == "available" else None
+
+    if provider_name in cooldowns or state.in_cooldown(provider_name):
+        store.put_transcript_cache(_cooldown_result(candidate, provider_name, attempted), config.failure_cache_ttl_sec)
+        return None
+
+    if not state.claim_attempt(candidate.video_id, provider_name):
+        return None
+    return _FETCH
+
+
+def _record_failure(
+    config: AppConfig,
+    store: SQLiteStore,
+    state: RunTranscriptState,
+    candidate: VideoCandidate,
+    provider_name: str,
+    attempted: list[str],
+    exc: Exception,
+) -> None:
+    state.mark_cooldown(provider_name)
+    store.mark_provider_cooldown(provider_name, str(exc), config.provider_cooldown_sec)
+    result = TranscriptResult(
+        video_id=candidate.video_id,
+        status="failed_temporary",
+        source=provider_name,
+        error=str(exc),
+        attempted_providers=attempted.copy(),
+    )
+    store.put_transcript_cache(result, config.failure_cache_ttl_sec)
+
+
+def _record_result(
+    config: AppConfig,
+    store: SQLiteStore,
+    candidate: VideoCandidate,
+    provider_name: str,
+    attempted: list[str],
+    result: TranscriptResult | None,
+) -> TranscriptResult | None:
+    if result is None:
+        # The provider went into cooldown while this lookup waited for a slot.
+        store.put_transcript_cache(_cooldown_result(candidate, provider_name, attempted), config.failure_cache_ttl_sec)
+        return None
+    # Callers coalesced on one fetch share the result object, so each records its own copy.
+    result = result.model_copy(update={"attempted_providers": attempted.copy()})
+    ttl = config.transcript_cache_ttl_sec if result.status == "available" else config.failure_cache_ttl_sec
+    store.put_transcript_cache(result, ttl)
+    if result.status == "available":
+        store.clear_provider_cooldown(provider_name)
+        return result
+    return None
+
+
+def _unavailable_result(candidate: VideoCandidate, attempted: list[str]) -> TranscriptResult:
     return TranscriptResult(
         video_id=candidate.video_id,
         status="unavailable",
@@ -107,6 +251,54 @@ def get_transcript(
     )
 
 
+def _fetch_in_provider_slot(
+    config: AppConfig,
+    state: RunTranscriptState,
+    provider_name: str,
+    loader,
+    logger=None,
+) -> TranscriptResult | None:
+    with state.provider_slot(provider_name):
+        # Another thread may have put the provider in cooldown while this one waited for a slot.
+        if state.in_cooldown(provider_name):
+            return None
+        return retry_with_backoff(
+            loader,
+            attempts=config.retry_max_attempts,
+            base_delay=config.retry_base_delay_sec,
+            logger=logger,
+            on_exception=(RuntimeError,),
+        )
+
+
+async def _fetch_in_async_provider_slot(
+    config: AppConfig,
+    state: RunTranscriptState,
+    provider: AsyncTranscriptProvider,
+    candidate: VideoCandidate,
+    logger=None,
+) -> TranscriptResult | None:
+    async with state.async_provider_slot(provider.name):
+        if state.in_cooldown(provider.name):
+            return None
+        return await retry_with_backoff_async(
+            lambda: provider.fetch_async(candidate),
+            attempts=config.retry_max_attempts,
+            base_delay=config.retry_base_delay_sec,
+            logger=logger,
+            on_exception=(RuntimeError,),
+        )
+
+
+def _cooldown_result(candidate: VideoCandidate, provider_name: str, attempted: list[str]) -> TranscriptResult:
+    return TranscriptResult(
+        video_id=candidate.video_id,
+        status="cooldown",
+        source=provider_name,
+        attempted_providers=attempted.copy(),
+    )
+
+
 def _fetch_youtube_transcript(candidate: VideoCandidate, logger=None) -> TranscriptResult:
     provider = YouTubeTranscriptAPIProvider()
     transcript = provider.fetch(candidate.video_id, candidate.language)
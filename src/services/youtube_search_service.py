@@ -1,11 +1,31 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import as_completed
+from typing import Callable
+
 from src.config import AppConfig
 from src.models import FilterOptions, VideoCandidate
-from src.providers.youtube_data_api_provider import ProviderPermanentError, ProviderTemporaryError, YouTubeDataAPIProvider
+from src.providers.async_providers import AsyncSearchProvider, as_async_search_provider
+from src.providers.local_index_provider import LocalIndexProvider
+from src.providers.youtube_data_api_provider import (
+    ProviderPermanentError,
+    ProviderTemporaryError,
+    YouTubeDataAPIProvider,
+)
 from src.providers.ytdlp_provider import YtDlpProvider
+from src.services.cache_refresh import shared_cache_refresher
+from src.services.details_batcher import DetailsBatcher
+from src.services.search_hedging import shared_search_hedger
 from src.storage import SQLiteStore
-from src.utils.retry_utils import retry_with_backoff
+from src.utils.retry_utils import retry_with_backoff, retry_with_backoff_async
+from src.utils.single_flight import SingleFlight
+
+# In-flight provider searches, shared by every thread and event loop in the process.
+_SEARCH_FLIGHTS = SingleFlight()
 
 
 def search_candidates(
@@ -14,53 +34,464 @@ def search_candidates(
     query: str,
     filters: FilterOptions,
     logger=None,
+    details: DetailsBatcher | None = None,
 ) -> list[VideoCandidate]:
-    providers = [YouTubeDataAPIProvider(config), YtDlpProvider(config)]
+    local_candidates = _search_local_index(config, store, query, filters, logger=logger)
+    if local_candidates is not None:
+        return local_candidates
+
+    providers = [_data_api_provider(config, store, details, logger), YtDlpProvider(config)]
     provider_errors: list[str] = []
-    for provider in providers:
-        if hasattr(provider, "is_configured") and not provider.is_configured():
-            if logger:
-                logger.info("Skipping %s because it is not configured", provider.name)
+    cooldowns = store.get_provider_cooldowns()
+    for index, provider in enumerate(providers):
+        if not _provider_usable(provider, cooldowns, logger):
             continue
 
-        cooldown_until = store.get_provider_cooldown(provider.name)
-        if cooldown_until:
-            if logger:
-                logger.warning("Skipping %s due to cooldown until %s", provider.name, cooldown_until)
+        cached = _cached_search(
+            config,
+            store,
+            provider,
+            query,
+            filters,
+            lambda provider=provider: _fetch_and_cache(config, store, provider, query, filters, logger),
+            logger,
+        )
+        if cached is not None:
+            return cached
+
+        hedge = (
+            next((other for other in providers[index + 1 :] if _provider_usable(other, cooldowns)), None)
+            if config.search_hedging
+            else None
+        )
+        try:
+            if hedge is not None:
+                return _hedged_fetch(config, store, provider, hedge, query, filters, logger)
+            return _fetch_and_cache(config, store, provider, query, filters, logger)
+        except ProviderPermanentError as exc:
+            provider_errors.append(str(exc))
+            continue
+        except Exception as exc:
+            provider_errors.append(str(exc))
+            store.mark_provider_cooldown(provider.name, str(exc), config.provider_cooldown_sec)
+            continue
+
+    if logger and provider_errors:
+        logger.warning("All search providers failed for query %s: %s", query, provider_errors)
+    return []
+
+
+async def search_candidates_async(
+    config: AppConfig,
+    store: SQLiteStore,
+    query: str,
+    filters: FilterOptions,
+    logger=None,
+    providers: list[AsyncSearchProvider] | None = None,
+) -> list[VideoCandidate]:
+    # Store reads and writes stay inline: they are local SQLite calls, unlike the provider round trips.
+    local_candidates = _search_local_index(config, store, query, filters, logger=logger)
+    if local_candidates is not None:
+        return local_candidates
+
+    if providers is None:
+        providers = [
+            as_async_search_provider(_data_api_provider(config, store, logger=logger)),
+            as_async_search_provider(YtDlpProvider(config)),
+        ]
+    provider_errors: list[str] = []
+    cooldowns = store.get_provider_cooldowns()
+    for provider in providers:
+        if not _provider_usable(provider, cooldowns, logger):
             continue
 
-        cached = store.get_search_cache(provider.name, query, filters.model_dump())
+        cached = _cached_search(
+            config,
+            store,
+            provider,
+            query,
+            filters,
+            lambda provider=provider: asyncio.run(
+                _fetch_and_cache_async(config, store, provider, query, filters, logger)
+            ),
+            logger,
+        )
         if cached is not None:
-            if logger:
-                logger.info("Search cache hit for %s via %s", query, provider.name)
             return cached
 
         try:
-            candidates = retry_with_backoff(
-                lambda: provider.search(query, filters, config.search_candidates_per_subtopic),
+            return await _fetch_and_cache_async(config, store, provider, query, filters, logger)
+        except ProviderPermanentError as exc:
+            provider_errors.append(str(exc))
+            continue
+        except Exception as exc:
+            provider_errors.append(str(exc))
+            store.mark_provider_cooldown(provider.name, str(exc), config.provider_cooldown_sec)
+            continue
+
+    if logger and provider_errors:
+        logger.warning("All search providers failed for query %s: %s", query, provider_errors)
+    return []
+
+
+def search_candidates_many(
+    config: AppConfig,
+    store: SQLiteStore,
+    queries: list[str],
+    filters: FilterOptions,
+    logger=None,
+) -> dict[str, list[VideoCandidate]]:
+    # Discovery for several subtopics at once: each query runs the usual provider chain on its own thread, and the
+    # Data API detail lookups of all of them share one metadata-cache pass and videos.list batches of 50.
+    unique_queries = list(dict.fromkeys(queries))
+    if not unique_queries:
+        return {}
+    details = details_batcher(config, store, logger=logger)
+    # Every query takes part from the start, so the first lookup waits for the others instead of racing them.
+    details.enter(len(unique_queries))
+
+    def search(query: str) -> list[VideoCandidate]:
+        try:
+            return search_candidates(config, store, query, filters, logger=logger, details=details)
+        finally:
+            details.leave()
+
+    with ThreadPoolExecutor(max_workers=len(unique_queries), thread_name_prefix="search") as executor:
+        results = dict(zip(unique_queries, executor.map(search, unique_queries)))
+    if logger:
+        logger.info("Searched %s queries with %s shared details lookups", len(unique_queries), details.batches)
+    return results
+
+
+def details_batcher(config: AppConfig, store: SQLiteStore, logger=None) -> DetailsBatcher:
+    return DetailsBatcher(lambda video_ids: lookup_video_metadata(config, store, video_ids, logger=logger))
+
+
+def search_more_candidates(
+    config: AppConfig,
+    store: SQLiteStore,
+    query: str,
+    filters: FilterOptions,
+    page: int,
+    logger=None,
+) -> list[VideoCandidate]:
+    # Page 2+ of a query, from whichever provider served (and cached) the page before it, via that page's stored
+    # continuation token. Each page is cached on its own, so a deeper pool costs nothing on repeat.
+    cooldowns = store.get_provider_cooldowns()
+    for provider in (_data_api_provider(config, store, logger=logger), YtDlpProvider(config)):
+        if not _provider_usable(provider, cooldowns):
+            continue
+        cache_query = provider.cache_policy.cache_query(query)
+        cached = store.get_search_cache_entry(provider.name, cache_query, _page_cache_filters(provider, filters, page))
+        if cached is not None:
+            return cached.value
+        page_token = store.get_search_page_token(
+            provider.name, cache_query, _page_cache_filters(provider, filters, page - 1)
+        )
+        if page_token is None:
+            continue
+        try:
+            candidates, next_page_token = retry_with_backoff(
+                lambda: provider.search_page(query, filters, config.search_candidates_per_subtopic, page_token),
                 attempts=config.retry_max_attempts,
                 base_delay=config.retry_base_delay_sec,
                 logger=logger,
                 on_exception=(ProviderTemporaryError, RuntimeError),
             )
         except ProviderPermanentError as exc:
-            provider_errors.append(str(exc))
+            if logger:
+                logger.warning("Could not fetch page %s for %s via %s: %s", page, query, provider.name, exc)
             continue
         except Exception as exc:
-            provider_errors.append(str(exc))
             store.mark_provider_cooldown(provider.name, str(exc), config.provider_cooldown_sec)
             continue
+        if logger:
+            logger.info("Fetched candidate page %s for %s via %s", page, query, provider.name)
+        return _store_search_results(config, store, provider, query, filters, candidates, next_page_token, page)
+    return []
 
-        store.clear_provider_cooldown(provider.name)
-        deduped: dict[str, VideoCandidate] = {}
-        for candidate in candidates:
-            if candidate.video_id not in deduped:
-                deduped[candidate.video_id] = candidate
-                store.upsert_video_metadata(candidate, config.metadata_cache_ttl_sec)
-        final_candidates = list(deduped.values())
-        store.put_search_cache(provider.name, query, filters.model_dump(), final_candidates, config.search_cache_ttl_sec)
-        return final_candidates
 
-    if logger and provider_errors:
-        logger.warning("All search providers failed for query %s: %s", query, provider_errors)
+def lookup_video_metadata(
+    config: AppConfig,
+    store: SQLiteStore,
+    video_ids: list[str],
+    logger=None,
+) -> dict[str, VideoCandidate]:
+    entries = store.get_video_metadata_entries(video_ids)
+    provider = YouTubeDataAPIProvider(config)
+    stale_ids = [video_id for video_id, entry in entries.items() if entry.stale]
+    if stale_ids:
+        refresher = shared_cache_refresher(config.cache_refresh_workers)
+        refresher.record_stale("video_metadata_cache", len(stale_ids))
+        if provider.is_configured():
+            refresher.schedule(
+                "video_metadata_cache",
+                stale_ids,
+                lambda ids: store.upsert_video_metadata_many(provider.fetch_videos(ids), config.metadata_cache_ttl_sec),
+                logger=logger,
+            )
+    results = {video_id: entry.value for video_id, entry in entries.items()}
+    missing = [video_id for video_id in dict.fromkeys(video_ids) if video_id not in results]
+    if missing and provider.is_configured():
+        fetched = retry_with_backoff(
+            lambda: provider.fetch_videos(missing),
+            attempts=config.retry_max_attempts,
+            base_delay=config.retry_base_delay_sec,
+            logger=logger,
+            on_exception=(ProviderTemporaryError,),
+        )
+        store.upsert_video_metadata_many(fetched, config.metadata_cache_ttl_sec)
+        results.update((candidate.video_id, candidate) for candidate in fetched)
+    return results
+
+
+def _data_api_provider(
+    config: AppConfig,
+    store: SQLiteStore,
+    details: DetailsBatcher | None = None,
+    logger=None,
+) -> YouTubeDataAPIProvider:
+    # Search hits whose details are already cached skip videos.list; parallel subtopics also share the calls.
+    if details is not None:
+        return YouTubeDataAPIProvider(config, details_lookup=details.lookup)
+    return YouTubeDataAPIProvider(
+        config, details_lookup=lambda video_ids: lookup_video_metadata(config, store, video_ids, logger=logger)
+    )
+
+
+def _provider_usable(provider, cooldowns: dict[str, str], logger=None) -> bool:
+    if hasattr(provider, "is_configured") and not provider.is_configured():
+        if logger:
+            logger.info("Skipping %s because it is not configured", provider.name)
+        return False
+    cooldown_until = cooldowns.get(provider.name)
+    if cooldown_until:
+        if logger:
+            logger.warning("Skipping %s due to cooldown until %s", provider.name, cooldown_until)
+        return False
+    return True
+
+
+def _cached_search(
+    config: AppConfig,
+    store: SQLiteStore,
+    provider,
+    query: str,
+    filters: FilterOptions,
+    refresh: Callable[[], object],
+    logger=None,
+) -> list[VideoCandidate] | None:
+    cache_query = provider.cache_policy.cache_query(query)
+    cache_filters = provider.cache_policy.cache_filters(filters)
+    cached = store.get_search_cache_entry(provider.name, cache_query, cache_filters)
+    if cached is None:
+        return None
+    if logger:
+        state = "stale hit" if cached.stale else "hit"
+        logger.info("Search cache %s for %s via %s", state, query, provider.name)
+    if cached.stale:
+        refresher = shared_cache_refresher(config.cache_refresh_workers)
+        refresher.record_stale("search_cache")
+        refresher.schedule(
+            "search_cache",
+            [store.build_search_cache_key(provider.name, cache_query, cache_filters)],
+            lambda _keys: refresh(),
+            logger=logger,
+        )
+    return cached.value
+
+
+def _fetch_and_cache(
+    config: AppConfig,
+    store: SQLiteStore,
+    provider,
+    query: str,
+    filters: FilterOptions,
+    logger=None,
+) -> list[VideoCandidate]:
+    def fetch() -> list[VideoCandidate]:
+        candidates, next_page_token = retry_with_backoff(
+            lambda: _search_first_page(config, provider, query, filters),
+            attempts=config.retry_max_attempts,
+            base_delay=config.retry_base_delay_sec,
+            logger=logger,
+            on_exception=(ProviderTemporaryError, RuntimeError),
+        )
+        return _store_search_results(config, store, provider, query, filters, candidates, next_page_token)
+
+    # Coalesced callers may rank with different filters, and ranking scores candidates in place.
+    candidates = _SEARCH_FLIGHTS.do(_search_flight_key(store, provider, query, filters), fetch)
+    return [candidate.model_copy() for candidate in candidates]
+
+
+async def _fetch_and_cache_async(
+    config: AppConfig,
+    store: SQLiteStore,
+    provider: AsyncSearchProvider,
+    query: str,
+    filters: FilterOptions,
+    logger=None,
+) -> list[VideoCandidate]:
+    async def fetch() -> list[VideoCandidate]:
+        candidates, next_page_token = await retry_with_backoff_async(
+            lambda: _search_first_page_async(config, provider, query, filters),
+            attempts=config.retry_max_attempts,
+            base_delay=config.retry_base_delay_sec,
+            logger=logger,
+            on_exception=(ProviderTemporaryError, RuntimeError),
+        )
+        return _store_search_results(config, store, provider, query, filters, candidates, next_page_token)
+
+    candidates = await _SEARCH_FLIGHTS.do_async(_search_flight_key(store, provider, query, filters), fetch)
+    return [candidate.model_copy() for candidate in candidates]
+
+
+def _hedged_fetch(
+    config: AppConfig,
+    store: SQLiteStore,
+    primary,
+    fallback,
+    query: str,
+    filters: FilterOptions,
+    logger=None,
+) -> list[VideoCandidate]:
+    # If the primary has not answered within its p95 latency, race the fallback and keep the first non-empty result.
+    # The slower call is not cancelled (a blocking HTTP or yt-dlp call cannot be); it finishes in the background and
+    # still fills its provider's search cache. A primary error before the hedge fires propagates to the caller.
+    hedger = shared_search_hedger()
+    started = time.monotonic()
+
+    def record_primary_latency(future) -> None:
+        # Slow answers count toward the p95 too, including ones that lose the race.
+        if future.exception() is None:
+            hedger.record_latency(time.monotonic() - started)
+
+    def search_fallback() -> list[VideoCandidate]:
+        cached = _cached_search(
+            config,
+            store,
+            fallback,
+            query,
+            filters,
+            lambda: _fetch_and_cache(config, store, fallback, query, filters, logger),
+            logger,
+        )
+        return cached or _fetch_and_cache(config, store, fallback, query, filters, logger)
+
+    primary_future = hedger.executor.submit(_fetch_and_cache, config, store, primary, query, filters, logger)
+    primary_future.add_done_callback(record_primary_latency)
+    try:
+        return primary_future.result(timeout=hedger.delay(config.search_hedge_delay_ms / 1000))
+    except FutureTimeoutError:
+        pass
+
+    if logger:
+        logger.info("Hedging search for %s: %s is slow, racing %s", query, primary.name, fallback.name)
+    fallback_future = hedger.executor.submit(search_fallback)
+    racers = {primary_future: primary, fallback_future: fallback}
+    for future in as_completed(racers):
+        provider = racers[future]
+        try:
+            candidates = future.result()
+        except Exception as exc:
+            if logger:
+                logger.warning("Hedged search via %s failed for %s: %s", provider.name, query, exc)
+            if not isinstance(exc, ProviderPermanentError):
+                store.mark_provider_cooldown(provider.name, str(exc), config.provider_cooldown_sec)
+            continue
+        if candidates:
+            hedger.record_win(provider.name)
+            if logger:
+                logger.info("Hedged search for %s won by %s", query, provider.name)
+            return candidates
     return []
+
+
+def _search_first_page(
+    config: AppConfig,
+    provider,
+    query: str,
+    filters: FilterOptions,
+) -> tuple[list[VideoCandidate], str | None]:
+    # The continuation token is only asked for (and kept) when deeper pages may be used.
+    limit = config.search_candidates_per_subtopic
+    if config.search_max_pages > 1 and hasattr(provider, "search_page"):
+        return provider.search_page(query, filters, limit)
+    return provider.search(query, filters, limit), None
+
+
+async def _search_first_page_async(
+    config: AppConfig,
+    provider: AsyncSearchProvider,
+    query: str,
+    filters: FilterOptions,
+) -> tuple[list[VideoCandidate], str | None]:
+    limit = config.search_candidates_per_subtopic
+    if config.search_max_pages > 1 and hasattr(provider, "search_page_async"):
+        return await provider.search_page_async(query, filters, limit)
+    return await provider.search_async(query, filters, limit), None
+
+
+def _search_flight_key(store: SQLiteStore, provider, query: str, filters: FilterOptions) -> tuple[str, str]:
+    # Same identity as the search cache row the fetch will write, so callers that would miss together share it.
+    cache_key = store.build_search_cache_key(
+        provider.name, provider.cache_policy.cache_query(query), provider.cache_policy.cache_filters(filters)
+    )
+    return store.db_path, cache_key
+
+
+def _store_search_results(
+    config: AppConfig,
+    store: SQLiteStore,
+    provider,
+    query: str,
+    filters: FilterOptions,
+    candidates: list[VideoCandidate],
+    next_page_token: str | None = None,
+    page: int = 1,
+) -> list[VideoCandidate]:
+    deduped: dict[str, VideoCandidate] = {}
+    for candidate in candidates:
+        if candidate.video_id not in deduped:
+            deduped[candidate.video_id] = candidate
+    final_candidates = list(deduped.values())
+    with store.transaction():
+        store.clear_provider_cooldown(provider.name)
+        store.upsert_video_metadata_many(final_candidates, config.metadata_cache_ttl_sec)
+        store.put_search_cache(
+            provider.name,
+            provider.cache_policy.cache_query(query),
+            _page_cache_filters(provider, filters, page),
+            final_candidates,
+            config.search_cache_ttl_sec,
+            next_page_token=next_page_token,
+        )
+    return final_candidates
+
+
+def _page_cache_filters(provider, filters: FilterOptions, page: int) -> dict[str, object]:
+    # Page 1 keeps the original cache key; deeper pages are cached as separate rows.
+    cache_filters = provider.cache_policy.cache_filters(filters)
+    return cache_filters if page == 1 else {**cache_filters, "page": page}
+
+
+def _search_local_index(
+    config: AppConfig,
+    store: SQLiteStore,
+    query: str,
+    filters: FilterOptions,
+    logger=None,
+) -> list[VideoCandidate] | None:
+    provider = LocalIndexProvider(config, store)
+    if not provider.is_configured():
+        if config.local_index_mode == "offline":
+            if logger:
+                logger.warning("Offline discovery requested but the local index is unavailable")
+            return []
+        return None
+    candidates = provider.search(query, filters, config.search_candidates_per_subtopic)
+    if config.local_index_mode == "offline" or len(candidates) >= config.local_index_min_results:
+        if logger:
+            logger.info("Local index returned %s candidates for %s", len(candidates), query)
+        return candidates
+    return None
@@ -1,3 +1,5 @@
-from .sqlite_store import SQLiteStore
+from .connection_pool import SQLiteConnectionPool, SQLitePragmas
+from .memory_cache import CacheStats, MemoryCache
+from .sqlite_store import RunCheckpoint, SQLiteStore
 
-__all__ = ["SQLiteStore"]
+__all__ = ["CacheStats", "MemoryCache", "RunCheckpoint", "SQLiteConnectionPool", "SQLitePragmas", "SQLiteStore"]
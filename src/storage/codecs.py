@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+from src.models import VideoCandidate
+
+
+JSON_CODEC = "json"
+MSGPACK_CODEC = "msgpack"
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def msgpack_available() -> bool:
+    try:
+        import msgpack  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def candidate_list_adapter() -> TypeAdapter[list[VideoCandidate]]:
+    return TypeAdapter(list[VideoCandidate])
+
+
+def encode_model(model: BaseModel, codec: str, exclude: set[str] | None = None) -> str | bytes:
+    if codec == MSGPACK_CODEC:
+        import msgpack
+
+        return msgpack.packb(model.model_dump(mode="json", exclude=exclude), use_bin_type=True)
+    if codec == JSON_CODEC:
+        return model.model_dump_json(exclude=exclude)
+    raise ValueError(f"Unsupported payload codec: {codec}")
+
+
+def decode_model(data: str | bytes, codec: str, model_type: type[ModelT]) -> ModelT:
+    if codec == MSGPACK_CODEC:
+        return model_type.model_validate(_unpack(data))
+    if codec == JSON_CODEC:
+        return model_type.model_validate_json(data)
+    raise ValueError(f"Unsupported payload codec: {codec}")
+
+
+def encode_candidates(candidates: list[VideoCandidate], codec: str) -> str | bytes:
+    adapter = candidate_list_adapter()
+    if codec == MSGPACK_CODEC:
+        import msgpack
+
+        return msgpack.packb(adapter.dump_python(candidates, mode="json"), use_bin_type=True)
+    if codec == JSON_CODEC:
+        return adapter.dump_json(candidates).decode("utf-8")
+    raise ValueError(f"Unsupported payload codec: {codec}")
+
+
+def decode_candidates(data: str | bytes, codec: str) -> list[VideoCandidate]:
+    adapter = candidate_list_adapter()
+    if codec == MSGPACK_CODEC:
+        return adapter.validate_python(_unpack(data))
+    if codec == JSON_CODEC:
+        return adapter.validate_json(data)
+    raise ValueError(f"Unsupported payload codec: {codec}")
+
+
+def _unpack(data: str | bytes) -> Any:
+    import msgpack
+
+    return msgpack.unpackb(data, raw=False)
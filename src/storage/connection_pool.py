@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class SQLitePragmas:
+    busy_timeout_ms: int = 5000
+    cache_size_kib: int = 16384
+    mmap_size_bytes: int = 128 * 1024 * 1024
+    auto_vacuum: str = "INCREMENTAL"
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+
+
+class _ThreadConnection:
+    # Lives only in its thread's threading.local, so it is collected (and its connection closed) when the thread exits.
+    __slots__ = ("conn", "generation", "depth", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection, generation: int):
+        self.conn = conn
+        self.generation = generation
+        self.depth = 0
+
+
+class SQLiteConnectionPool:
+    # One long-lived connection per thread, opened lazily and closed when the thread exits or on close().
+    def __init__(
+        self,
+        db_path: str,
+        pragmas: SQLitePragmas | None = None,
+        on_connect: Callable[[sqlite3.Connection], None] | None = None,
+    ):
+        self.db_path = db_path
+        self.pragmas = pragmas or SQLitePragmas()
+        self.on_connect = on_connect
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self._generation = 0
+        self._finalizer = weakref.finalize(self, _close_connections, self._connections, self._lock)
+
+    def acquire(self) -> sqlite3.Connection:
+        return self._holder().conn
+
+    @contextmanager
+    def transaction(self):
+        holder = self._holder()
+        conn = holder.conn
+        depth = holder.depth
+        holder.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            if depth == 0 and conn.in_transaction:
+                conn.rollback()
+            raise
+        else:
+            if depth == 0:
+                conn.commit()
+        finally:
+            holder.depth = depth
+
+    def open_connections(self) -> int:
+        with self._lock:
+            return len(self._connections)
+
+    def _holder(self) -> _ThreadConnection:
+        holder = getattr(self._local, "holder", None)
+        if holder is None or holder.generation != self._generation:
+            conn = self._open()
+            holder = _ThreadConnection(conn, self._generation)
+            self._local.holder = holder
+            # Short-lived executor, refresher and journal threads would otherwise leave one open connection each.
+            weakref.finalize(holder, _close_connection, conn, self._connections, self._lock)
+        return holder
+
+    def close(self) -> None:
+        with self._lock:
+            self._generation += 1
+        _close_connections(self._connections, self._lock)
+
+    def _open(self) -> sqlite3.Connection:
+        pragmas = self.pragmas
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=pragmas.busy_timeout_ms / 1000,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(pragmas.busy_timeout_ms)}")
+        # auto_vacuum only takes effect on a fresh file, so it has to precede the WAL switch.
+        conn.execute(f"PRAGMA auto_vacuum = {pragmas.auto_vacuum}")
+        conn.execute(f"PRAGMA journal_mode = {pragmas.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {pragmas.synchronous}")
+        # Negative cache_size is interpreted by SQLite as KiB rather than pages.
+        conn.execute(f"PRAGMA cache_size = {-abs(int(pragmas.cache_size_kib))}")
+        conn.execute(f"PRAGMA mmap_size = {int(pragmas.mmap_size_bytes)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        if self.on_connect is not None:
+            self.on_connect(conn)
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+
+def _close_connection(
+    conn: sqlite3.Connection,
+    connections: list[sqlite3.Connection],
+    lock: threading.Lock,
+) -> None:
+    with lock:
+        if conn in connections:
+            connections.remove(conn)
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def _close_connections(connections: list[sqlite3.Connection], lock: threading.Lock) -> None:
+    with lock:
+        pending = connections[:]
+        connections.clear()
+    for conn in pending:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from src.storage.migrations import has_full_text_index, rebuild_full_text_index
+
+if TYPE_CHECKING:
+    from src.storage.sqlite_store import SQLiteStore
+
+
+EXPIRING_TABLES = ("search_cache", "video_metadata_cache", "transcript_cache")
+# Only the bulky, cheap-to-rebuild caches are evicted when the file exceeds its size cap.
+EVICTABLE_TABLES = ("transcript_cache", "search_cache")
+LAST_MAINTENANCE_KEY = "last_maintenance_at"
+
+_background_lock = threading.Lock()
+_background_paths: set[str] = set()
+
+
+@dataclass
+class MaintenanceReport:
+    expired_deleted: dict[str, int] = field(default_factory=dict)
+    evicted: dict[str, int] = field(default_factory=dict)
+    size_before_bytes: int = 0
+    size_after_bytes: int = 0
+    vacuumed_pages: int = 0
+    orphaned_blobs_deleted: int = 0
+    # Set when the file still needs the one-time switch to incremental auto-vacuum, which only the CLI performs.
+    full_vacuum_pending: bool = False
+
+
+def run_maintenance(
+    store: SQLiteStore,
+    max_db_size_bytes: int | None = None,
+    batch_size: int = 500,
+    vacuum_pages: int | None = None,
+    convert_auto_vacuum: bool = False,
+) -> MaintenanceReport:
+    report = MaintenanceReport(size_before_bytes=database_size_bytes(store))
+    for table in EXPIRING_TABLES:
+        report.expired_deleted[table] = purge_expired(store, table, batch_size)
+    report.orphaned_blobs_deleted = purge_orphaned_blobs(store, batch_size)
+    optimize_full_text_index(store)
+    if max_db_size_bytes:
+        report.evicted = evict_least_recently_used(store, max_db_size_bytes, batch_size, convert_auto_vacuum)
+    report.vacuumed_pages = incremental_vacuum(store, vacuum_pages, convert_auto_vacuum)
+    report.full_vacuum_pending = not incremental_vacuum_enabled(store)
+    report.size_after_bytes = database_size_bytes(store)
+    _set_last_maintenance(store, _now())
+    return report
+
+
+def purge_expired(store: SQLiteStore, table: str, batch_size: int) -> int:
+    if table not in EXPIRING_TABLES:
+        raise ValueError(f"Unknown cache table: {table}")
+    deleted = 0
+    # Rows inside their stale-while-revalidate window are still being served, so they are not expired yet.
+    cutoff = _now() - store.stale_grace_sec.get(table, 0)
+    while True:
+        # Each batch commits on its own so a large purge never holds the write lock for long.
+        with store.connect() as conn:
+            cursor = conn.execute(
+                f"""
+                DELETE FROM {table}
+                WHERE rowid IN (SELECT rowid FROM {table} WHERE expires_at <= ? LIMIT ?)
+                """,
+                (cutoff, batch_size),
+            )
+        deleted += cursor.rowcount
+        if cursor.rowcount < batch_size:
+            return deleted
+
+
+def purge_orphaned_blobs(store: SQLiteStore, batch_size: int) -> int:
+    deleted = 0
+    while True:
+        with store.connect() as conn:
+            cursor = conn.execute(
+                """
+                DELETE FROM transcript_blob
+                WHERE text_hash IN (
+                    SELECT tb.text_hash FROM transcript_blob AS tb
+                    WHERE NOT EXISTS (SELECT 1 FROM transcript_cache AS tc WHERE tc.text_hash = tb.text_hash)
+                    LIMIT ?
+                )
+                """,
+                (batch_size,),
+            )
+        deleted += cursor.rowcount
+        if cursor.rowcount < batch_size:
+            return deleted
+
+
+def optimize_full_text_index(store: SQLiteStore) -> None:
+    # FTS5 deletes are recorded as tombstones; merging the segments is what actually releases their pages.
+    with store.connect() as conn:
+        if has_full_text_index(conn):
+            conn.execute("INSERT INTO video_metadata_fts (video_metadata_fts) VALUES ('optimize')")
+            conn.execute("INSERT INTO transcript_fts (transcript_fts) VALUES ('optimize')")
+
+
+def evict_least_recently_used(
+    store: SQLiteStore, max_db_size_bytes: int, batch_size: int, convert_auto_vacuum: bool = False
+) -> dict[str, int]:
+    evicted = {table: 0 for table in EVICTABLE_TABLES}
+    while database_size_bytes(store) > max_db_size_bytes:
+        with store.connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT 'transcript_cache' AS source, rowid AS row_id, last_accessed_at, video_id, provider
+                FROM transcript_cache
+                UNION ALL
+                SELECT 'search_cache' AS source, rowid AS row_id, last_accessed_at, NULL, NULL FROM search_cache
+                ORDER BY last_accessed_at, row_id
+                LIMIT ?
+                """,
+                (batch_size,),
+            ).fetchall()
+            if not rows:
+                break
+            for table in EVICTABLE_TABLES:
+                rowids = [(row["row_id"],) for row in rows if row["source"] == table]
+                if rowids:
+                    conn.executemany(f"DELETE FROM {table} WHERE rowid = ?", rowids)
+                    evicted[table] += len(rowids)
+            if store.memory_cache is not None:
+                # Their blobs are about to be purged, so in-memory copies could no longer load their text.
+                for row in rows:
+                    if row["source"] == "transcript_cache":
+                        store.memory_cache.discard("transcript_cache", (row["video_id"], row["provider"]))
+        purge_orphaned_blobs(store, batch_size)
+        optimize_full_text_index(store)
+        # Freed pages only shrink the file once they are handed back by the vacuum.
+        incremental_vacuum(store, convert_auto_vacuum=convert_auto_vacuum)
+    return evicted
+
+
+def incremental_vacuum(store: SQLiteStore, pages: int | None = None, convert_auto_vacuum: bool = False) -> int:
+    target = 0
+    with store.connect() as conn:
+        enabled = conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        if not enabled and convert_auto_vacuum:
+            # Databases created before incremental auto-vacuum need one full rebuild to switch modes. VACUUM holds an
+            # exclusive lock for the whole rewrite, so live processes leave it to the CLI.
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.commit()
+            conn.execute("VACUUM")
+            rebuild_full_text_index(conn)
+            conn.commit()
+            enabled = True
+        if enabled:
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            target = free_pages if pages is None else min(pages, free_pages)
+        if target:
+            conn.execute(f"PRAGMA incremental_vacuum({int(target)})").fetchall()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    return target
+
+
+def incremental_vacuum_enabled(store: SQLiteStore) -> bool:
+    with store.connect() as conn:
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def database_size_bytes(store: SQLiteStore) -> int:
+    with store.connect() as conn:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return (page_count - free_pages) * page_size
+
+
+def maintenance_due(store: SQLiteStore, interval_sec: int) -> bool:
+    with store.connect() as conn:
+        row = conn.execute("SELECT value FROM store_meta WHERE key = ?", (LAST_MAINTENANCE_KEY,)).fetchone()
+    if not row or not row["value"]:
+        return True
+    return int(row["value"]) + interval_sec <= _now()
+
+
+def maybe_run_maintenance_in_background(
+    store: SQLiteStore,
+    interval_sec: int,
+    max_db_size_bytes: int | None = None,
+    batch_size: int = 500,
+    logger=None,
+) -> threading.Thread | None:
+    if interval_sec <= 0 or not maintenance_due(store, interval_sec):
+        return None
+    with _background_lock:
+        if store.db_path in _background_paths:
+            return None
+        _background_paths.add(store.db_path)
+    if not _claim_maintenance_slot(store, interval_sec):
+        _release_background_path(store.db_path)
+        return None
+
+    def worker() -> None:
+        try:
+            report = run_maintenance(store, max_db_size_bytes=max_db_size_bytes, batch_size=batch_size)
+            if logger:
+                logger.info(
+                    "Cache maintenance purged %s expired rows, evicted %s rows, size %s -> %s bytes",
+                    sum(report.expired_deleted.values()),
+                    sum(report.evicted.values()),
+                    report.size_before_bytes,
+                    report.size_after_bytes,
+                )
+                if report.full_vacuum_pending:
+                    logger.info(
+                        "Skipped vacuuming %s: it predates incremental auto-vacuum. "
+                        "Run `python -m src.storage.maintenance` once to convert it.",
+                        store.db_path,
+                    )
+        except Exception as exc:
+            if logger:
+                logger.warning("Cache maintenance failed: %s", exc)
+        finally:
+            _release_background_path(store.db_path)
+
+    thread = threading.Thread(target=worker, name="sqlite-cache-maintenance", daemon=True)
+    thread.start()
+    return thread
+
+
+def _claim_maintenance_slot(store: SQLiteStore, interval_sec: int) -> bool:
+    # Stamping the start time up front keeps other processes sharing app.db from piling on.
+    now = _now()
+    with store.connect() as conn:
+        conn.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES (?, ?)", (LAST_MAINTENANCE_KEY, ""))
+        cursor = conn.execute(
+            "UPDATE store_meta SET value = ? WHERE key = ? AND (value = '' OR CAST(value AS INTEGER) <= ?)",
+            (str(now), LAST_MAINTENANCE_KEY, now - interval_sec),
+        )
+    return cursor.rowcount == 1
+
+
+def _set_last_maintenance(store: SQLiteStore, when: int) -> None:
+    with store.connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)",
+            (LAST_MAINTENANCE_KEY, str(when)),
+        )
+
+
+def _release_background_path(db_path: str) -> None:
+    with _background_lock:
+        _background_paths.discard(db_path)
+
+
+def _now() -> int:
+    return int(time.time())
+
+
+def main(argv: list[str] | None = None) -> int:
+    from src.storage.sqlite_store import SQLiteStore
+
+    parser = argparse.ArgumentParser(description="Purge, evict and vacuum the SQLite cache.")
+    parser.add_argument("--db", default=os.getenv("SQLITE_PATH", "data/cache/app.db"))
+    parser.add_argument(
+        "--max-size-mb",
+        type=int,
+        default=int(os.getenv("CACHE_MAX_DB_SIZE_MB", "1024")),
+        help="Evict least-recently-used transcript and search rows above this size (0 disables).",
+    )
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("CACHE_PURGE_BATCH_SIZE", "500")))
+    args = parser.parse_args(argv)
+
+    store = SQLiteStore(args.db)
+    try:
+        report = run_maintenance(
+            store,
+            max_db_size_bytes=args.max_size_mb * 1024 * 1024 if args.max_size_mb else None,
+            batch_size=args.batch_size,
+            convert_auto_vacuum=True,
+        )
+    finally:
+        store.close()
+    for table, count in report.expired_deleted.items():
+        print(f"expired {table}: {count}")
+    for table, count in report.evicted.items():
+        print(f"evicted {table}: {count}")
+    print(f"vacuumed pages: {report.vacuumed_pages}")
+    print(f"size: {report.size_before_bytes} -> {report.size_after_bytes} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    size: int
+    access_recorded_at: float
+
+
+class MemoryCache:
+    # Process-local LRU tier shared by every store pointing at the same database file.
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, Hashable], _Entry] = OrderedDict()
+        self._bytes = 0
+        self._stats: dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+
+    def get(self, table: str, key: Hashable) -> Any | None:
+        with self._lock:
+            stats = self._stats.setdefault(table, CacheStats())
+            entry = self._entries.get((table, key))
+            if entry is None:
+                stats.misses += 1
+                return None
+            if entry.expires_at <= time.time():
+                self._remove((table, key))
+                stats.misses += 1
+                return None
+            self._entries.move_to_end((table, key))
+            stats.hits += 1
+            return entry.value
+
+    def put(self, table: str, key: Hashable, value: Any, expires_at: float, size: int) -> None:
+        if expires_at <= time.time() or size > self.max_bytes:
+            self.discard(table, key)
+            return
+        with self._lock:
+            self._remove((table, key))
+            # Values are put right after a database read or write, which already stamped the row's access time.
+            self._entries[(table, key)] = _Entry(
+                value=value, expires_at=expires_at, size=size, access_recorded_at=time.time()
+            )
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def claim_access_record(self, table: str, key: Hashable, interval_sec: float) -> bool:
+        # True at most once per interval per entry, so memory hits reach last_accessed_at without a write per read.
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((table, key))
+            if entry is None or now - entry.access_recorded_at < interval_sec:
+                return False
+            entry.access_recorded_at = now
+            return True
+
+    def discard(self, table: str, key: Hashable) -> None:
+        with self._lock:
+            self._remove((table, key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, CacheStats]:
+        with self._lock:
+            return {table: CacheStats(stats.hits, stats.misses) for table, stats in self._stats.items()}
+
+    def _remove(self, full_key: tuple[str, Hashable]) -> None:
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+_shared_lock = threading.Lock()
+_shared_caches: dict[str, MemoryCache] = {}
+
+
+def shared_memory_cache(db_path: str, max_entries: int, max_bytes: int) -> MemoryCache:
+    key = os.path.abspath(db_path)
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = MemoryCache(max_entries=max_entries, max_bytes=max_bytes)
+            _shared_caches[key] = cache
+        return cache
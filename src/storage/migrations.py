@@ -0,0 +1,502 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+from src.models import VideoCandidate
+from src.storage.codecs import decode_model
+from src.storage.transcript_blobs import register_sql_functions
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def iso_to_epoch(value) -> int | None:
+    if value is None:
+        return None
+    if value == "":
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        # Unparseable timestamps are treated as already expired rather than aborting the upgrade.
+        return 0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    # Stores are built per run, so the common up-to-date case is settled with a plain read and no write lock.
+    version = _read_version(conn)
+    pending = [migration for migration in MIGRATIONS if migration.version > version]
+    if not pending:
+        return version
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at INTEGER NOT NULL
+        )
+        """
+    )
+    conn.commit()
+    conn.create_function("iso_to_epoch", 1, iso_to_epoch, deterministic=True)
+    register_sql_functions(conn)
+    for migration in pending:
+        # BEGIN IMMEDIATE serializes concurrent upgraders; the version is re-read under the lock.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if current_version(conn) >= migration.version:
+                conn.rollback()
+                continue
+            migration.apply(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                (migration.version, migration.name, int(time.time())),
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return current_version(conn)
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def _read_version(conn: sqlite3.Connection) -> int:
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'").fetchone()
+    return current_version(conn) if exists else 0
+
+
+def _execute_script(conn: sqlite3.Connection, script: str) -> None:
+    # executescript() would commit the surrounding migration transaction, so run statements one by one.
+    # Pieces are joined until complete_statement() agrees, so trigger bodies keep their inner semicolons.
+    pending = ""
+    for piece in script.split(";"):
+        pending += piece + ";"
+        if sqlite3.complete_statement(pending):
+            if pending.strip(" \n;"):
+                conn.execute(pending)
+            pending = ""
+    if pending.strip(" \n;"):
+        conn.execute(pending)
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, declaration: str, backfill_from: str | None = None):
+    if column in _columns(conn, table):
+        return
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+    if backfill_from:
+        conn.execute(f"UPDATE {table} SET {column} = {backfill_from}")
+
+
+def _rebuild_table(conn: sqlite3.Connection, table: str, create_sql: str, select_columns: dict[str, str]) -> None:
+    conn.execute(f"ALTER TABLE {table} RENAME TO {table}__old")
+    conn.execute(create_sql)
+    columns = ", ".join(select_columns)
+    expressions = ", ".join(select_columns.values())
+    conn.execute(f"INSERT INTO {table} ({columns}) SELECT {expressions} FROM {table}__old")
+    conn.execute(f"DROP TABLE {table}__old")
+
+
+def _initial_schema(conn: sqlite3.Connection) -> None:
+    _execute_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS search_cache (
+            cache_key TEXT PRIMARY KEY,
+            provider TEXT NOT NULL,
+            query TEXT NOT NULL,
+            filters_json TEXT NOT NULL,
+            payload_json TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS video_metadata_cache (
+            video_id TEXT PRIMARY KEY,
+            payload_json TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS transcript_cache (
+            video_id TEXT NOT NULL,
+            provider TEXT NOT NULL,
+            status TEXT NOT NULL,
+            payload_json TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (video_id, provider)
+        );
+        CREATE TABLE IF NOT EXISTS provider_health (
+            provider TEXT PRIMARY KEY,
+            cooldown_until TEXT,
+            last_error TEXT,
+            updated_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS run (
+            run_id TEXT PRIMARY KEY,
+            topic TEXT NOT NULL,
+            filters_json TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            result_json TEXT
+        );
+        CREATE TABLE IF NOT EXISTS run_subtopic (
+            run_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            subtopic_json TEXT NOT NULL,
+            PRIMARY KEY (run_id, position)
+        );
+        CREATE TABLE IF NOT EXISTS run_video (
+            run_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            video_id TEXT NOT NULL,
+            payload_json TEXT NOT NULL,
+            PRIMARY KEY (run_id, stage, video_id)
+        )
+        """,
+    )
+
+
+def _cache_access_tracking(conn: sqlite3.Connection) -> None:
+    conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    _add_column(conn, "search_cache", "last_accessed_at", "TEXT", backfill_from="created_at")
+    _add_column(conn, "transcript_cache", "last_accessed_at", "TEXT", backfill_from="updated_at")
+
+
+def _transcript_blobs(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS transcript_blob (
+            text_hash TEXT PRIMARY KEY,
+            codec TEXT NOT NULL,
+            data BLOB NOT NULL,
+            raw_size INTEGER NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    _add_column(conn, "transcript_cache", "text_hash", "TEXT")
+
+
+def _epoch_timestamps(conn: sqlite3.Connection) -> None:
+    _rebuild_table(
+        conn,
+        "search_cache",
+        """
+        CREATE TABLE search_cache (
+            cache_key TEXT PRIMARY KEY,
+            provider TEXT NOT NULL,
+            query TEXT NOT NULL,
+            filters_json TEXT NOT NULL,
+            payload_json TEXT NOT NULL,
+            expires_at INTEGER NOT NULL,
+            created_at INTEGER NOT NULL,
+            last_accessed_at INTEGER
+        )
+        """,
+        {
+            "cache_key": "cache_key",
+            "provider": "provider",
+            "query": "query",
+            "filters_json": "filters_json",
+            "payload_json": "payload_json",
+            "expires_at": "iso_to_epoch(expires_at)",
+            "created_at": "iso_to_epoch(created_at)",
+            "last_accessed_at": "iso_to_epoch(last_accessed_at)",
+        },
+    )
+    _rebuild_table(
+        conn,
+        "video_metadata_cache",
+        """
+        CREATE TABLE video_metadata_cache (
+            video_id TEXT PRIMARY KEY,
+            payload_json TEXT NOT NULL,
+            expires_at INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL
+        )
+        """,
+        {
+            "video_id": "video_id",
+            "payload_json": "payload_json",
+            "expires_at": "iso_to_epoch(expires_at)",
+            "updated_at": "iso_to_epoch(updated_at)",
+        },
+    )
+    _rebuild_table(
+        conn,
+        "transcript_cache",
+        """
+        CREATE TABLE transcript_cache (
+            video_id TEXT NOT NULL,
+            provider TEXT NOT NULL,
+            status TEXT NOT NULL,
+            payload_json TEXT NOT NULL,
+            expires_at INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL,
+            last_accessed_at INTEGER,
+            text_hash TEXT,
+            PRIMARY KEY (video_id, provider)
+        )
+        """,
+        {
+            "video_id": "video_id",
+            "provider": "provider",
+            "status": "status",
+            "payload_json": "payload_json",
+            "expires_at": "iso_to_epoch(expires_at)",
+            "updated_at": "iso_to_epoch(updated_at)",
+            "last_accessed_at": "iso_to_epoch(last_accessed_at)",
+            "text_hash": "text_hash",
+        },
+    )
+    _rebuild_table(
+        conn,
+        "provider_health",
+        """
+        CREATE TABLE provider_health (
+            provider TEXT PRIMARY KEY,
+            cooldown_until INTEGER,
+            last_error TEXT,
+            updated_at INTEGER NOT NULL
+        )
+        """,
+        {
+            "provider": "provider",
+            "cooldown_until": "iso_to_epoch(cooldown_until)",
+            "last_error": "last_error",
+            "updated_at": "iso_to_epoch(updated_at)",
+        },
+    )
+    _rebuild_table(
+        conn,
+        "transcript_blob",
+        """
+        CREATE TABLE transcript_blob (
+            text_hash TEXT PRIMARY KEY,
+            codec TEXT NOT NULL,
+            data BLOB NOT NULL,
+            raw_size INTEGER NOT NULL,
+            created_at INTEGER NOT NULL
+        )
+        """,
+        {
+            "text_hash": "text_hash",
+            "codec": "codec",
+            "data": "data",
+            "raw_size": "raw_size",
+            "created_at": "iso_to_epoch(created_at)",
+        },
+    )
+    _rebuild_table(
+        conn,
+        "run",
+        """
+        CREATE TABLE run (
+            run_id TEXT PRIMARY KEY,
+            topic TEXT NOT NULL,
+            filters_json TEXT NOT NULL,
+            created_at INTEGER NOT NULL,
+            result_json TEXT
+        )
+        """,
+        {
+            "run_id": "run_id",
+            "topic": "topic",
+            "filters_json": "filters_json",
+            "created_at": "iso_to_epoch(created_at)",
+            "result_json": "result_json",
+        },
+    )
+    conn.execute(
+        """
+        UPDATE store_meta SET value = CAST(iso_to_epoch(value) AS TEXT)
+        WHERE key = 'last_maintenance_at' AND value != ''
+        """
+    )
+    _execute_script(
+        conn,
+        """
+        CREATE INDEX IF NOT EXISTS idx_search_cache_expires_at ON search_cache (expires_at);
+        CREATE INDEX IF NOT EXISTS idx_search_cache_last_accessed_at ON search_cache (last_accessed_at);
+        CREATE INDEX IF NOT EXISTS idx_video_metadata_cache_expires_at ON video_metadata_cache (expires_at);
+        CREATE INDEX IF NOT EXISTS idx_transcript_cache_expires_at ON transcript_cache (expires_at);
+        CREATE INDEX IF NOT EXISTS idx_transcript_cache_last_accessed_at ON transcript_cache (last_accessed_at);
+        CREATE INDEX IF NOT EXISTS idx_transcript_cache_text_hash ON transcript_cache (text_hash)
+        """,
+    )
+
+
+def _payload_codecs(conn: sqlite3.Connection) -> None:
+    # Rows written before the codec layer are plain JSON, which is what the default tags them as.
+    for table in ("search_cache", "video_metadata_cache", "transcript_cache"):
+        _add_column(conn, table, "payload_codec", "TEXT NOT NULL DEFAULT 'json'")
+
+
+def fts5_available(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(value)")
+    except sqlite3.OperationalError:
+        return False
+    conn.execute("DROP TABLE temp.fts5_probe")
+    return True
+
+
+def _full_text_index(conn: sqlite3.Connection) -> None:
+    _add_column(conn, "video_metadata_cache", "title", "TEXT NOT NULL DEFAULT ''")
+    _add_column(conn, "video_metadata_cache", "description", "TEXT NOT NULL DEFAULT ''")
+    _add_column(conn, "video_metadata_cache", "channel", "TEXT NOT NULL DEFAULT ''")
+    rows = conn.execute("SELECT video_id, payload_json, payload_codec FROM video_metadata_cache").fetchall()
+    for video_id, payload, codec in rows:
+        candidate = decode_model(payload, codec, VideoCandidate)
+        conn.execute(
+            "UPDATE video_metadata_cache SET title = ?, description = ?, channel = ? WHERE video_id = ?",
+            (candidate.title, candidate.description, candidate.channel or "", video_id),
+        )
+    if not fts5_available(conn):
+        # The local index is optional; LocalIndexProvider reports itself unconfigured without these tables.
+        return
+    # Transcript text lives compressed in transcript_blob, so the index is contentless and the triggers
+    # decompress through the fts_transcript_text() function every store connection registers.
+    _execute_script(
+        conn,
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS video_metadata_fts USING fts5(
+            title, description, channel, content='video_metadata_cache', content_rowid='rowid'
+        );
+        CREATE TRIGGER IF NOT EXISTS video_metadata_fts_ai AFTER INSERT ON video_metadata_cache BEGIN
+            INSERT INTO video_metadata_fts (rowid, title, description, channel)
+            VALUES (new.rowid, new.title, new.description, new.channel);
+        END;
+        CREATE TRIGGER IF NOT EXISTS video_metadata_fts_ad AFTER DELETE ON video_metadata_cache BEGIN
+            INSERT INTO video_metadata_fts (video_metadata_fts, rowid, title, description, channel)
+            VALUES ('delete', old.rowid, old.title, old.description, old.channel);
+        END;
+        CREATE TRIGGER IF NOT EXISTS video_metadata_fts_au AFTER UPDATE ON video_metadata_cache BEGIN
+            INSERT INTO video_metadata_fts (video_metadata_fts, rowid, title, description, channel)
+            VALUES ('delete', old.rowid, old.title, old.description, old.channel);
+            INSERT INTO video_metadata_fts (rowid, title, description, channel)
+            VALUES (new.rowid, new.title, new.description, new.channel);
+        END;
+        CREATE VIRTUAL TABLE IF NOT EXISTS transcript_fts USING fts5(text, content='');
+        CREATE TRIGGER IF NOT EXISTS transcript_fts_ai AFTER INSERT ON transcript_blob BEGIN
+            INSERT INTO transcript_fts (rowid, text) VALUES (new.rowid, fts_transcript_text(new.data, new.codec));
+        END;
+        CREATE TRIGGER IF NOT EXISTS transcript_fts_ad AFTER DELETE ON transcript_blob BEGIN
+            INSERT INTO transcript_fts (transcript_fts, rowid, text)
+            VALUES ('delete', old.rowid, fts_transcript_text(old.data, old.codec));
+        END
+        """,
+    )
+    rebuild_full_text_index(conn)
+
+
+def has_full_text_index(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'video_metadata_fts'").fetchone()
+    return row is not None
+
+
+def rebuild_full_text_index(conn: sqlite3.Connection) -> None:
+    # Both indexes are keyed by rowid, which a full VACUUM is allowed to renumber.
+    if not has_full_text_index(conn):
+        return
+    conn.execute("INSERT INTO video_metadata_fts (video_metadata_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO transcript_fts (transcript_fts) VALUES ('delete-all')")
+    conn.execute(
+        "INSERT INTO transcript_fts (rowid, text) SELECT rowid, fts_transcript_text(data, codec) FROM transcript_blob"
+    )
+
+
+def _projected_search_cache_keys(conn: sqlite3.Connection) -> None:
+    from src.storage.sqlite_store import SQLiteStore
+
+    # Frozen copy of the rules search providers shipped with: language is the only filter that reaches YouTube,
+    # and queries are lowercased with whitespace collapsed. Later policy changes need their own migration.
+    rows = conn.execute("SELECT rowid, provider, query, filters_json, expires_at FROM search_cache").fetchall()
+    winners: dict[str, tuple[int, int, str, str]] = {}
+    for rowid, provider, query, filters_json, expires_at in rows:
+        filters = json.loads(filters_json)
+        projected = {"language": filters.get("language", "en")}
+        canonical = " ".join(query.split()).lower()
+        cache_key = SQLiteStore.build_search_cache_key(provider, canonical, projected)
+        current = winners.get(cache_key)
+        if current is None or expires_at > current[1]:
+            winners[cache_key] = (rowid, expires_at, canonical, json.dumps(projected, ensure_ascii=False))
+    keep = {winner[0] for winner in winners.values()}
+    conn.executemany(
+        "DELETE FROM search_cache WHERE rowid = ?",
+        [(row[0],) for row in rows if row[0] not in keep],
+    )
+    # Park every surviving row on a temporary key first so re-keying never collides with a row not yet moved.
+    conn.executemany(
+        "UPDATE search_cache SET cache_key = 'migrating:' || cache_key WHERE rowid = ?",
+        [(rowid,) for rowid in keep],
+    )
+    conn.executemany(
+        "UPDATE search_cache SET cache_key = ?, query = ?, filters_json = ? WHERE rowid = ?",
+        [(cache_key, query, filters_json, rowid) for cache_key, (rowid, _, query, filters_json) in winners.items()],
+    )
+
+
+def _run_subtopic_plan(conn: sqlite3.Connection) -> None:
+    # The generated subtopic list, so a resumed run does not ask the LLM again.
+    _add_column(conn, "run", "subtopics_json", "TEXT")
+
+
+def _run_request_key(conn: sqlite3.Connection) -> None:
+    # Lets a finished run's result_json be reused for an identical request.
+    _add_column(conn, "run", "request_key", "TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_run_request_key ON run (request_key, created_at)")
+
+
+def _api_quota_usage(conn: sqlite3.Connection) -> None:
+    # YouTube Data API units spent per key (a hash, never the key itself) and Pacific-time quota day.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS api_quota_usage (
+            key_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            units_used INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL,
+            PRIMARY KEY (key_id, day)
+        )
+        """
+    )
+
+
+def _search_page_tokens(conn: sqlite3.Connection) -> None:
+    # Continuation token for the page after each cached search page; it expires with the page it belongs to.
+    _add_column(conn, "search_cache", "next_page_token", "TEXT")
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "initial_schema", _initial_schema),
+    Migration(2, "cache_access_tracking", _cache_access_tracking),
+    Migration(3, "transcript_blobs", _transcript_blobs),
+    Migration(4, "epoch_timestamps", _epoch_timestamps),
+    Migration(5, "payload_codecs", _payload_codecs),
+    Migration(6, "full_text_index", _full_text_index),
+    Migration(7, "projected_search_cache_keys", _projected_search_cache_keys),
+    Migration(8, "run_subtopic_plan", _run_subtopic_plan),
+    Migration(9, "run_request_key", _run_request_key),
+    Migration(10, "api_quota_usage", _api_quota_usage),
+    Migration(11, "search_page_tokens", _search_page_tokens),
+]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import queue
+import threading
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.storage.sqlite_store import SQLiteStore
+
+
+_STATEMENTS = {
+    "run_subtopic": "INSERT OR REPLACE INTO run_subtopic (run_id, position, subtopic_json) VALUES (?, ?, ?)",
+    "run_video": "INSERT OR REPLACE INTO run_video (run_id, stage, video_id, payload_json) VALUES (?, ?, ?, ?)",
+}
+
+
+def write_journal_rows(conn, kind: str, rows: list[tuple[Any, ...]]) -> None:
+    conn.executemany(
+        _STATEMENTS[kind],
+        [(*row[:-1], json.dumps(row[-1], ensure_ascii=False)) for row in rows],
+    )
+
+
+class RunJournalWriter:
+    # Buffers run_subtopic/run_video inserts and commits them from a background thread in batches.
+    def __init__(
+        self,
+        store: SQLiteStore,
+        max_queue_size: int = 1000,
+        batch_size: int = 200,
+        idle_timeout_sec: float = 5.0,
+    ):
+        self.store = store
+        self.batch_size = batch_size
+        self.idle_timeout_sec = idle_timeout_sec
+        # put() blocks once the queue is full, which pushes back on producers instead of growing unbounded.
+        self._queue: queue.Queue[tuple[str, tuple[Any, ...]]] = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._error: BaseException | None = None
+
+    def submit(self, kind: str, row: tuple[Any, ...]) -> None:
+        if kind not in _STATEMENTS:
+            raise ValueError(f"Unknown run journal entry: {kind}")
+        self._queue.put((kind, row))
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sqlite-run-journal", daemon=True)
+                self._thread.start()
+
+    def flush(self) -> None:
+        self._queue.join()
+        with self._lock:
+            error, self._error = self._error, None
+        if error is not None:
+            raise RuntimeError(f"Run journal write failed: {error}") from error
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_timeout_sec)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except BaseException as exc:
+                with self._lock:
+                    self._error = exc
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch: list[tuple[str, tuple[Any, ...]]]) -> None:
+        grouped: dict[str, list[tuple[Any, ...]]] = {}
+        for kind, row in batch:
+            grouped.setdefault(kind, []).append(row)
+        with self.store.transaction() as conn:
+            for kind, rows in grouped.items():
+                write_journal_rows(conn, kind, rows)
@@ -2,95 +2,207 @@ from __future__ import annotations
 
 import hashlib
 import json
-import sqlite3
-from contextlib import contextmanager
-from datetime import datetime, timedelta, timezone
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Generic, Iterator, TypeVar
 
-from src.models import PlaylistResult, TranscriptResult, VideoCandidate
+from src.config import AppConfig
+from src.models import PlaylistResult, Recommendation, Subtopic, SubtopicResult, TranscriptResult, VideoCandidate
+from src.storage.codecs import (
+    JSON_CODEC,
+    MSGPACK_CODEC,
+    decode_candidates,
+    decode_model,
+    encode_candidates,
+    encode_model,
+    msgpack_available,
+)
+from src.storage.connection_pool import SQLiteConnectionPool, SQLitePragmas
+from src.storage.memory_cache import CacheStats, MemoryCache, shared_memory_cache
+from src.storage.migrations import apply_migrations, has_full_text_index
+from src.storage.run_journal import RunJournalWriter, write_journal_rows
+from src.storage.transcript_blobs import (
+    LazyText,
+    LazyTranscriptResult,
+    compress_text,
+    load_blob_text,
+    register_sql_functions,
+    text_hash,
+    zstd_available,
+)
 
+if TYPE_CHECKING:
+    from src.storage.maintenance import MaintenanceReport
 
-def _utc_now() -> datetime:
-    return datetime.now(timezone.utc)
 
+def _now() -> int:
+    return int(time.time())
 
-def _iso_in(seconds: int) -> str:
-    return (_utc_now() + timedelta(seconds=seconds)).isoformat()
+
+def _epoch_in(seconds: int) -> int:
+    return _now() + seconds
+
+
+def _iso_from_epoch(value: int) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+
+T = TypeVar("T")
+
+# Stay well below SQLITE_MAX_VARIABLE_NUMBER on older SQLite builds.
+_MAX_IN_PARAMS = 500
+# How often a key served from the memory tier refreshes its last_accessed_at, which LRU eviction orders by.
+_MEMORY_ACCESS_RECORD_INTERVAL_SEC = 60
+
+
+def _chunked(items: list[str], size: int = _MAX_IN_PARAMS) -> Iterator[list[str]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _placeholders(count: int) -> str:
+    return ", ".join("?" for _ in range(count))
+
+
+@dataclass
+class CacheEntry(Generic[T]):
+    value: T
+    stale: bool = False
+
+
+@dataclass
+class RunCheckpoint:
+    run_id: str
+    topic: str
+    filters: dict[str, Any]
+    subtopics: list[Subtopic] | None
+    # Selected subtopics in position order, each with its recommendation (None when nothing survived dedup).
+    completed: list[tuple[SubtopicResult, Recommendation | None]]
+    transcripts: dict[str, TranscriptResult]
 
 
 class SQLiteStore:
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        pragmas: SQLitePragmas | None = None,
+        memory_cache: MemoryCache | None = None,
+        transcript_codec: str = "zlib",
+        journal_queue_size: int = 0,
+        payload_codec: str = JSON_CODEC,
+        stale_grace_sec: dict[str, int] | None = None,
+    ):
         self.db_path = db_path
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._pool = SQLiteConnectionPool(db_path, pragmas, on_connect=register_sql_functions)
+        self.memory_cache = memory_cache
+        self.transcript_codec = transcript_codec
+        self.payload_codec = payload_codec
+        # Per-table window after expiry during which rows are still served (flagged stale) and kept by purges.
+        self.stale_grace_sec = stale_grace_sec or {}
+        self.journal = RunJournalWriter(self, max_queue_size=journal_queue_size) if journal_queue_size else None
         self._ensure_schema()
 
-    @contextmanager
+    @classmethod
+    def from_config(cls, config: AppConfig) -> "SQLiteStore":
+        return cls(
+            config.sqlite_path,
+            pragmas=SQLitePragmas(
+                busy_timeout_ms=config.sqlite_busy_timeout_ms,
+                cache_size_kib=config.sqlite_cache_size_kib,
+                mmap_size_bytes=config.sqlite_mmap_size_mb * 1024 * 1024,
+            ),
+            memory_cache=(
+                shared_memory_cache(
+                    config.sqlite_path,
+                    max_entries=config.memory_cache_max_entries,
+                    max_bytes=config.memory_cache_max_mb * 1024 * 1024,
+                )
+                if config.memory_cache_max_entries and config.memory_cache_max_mb
+                else None
+            ),
+            transcript_codec="zstd" if config.transcript_codec == "zstd" and zstd_available() else "zlib",
+            journal_queue_size=config.run_journal_queue_size,
+            payload_codec=(
+                MSGPACK_CODEC if config.cache_payload_codec == MSGPACK_CODEC and msgpack_available() else JSON_CODEC
+            ),
+            stale_grace_sec={
+                "search_cache": config.search_cache_stale_grace_sec,
+                "video_metadata_cache": config.metadata_cache_stale_grace_sec,
+            },
+        )
+
     def connect(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-            conn.commit()
-        finally:
-            conn.close()
+        return self._pool.transaction()
 
-    def _ensure_schema(self) -> None:
+    def transaction(self):
+        # Store calls made inside this block share the outer connection and commit once on exit.
+        return self._pool.transaction()
+
+    def close(self) -> None:
+        self.flush_journal()
+        self._pool.close()
+
+    def flush_journal(self) -> None:
+        if self.journal is not None:
+            self.journal.flush()
+
+    def cache_stats(self) -> dict[str, CacheStats]:
+        return self.memory_cache.stats() if self.memory_cache is not None else {}
+
+    def _memory_get(self, table: str, key: Any) -> Any | None:
+        if self.memory_cache is None:
+            return None
+        return self.memory_cache.get(table, key)
+
+    def _record_memory_hits(self, table: str, keys: list[Any]) -> None:
+        if self.memory_cache is None:
+            return
+        due = [
+            key
+            for key in keys
+            if self.memory_cache.claim_access_record(table, key, _MEMORY_ACCESS_RECORD_INTERVAL_SEC)
+        ]
+        if not due:
+            return
+        now = _now()
         with self.connect() as conn:
-            conn.executescript(
-                """
-                CREATE TABLE IF NOT EXISTS search_cache (
-                    cache_key TEXT PRIMARY KEY,
-                    provider TEXT NOT NULL,
-                    query TEXT NOT NULL,
-                    filters_json TEXT NOT NULL,
-                    payload_json TEXT NOT NULL,
-                    expires_at TEXT NOT NULL,
-                    created_at TEXT NOT NULL
-                );
-                CREATE TABLE IF NOT EXISTS video_metadata_cache (
-                    video_id TEXT PRIMARY KEY,
-                    payload_json TEXT NOT NULL,
-                    expires_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
-                );
-                CREATE TABLE IF NOT EXISTS transcript_cache (
-                    video_id TEXT NOT NULL,
-                    provider TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    payload_json TEXT NOT NULL,
-                    expires_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL,
-                    PRIMARY KEY (video_id, provider)
-                );
-                CREATE TABLE IF NOT EXISTS provider_health (
-                    provider TEXT PRIMARY KEY,
-                    cooldown_until TEXT,
-                    last_error TEXT,
-                    updated_at TEXT NOT NULL
-                );
-                CREATE TABLE IF NOT EXISTS run (
-                    run_id TEXT PRIMARY KEY,
-                    topic TEXT NOT NULL,
-                    filters_json TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    result_json TEXT
-                );
-                CREATE TABLE IF NOT EXISTS run_subtopic (
-                    run_id TEXT NOT NULL,
-                    position INTEGER NOT NULL,
-                    subtopic_json TEXT NOT NULL,
-                    PRIMARY KEY (run_id, position)
-                );
-                CREATE TABLE IF NOT EXISTS run_video (
-                    run_id TEXT NOT NULL,
-                    stage TEXT NOT NULL,
-                    video_id TEXT NOT NULL,
-                    payload_json TEXT NOT NULL,
-                    PRIMARY KEY (run_id, stage, video_id)
-                );
-                """
-            )
+            if table == "search_cache":
+                conn.executemany(
+                    "UPDATE search_cache SET last_accessed_at = ? WHERE cache_key = ?", [(now, key) for key in due]
+                )
+            else:
+                conn.executemany(
+                    "UPDATE transcript_cache SET last_accessed_at = ? WHERE video_id = ? AND provider = ?",
+                    [(now, video_id, provider) for video_id, provider in due],
+                )
+
+    def _memory_put(self, table: str, key: Any, value: Any, expires_at: int, size: int) -> None:
+        if self.memory_cache is not None:
+            self.memory_cache.put(table, key, value, expires_at, size)
+
+    def run_maintenance(self, max_db_size_bytes: int | None = None, batch_size: int = 500) -> MaintenanceReport:
+        # Imported lazily so `python -m src.storage.maintenance` does not load the module twice.
+        from src.storage.maintenance import run_maintenance
+
+        return run_maintenance(self, max_db_size_bytes=max_db_size_bytes, batch_size=batch_size)
+
+    def maybe_run_maintenance(self, config: AppConfig, logger=None):
+        from src.storage.maintenance import maybe_run_maintenance_in_background
+
+        return maybe_run_maintenance_in_background(
+            self,
+            interval_sec=config.cache_maintenance_interval_sec,
+            max_db_size_bytes=config.cache_max_db_size_mb * 1024 * 1024 if config.cache_max_db_size_mb else None,
+            batch_size=config.cache_purge_batch_size,
+            logger=logger,
+        )
+
+    def _ensure_schema(self) -> None:
+        apply_migrations(self._pool.acquire())
 
     @staticmethod
     def build_search_cache_key(provider: str, query: str, filters: dict[str, Any]) -> str:
@@ -100,15 +212,44 @@ class SQLiteStore:
         return digest
 
     def get_search_cache(self, provider: str, query: str, filters: dict[str, Any]) -> list[VideoCandidate] | None:
+        entry = self.get_search_cache_entry(provider, query, filters)
+        return entry.value if entry is not None and not entry.stale else None
+
+    def get_search_cache_entry(
+        self,
+        provider: str,
+        query: str,
+        filters: dict[str, Any],
+    ) -> CacheEntry[list[VideoCandidate]] | None:
         cache_key = self.build_search_cache_key(provider, query, filters)
+        remembered = self._memory_get("search_cache", cache_key)
+        if remembered is not None:
+            self._record_memory_hits("search_cache", [cache_key])
+            return CacheEntry([item.model_copy() for item in remembered])
+        now = _now()
         with self.connect() as conn:
             row = conn.execute(
-                "SELECT payload_json, expires_at FROM search_cache WHERE cache_key = ?",
-                (cache_key,),
+                """
+                SELECT payload_json, payload_codec, expires_at
+                FROM search_cache
+                WHERE cache_key = ? AND expires_at > ?
+                """,
+                (cache_key, now - self.stale_grace_sec.get("search_cache", 0)),
             ).fetchone()
-        if not row or row["expires_at"] <= _utc_now().isoformat():
-            return None
-        return [VideoCandidate.model_validate(item) for item in json.loads(row["payload_json"])]
+            if not row:
+                return None
+            conn.execute("UPDATE search_cache SET last_accessed_at = ? WHERE cache_key = ?", (now, cache_key))
+        candidates = decode_candidates(row["payload_json"], row["payload_codec"])
+        if row["expires_at"] <= now:
+            return CacheEntry(candidates, stale=True)
+        self._memory_put(
+            "search_cache",
+            cache_key,
+            [item.model_copy() for item in candidates],
+            row["expires_at"],
+            len(row["payload_json"]),
+        )
+        return CacheEntry(candidates)
 
     def put_search_cache(
         self,
@@ -117,94 +258,337 @@ class SQLiteStore:
         filters: dict[str, Any],
         candidates: list[VideoCandidate],
         ttl_sec: int,
+        next_page_token: str | None = None,
     ) -> None:
         cache_key = self.build_search_cache_key(provider, query, filters)
+        now = _now()
+        expires_at = now + ttl_sec
+        payload = encode_candidates(candidates, self.payload_codec)
         with self.connect() as conn:
             conn.execute(
                 """
                 INSERT OR REPLACE INTO search_cache (
-                    cache_key, provider, query, filters_json, payload_json, expires_at, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                    cache_key, provider, query, filters_json, payload_json, payload_codec,
+                    expires_at, created_at, last_accessed_at, next_page_token
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     cache_key,
                     provider,
                     query,
                     json.dumps(filters, ensure_ascii=False, sort_keys=True),
-                    json.dumps([item.model_dump() for item in candidates], ensure_ascii=False),
-                    _iso_in(ttl_sec),
-                    _utc_now().isoformat(),
+                    payload,
+                    self.payload_codec,
+                    expires_at,
+                    now,
+                    now,
+                    next_page_token,
                 ),
             )
+        self._memory_put(
+            "search_cache", cache_key, [item.model_copy() for item in candidates], expires_at, len(payload)
+        )
+
+    def get_search_page_token(self, provider: str, query: str, filters: dict[str, Any]) -> str | None:
+        cache_key = self.build_search_cache_key(provider, query, filters)
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT next_page_token FROM search_cache WHERE cache_key = ? AND expires_at > ?",
+                (cache_key, _now() - self.stale_grace_sec.get("search_cache", 0)),
+            ).fetchone()
+        return row[0] if row else None
 
     def upsert_video_metadata(self, candidate: VideoCandidate, ttl_sec: int) -> None:
+        self.upsert_video_metadata_many([candidate], ttl_sec)
+
+    def upsert_video_metadata_many(self, candidates: list[VideoCandidate], ttl_sec: int) -> None:
+        if not candidates:
+            return
+        codec = self.payload_codec
+        updated_at = _now()
+        expires_at = updated_at + ttl_sec
+        rows = [
+            (
+                candidate.video_id,
+                encode_model(candidate, codec),
+                codec,
+                candidate.title,
+                candidate.description,
+                candidate.channel or "",
+                expires_at,
+                updated_at,
+            )
+            for candidate in candidates
+        ]
         with self.connect() as conn:
-            conn.execute(
+            # An upsert rather than OR REPLACE keeps the rowid stable and fires the full-text UPDATE trigger.
+            conn.executemany(
                 """
-                INSERT OR REPLACE INTO video_metadata_cache (video_id, payload_json, expires_at, updated_at)
-                VALUES (?, ?, ?, ?)
+                INSERT INTO video_metadata_cache (
+                    video_id, payload_json, payload_codec, title, description, channel, expires_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (video_id) DO UPDATE SET
+                    payload_json = excluded.payload_json,
+                    payload_codec = excluded.payload_codec,
+                    title = excluded.title,
+                    description = excluded.description,
+                    channel = excluded.channel,
+                    expires_at = excluded.expires_at,
+                    updated_at = excluded.updated_at
                 """,
-                (
-                    candidate.video_id,
-                    json.dumps(candidate.model_dump(), ensure_ascii=False),
-                    _iso_in(ttl_sec),
-                    _utc_now().isoformat(),
-                ),
+                rows,
+            )
+        for candidate, row in zip(candidates, rows):
+            self._memory_put(
+                "video_metadata_cache", candidate.video_id, candidate.model_copy(), expires_at, len(row[1])
             )
 
+    def get_video_metadata_many(self, video_ids: list[str]) -> dict[str, VideoCandidate]:
+        entries = self.get_video_metadata_entries(video_ids)
+        return {video_id: entry.value for video_id, entry in entries.items() if not entry.stale}
+
+    def get_video_metadata_entries(self, video_ids: list[str]) -> dict[str, CacheEntry[VideoCandidate]]:
+        results: dict[str, CacheEntry[VideoCandidate]] = {}
+        missing: list[str] = []
+        for video_id in dict.fromkeys(video_ids):
+            remembered = self._memory_get("video_metadata_cache", video_id)
+            if remembered is not None:
+                results[video_id] = CacheEntry(remembered.model_copy())
+            else:
+                missing.append(video_id)
+        if not missing:
+            return results
+        now = _now()
+        cutoff = now - self.stale_grace_sec.get("video_metadata_cache", 0)
+        with self.connect() as conn:
+            for chunk in _chunked(missing):
+                rows = conn.execute(
+                    f"""
+                    SELECT video_id, payload_json, payload_codec, expires_at
+                    FROM video_metadata_cache
+                    WHERE video_id IN ({_placeholders(len(chunk))}) AND expires_at > ?
+                    """,
+                    [*chunk, cutoff],
+                ).fetchall()
+                for row in rows:
+                    candidate = decode_model(row["payload_json"], row["payload_codec"], VideoCandidate)
+                    if row["expires_at"] <= now:
+                        results[row["video_id"]] = CacheEntry(candidate, stale=True)
+                        continue
+                    results[row["video_id"]] = CacheEntry(candidate)
+                    self._memory_put(
+                        "video_metadata_cache",
+                        row["video_id"],
+                        candidate.model_copy(),
+                        row["expires_at"],
+                        len(row["payload_json"]),
+                    )
+        return results
+
     def get_video_metadata(self, video_id: str) -> VideoCandidate | None:
+        return self.get_video_metadata_many([video_id]).get(video_id)
+
+    def has_full_text_index(self) -> bool:
         with self.connect() as conn:
-            row = conn.execute(
-                "SELECT payload_json, expires_at FROM video_metadata_cache WHERE video_id = ?",
-                (video_id,),
-            ).fetchone()
-        if not row or row["expires_at"] <= _utc_now().isoformat():
-            return None
-        return VideoCandidate.model_validate(json.loads(row["payload_json"]))
+            return has_full_text_index(conn)
 
-    def get_transcript_cache(self, video_id: str, provider: str) -> TranscriptResult | None:
+    def search_local_index(self, query: str, limit: int) -> list[VideoCandidate]:
+        tokens = re.findall(r"\w+", query.lower())
+        if not tokens or limit <= 0 or not self.has_full_text_index():
+            return []
+        match = " OR ".join(f'"{token}"' for token in dict.fromkeys(tokens))
+        scores: dict[str, float] = {}
         with self.connect() as conn:
-            row = conn.execute(
+            metadata_rows = conn.execute(
                 """
-                SELECT payload_json, expires_at
-                FROM transcript_cache
-                WHERE video_id = ? AND provider = ?
+                SELECT video_metadata_cache.video_id, bm25(video_metadata_fts, 4.0, 1.0, 2.0) AS score
+                FROM video_metadata_fts
+                JOIN video_metadata_cache ON video_metadata_cache.rowid = video_metadata_fts.rowid
+                WHERE video_metadata_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
                 """,
-                (video_id, provider),
-            ).fetchone()
-        if not row or row["expires_at"] <= _utc_now().isoformat():
-            return None
-        return TranscriptResult.model_validate(json.loads(row["payload_json"]))
+                (match, limit * 4),
+            ).fetchall()
+            transcript_rows = conn.execute(
+                """
+                SELECT transcript_cache.video_id, MIN(hits.score) AS score
+                FROM (
+                    SELECT rowid, bm25(transcript_fts) AS score
+                    FROM transcript_fts
+                    WHERE transcript_fts MATCH ?
+                    ORDER BY score
+                    LIMIT ?
+                ) AS hits
+                JOIN transcript_blob ON transcript_blob.rowid = hits.rowid
+                JOIN transcript_cache ON transcript_cache.text_hash = transcript_blob.text_hash
+                GROUP BY transcript_cache.video_id
+                """,
+                (match, limit * 4),
+            ).fetchall()
+            # bm25() is negative with lower meaning better, so matches in both indexes add up.
+            for row in [*metadata_rows, *transcript_rows]:
+                scores[row["video_id"]] = scores.get(row["video_id"], 0.0) + row["score"]
+            ranked = sorted(scores, key=lambda video_id: (scores[video_id], video_id))
+            candidates: dict[str, VideoCandidate] = {}
+            for chunk in _chunked(ranked):
+                # Expired metadata is still good enough to rediscover a video offline.
+                rows = conn.execute(
+                    f"""
+                    SELECT video_id, payload_json, payload_codec
+                    FROM video_metadata_cache
+                    WHERE video_id IN ({_placeholders(len(chunk))})
+                    """,
+                    chunk,
+                ).fetchall()
+                for row in rows:
+                    candidate = decode_model(row["payload_json"], row["payload_codec"], VideoCandidate)
+                    candidates[row["video_id"]] = candidate
+        return [candidates[video_id] for video_id in ranked if video_id in candidates][:limit]
+
+    def get_transcript_cache(self, video_id: str, provider: str) -> TranscriptResult | None:
+        return self.get_transcript_cache_many([video_id], [provider]).get((video_id, provider))
+
+    def get_transcript_cache_many(
+        self,
+        video_ids: list[str],
+        providers: list[str],
+    ) -> dict[tuple[str, str], TranscriptResult]:
+        unique_providers = list(dict.fromkeys(providers))
+        results: dict[tuple[str, str], TranscriptResult] = {}
+        missing: list[str] = []
+        remembered_keys: list[tuple[str, str]] = []
+        for video_id in dict.fromkeys(video_ids):
+            complete = True
+            for provider in unique_providers:
+                remembered = self._memory_get("transcript_cache", (video_id, provider))
+                if remembered is not None:
+                    results[(video_id, provider)] = remembered.model_copy()
+                    remembered_keys.append((video_id, provider))
+                else:
+                    complete = False
+            if not complete:
+                missing.append(video_id)
+        if remembered_keys:
+            self._record_memory_hits("transcript_cache", remembered_keys)
+        if not missing or not unique_providers:
+            return results
+        now = _now()
+        touched: list[tuple[str, str]] = []
+        with self.connect() as conn:
+            for chunk in _chunked(missing, _MAX_IN_PARAMS - len(unique_providers) - 1):
+                rows = conn.execute(
+                    f"""
+                    SELECT
+                        tc.video_id, tc.provider, tc.payload_json, tc.payload_codec, tc.expires_at, tc.text_hash,
+                        tb.raw_size
+                    FROM transcript_cache AS tc
+                    LEFT JOIN transcript_blob AS tb ON tb.text_hash = tc.text_hash
+                    WHERE tc.video_id IN ({_placeholders(len(chunk))})
+                      AND tc.provider IN ({_placeholders(len(unique_providers))})
+                      AND tc.expires_at > ?
+                      AND (tc.text_hash IS NULL OR tb.text_hash IS NOT NULL)
+                    """,
+                    [*chunk, *unique_providers, now],
+                ).fetchall()
+                for row in rows:
+                    key = (row["video_id"], row["provider"])
+                    if key in results:
+                        continue
+                    transcript = self._transcript_from_row(row)
+                    results[key] = transcript
+                    touched.append(key)
+                    self._memory_put(
+                        "transcript_cache",
+                        key,
+                        transcript.model_copy(),
+                        row["expires_at"],
+                        len(row["payload_json"]) + (row["raw_size"] or 0),
+                    )
+            if touched:
+                conn.executemany(
+                    "UPDATE transcript_cache SET last_accessed_at = ? WHERE video_id = ? AND provider = ?",
+                    [(now, video_id, provider) for video_id, provider in touched],
+                )
+        return results
 
     def put_transcript_cache(self, transcript: TranscriptResult, ttl_sec: int) -> None:
+        now = _now()
+        expires_at = now + ttl_sec
+        text = transcript.text
+        digest = text_hash(text) if text else None
+        payload = encode_model(transcript, self.payload_codec, exclude={"text"})
         with self.connect() as conn:
+            if digest:
+                exists = conn.execute("SELECT 1 FROM transcript_blob WHERE text_hash = ?", (digest,)).fetchone()
+                if not exists:
+                    conn.execute(
+                        """
+                        INSERT OR IGNORE INTO transcript_blob (text_hash, codec, data, raw_size, created_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        (digest, self.transcript_codec, compress_text(text, self.transcript_codec), len(text), now),
+                    )
             conn.execute(
                 """
-                INSERT OR REPLACE INTO transcript_cache (video_id, provider, status, payload_json, expires_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?)
+                INSERT OR REPLACE INTO transcript_cache (
+                    video_id, provider, status, payload_json, payload_codec,
+                    expires_at, updated_at, last_accessed_at, text_hash
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     transcript.video_id,
                     transcript.source,
                     transcript.status,
-                    json.dumps(transcript.model_dump(), ensure_ascii=False),
-                    _iso_in(ttl_sec),
-                    _utc_now().isoformat(),
+                    payload,
+                    self.payload_codec,
+                    expires_at,
+                    now,
+                    now,
+                    digest,
                 ),
             )
+        self._memory_put(
+            "transcript_cache",
+            (transcript.video_id, transcript.source),
+            transcript.model_copy(),
+            expires_at,
+            len(payload) + len(text or ""),
+        )
+
+    def _transcript_from_row(self, row) -> TranscriptResult:
+        digest = row["text_hash"]
+        if not digest:
+            # Rows written before blob storage still carry their text inline.
+            return decode_model(row["payload_json"], row["payload_codec"], TranscriptResult)
+        transcript = decode_model(row["payload_json"], row["payload_codec"], LazyTranscriptResult)
+        # Capture only plain values: the closure is kept by the process-wide memory cache.
+        db_path, memory_cache, key = self.db_path, self.memory_cache, (row["video_id"], row["provider"])
+
+        def load() -> str | None:
+            text = load_blob_text(db_path, digest)
+            if text is None and memory_cache is not None:
+                # The blob was evicted after this copy was cached; stop serving the entry from memory.
+                memory_cache.discard("transcript_cache", key)
+            return text
+
+        return transcript.attach_text(LazyText(load))
 
     def get_provider_cooldown(self, provider: str) -> str | None:
         with self.connect() as conn:
             row = conn.execute(
-                "SELECT cooldown_until FROM provider_health WHERE provider = ?",
-                (provider,),
+                "SELECT cooldown_until FROM provider_health WHERE provider = ? AND cooldown_until > ?",
+                (provider, _now()),
             ).fetchone()
-        if not row:
-            return None
-        cooldown_until = row["cooldown_until"]
-        if cooldown_until and cooldown_until > _utc_now().isoformat():
-            return cooldown_until
-        return None
+        return _iso_from_epoch(row["cooldown_until"]) if row else None
+
+    def get_provider_cooldowns(self) -> dict[str, str]:
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT provider, cooldown_until FROM provider_health WHERE cooldown_until > ?",
+                (_now(),),
+            ).fetchall()
+        return {row["provider"]: _iso_from_epoch(row["cooldown_until"]) for row in rows}
 
     def mark_provider_cooldown(self, provider: str, error: str, cooldown_sec: int) -> None:
         with self.connect() as conn:
@@ -213,7 +597,7 @@ class SQLiteStore:
                 INSERT OR REPLACE INTO provider_health (provider, cooldown_until, last_error, updated_at)
                 VALUES (?, ?, ?, ?)
                 """,
-                (provider, _iso_in(cooldown_sec), error, _utc_now().isoformat()),
+                (provider, _epoch_in(cooldown_sec), error, _now()),
             )
 
     def clear_provider_cooldown(self, provider: str) -> None:
@@ -223,42 +607,143 @@ class SQLiteStore:
                 INSERT OR REPLACE INTO provider_health (provider, cooldown_until, last_error, updated_at)
                 VALUES (?, NULL, NULL, ?)
                 """,
-                (provider, _utc_now().isoformat()),
+                (provider, _now()),
             )
 
-    def create_run(self, run_id: str, topic: str, filters: dict[str, Any]) -> None:
+    def get_api_quota_used(self, key_id: str, day: str) -> int:
         with self.connect() as conn:
-            conn.execute(
+            row = conn.execute(
+                "SELECT units_used FROM api_quota_usage WHERE key_id = ? AND day = ?",
+                (key_id, day),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def reserve_api_quota(self, key_id: str, day: str, units: int, limit: int) -> bool:
+        # One statement, so concurrent processes sharing the database cannot both take the last units.
+        if units > limit:
+            return False
+        with self.connect() as conn:
+            cursor = conn.execute(
                 """
-                INSERT OR REPLACE INTO run (run_id, topic, filters_json, created_at, result_json)
-                VALUES (?, ?, ?, ?, NULL)
+                INSERT INTO api_quota_usage (key_id, day, units_used, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (key_id, day) DO UPDATE SET
+                    units_used = units_used + excluded.units_used,
+                    updated_at = excluded.updated_at
+                WHERE units_used + excluded.units_used <= ?
                 """,
-                (run_id, topic, json.dumps(filters, ensure_ascii=False), _utc_now().isoformat()),
+                (key_id, day, units, _now(), limit),
             )
+            return cursor.rowcount > 0
 
-    def add_run_subtopic(self, run_id: str, position: int, payload: dict[str, Any]) -> None:
+    def set_api_quota_used(self, key_id: str, day: str, units: int) -> None:
         with self.connect() as conn:
             conn.execute(
                 """
-                INSERT OR REPLACE INTO run_subtopic (run_id, position, subtopic_json)
-                VALUES (?, ?, ?)
+                INSERT INTO api_quota_usage (key_id, day, units_used, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (key_id, day) DO UPDATE SET
+                    units_used = MAX(units_used, excluded.units_used),
+                    updated_at = excluded.updated_at
                 """,
-                (run_id, position, json.dumps(payload, ensure_ascii=False)),
+                (key_id, day, units, _now()),
             )
 
-    def add_run_video(self, run_id: str, stage: str, video_id: str, payload: dict[str, Any]) -> None:
+    def create_run(self, run_id: str, topic: str, filters: dict[str, Any], request_key: str | None = None) -> None:
         with self.connect() as conn:
             conn.execute(
                 """
-                INSERT OR REPLACE INTO run_video (run_id, stage, video_id, payload_json)
-                VALUES (?, ?, ?, ?)
+                INSERT OR REPLACE INTO run (run_id, topic, filters_json, created_at, result_json, request_key)
+                VALUES (?, ?, ?, ?, NULL, ?)
                 """,
-                (run_id, stage, video_id, json.dumps(payload, ensure_ascii=False)),
+                (run_id, topic, json.dumps(filters, ensure_ascii=False), _now(), request_key),
+            )
+
+    def get_recent_run_result(self, request_key: str, max_age_sec: int) -> PlaylistResult | None:
+        with self.connect() as conn:
+            row = conn.execute(
+                """
+                SELECT result_json FROM run
+                WHERE request_key = ? AND result_json IS NOT NULL AND created_at >= ?
+                ORDER BY created_at DESC
+                LIMIT 1
+                """,
+                (request_key, _now() - max_age_sec),
+            ).fetchone()
+        return PlaylistResult.model_validate_json(row[0]) if row else None
+
+    def set_run_subtopics(self, run_id: str, subtopics: list[Subtopic]) -> None:
+        with self.connect() as conn:
+            conn.execute(
+                "UPDATE run SET subtopics_json = ? WHERE run_id = ?",
+                (json.dumps([subtopic.model_dump() for subtopic in subtopics], ensure_ascii=False), run_id),
             )
 
+    def load_run_checkpoint(self, run_id: str) -> RunCheckpoint | None:
+        self.flush_journal()
+        with self.connect() as conn:
+            run = conn.execute(
+                "SELECT topic, filters_json, subtopics_json FROM run WHERE run_id = ?",
+                (run_id,),
+            ).fetchone()
+            if run is None:
+                return None
+            subtopic_rows = conn.execute(
+                "SELECT position, subtopic_json FROM run_subtopic WHERE run_id = ? ORDER BY position",
+                (run_id,),
+            ).fetchall()
+            video_rows = conn.execute(
+                "SELECT stage, video_id, payload_json FROM run_video WHERE run_id = ?",
+                (run_id,),
+            ).fetchall()
+
+        transcripts: dict[str, TranscriptResult] = {}
+        recommendations: dict[str, Recommendation] = {}
+        for stage, video_id, payload_json in video_rows:
+            if stage == "transcript":
+                transcripts[video_id] = TranscriptResult.model_validate_json(payload_json)
+            elif stage == "recommendation":
+                recommendations[video_id] = Recommendation.model_validate_json(payload_json)
+
+        # Subtopics are journaled in selection order, so only the unbroken prefix is known to be final.
+        completed: list[tuple[SubtopicResult, Recommendation | None]] = []
+        for position, subtopic_json in subtopic_rows:
+            if position != len(completed) + 1:
+                break
+            result = SubtopicResult.model_validate_json(subtopic_json)
+            recommendation = recommendations.get(result.selected_video_id) if result.selected_video_id else None
+            if result.selected_video_id and recommendation is None:
+                break
+            completed.append((result, recommendation))
+
+        topic, filters_json, subtopics_json = run
+        return RunCheckpoint(
+            run_id=run_id,
+            topic=topic,
+            filters=json.loads(filters_json),
+            subtopics=(
+                [Subtopic.model_validate(item) for item in json.loads(subtopics_json)] if subtopics_json else None
+            ),
+            completed=completed,
+            transcripts=transcripts,
+        )
+
+    def add_run_subtopic(self, run_id: str, position: int, payload: dict[str, Any]) -> None:
+        self._journal("run_subtopic", (run_id, position, payload))
+
+    def add_run_video(self, run_id: str, stage: str, video_id: str, payload: dict[str, Any]) -> None:
+        self._journal("run_video", (run_id, stage, video_id, payload))
+
+    def _journal(self, kind: str, row: tuple[Any, ...]) -> None:
+        if self.journal is not None:
+            self.journal.submit(kind, row)
+            return
+        with self.connect() as conn:
+            write_journal_rows(conn, kind, [row])
+
     def finalize_run(self, run_id: str, result: PlaylistResult) -> None:
+        # Everything journaled for the run must be durable before the run is marked complete.
+        self.flush_journal()
         with self.connect() as conn:
             conn.execute(
                 "UPDATE run SET result_json = ? WHERE run_id = ?",
-                (json.dumps(result.model_dump(), ensure_ascii=False), run_id),
+                (result.model_dump_json(), run_id),
             )
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import zlib
+from typing import Any, Callable
+
+from pydantic import PrivateAttr
+
+from src.models import TranscriptResult
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def compress_text(text: str, codec: str) -> bytes:
+    raw = text.encode("utf-8")
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=10).compress(raw)
+    if codec == "zlib":
+        return zlib.compress(raw, 6)
+    raise ValueError(f"Unsupported transcript codec: {codec}")
+
+
+def decompress_text(data: bytes, codec: str) -> str:
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    raise ValueError(f"Unsupported transcript codec: {codec}")
+
+
+def load_blob_text(db_path: str, digest: str) -> str | None:
+    # A short-lived connection of its own: lazy transcripts outlive the store that read them (they sit in the shared
+    # memory cache), so they must not hold on to that store or its pooled connections.
+    conn = sqlite3.connect(db_path, timeout=5)
+    try:
+        row = conn.execute("SELECT codec, data FROM transcript_blob WHERE text_hash = ?", (digest,)).fetchone()
+    finally:
+        conn.close()
+    return decompress_text(row[1], row[0]) if row else None
+
+
+def register_sql_functions(conn) -> None:
+    # Used by the transcript_fts triggers, which index text that is only stored compressed.
+    conn.create_function(
+        "fts_transcript_text",
+        2,
+        lambda data, codec: decompress_text(data, codec) if data is not None else "",
+        deterministic=True,
+    )
+
+
+class LazyText:
+    # Shared by every copy of a cached transcript so the blob is decompressed at most once.
+    def __init__(self, loader: Callable[[], str | None]):
+        self._loader: Callable[[], str | None] | None = loader
+        self._value: str | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> str | None:
+        with self._lock:
+            if self._loader is not None:
+                self._value = self._loader()
+                self._loader = None
+            return self._value
+
+
+class LazyTranscriptResult(TranscriptResult):
+    _lazy_text: LazyText | None = PrivateAttr(default=None)
+
+    def attach_text(self, lazy_text: LazyText) -> "LazyTranscriptResult":
+        self._lazy_text = lazy_text
+        return self
+
+    def __getattribute__(self, name: str) -> Any:
+        # status is resolved with the text: a blob evicted since the row was read must not read as "available".
+        if name in ("text", "status"):
+            private = object.__getattribute__(self, "__pydantic_private__")
+            lazy_text = private.get("_lazy_text") if private else None
+            if lazy_text is not None:
+                fields = object.__getattribute__(self, "__dict__")
+                fields["text"] = lazy_text.get()
+                private["_lazy_text"] = None
+                if fields["text"] is None and fields["status"] == "available":
+                    fields["status"] = "failed_temporary"
+                    fields["error"] = "Cached transcript text is no longer stored"
+        return super().__getattribute__(name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        private = getattr(self, "__pydantic_private__", None)
+        if name == "text" and private:
+            private["_lazy_text"] = None
+        super().__setattr__(name, value)
+
+    def model_dump(self, **kwargs: Any) -> dict[str, Any]:
+        self.text  # noqa: B018 - materialize before pydantic-core reads the field directly
+        return super().model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs: Any) -> str:
+        self.text  # noqa: B018
+        return super().model_dump_json(**kwargs)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.config import AppConfig
+
+
+@dataclass
+class HttpStats:
+    requests: int = 0
+    connections: int = 0
+
+    @property
+    def reused(self) -> int:
+        # Requests served on an already open keep-alive connection, i.e. TCP+TLS handshakes saved.
+        return max(0, self.requests - self.connections)
+
+
+class HttpClient:
+    # One requests.Session shared by every provider and thread. urllib3's pools are thread-safe; pool_block caps the
+    # open connections per host at pool_maxsize, and callers beyond that wait for a free connection.
+    def __init__(self, pool_maxsize: int = 10, connect_timeout: float = 5, read_timeout: float = 30):
+        self.timeout = (connect_timeout, read_timeout)
+        self._stats = HttpStats()
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._session.headers["Accept-Encoding"] = "gzip, deflate"
+        self._session.headers["Connection"] = "keep-alive"
+        adapter = _CountingAdapter(
+            self._record_connection,
+            pool_connections=8,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def get(
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        timeout: float | tuple[float, float] | None = None,
+    ) -> requests.Response:
+        with self._lock:
+            self._stats.requests += 1
+        return self._session.get(url, params=params, timeout=timeout or self.timeout)
+
+    def stats(self) -> HttpStats:
+        with self._lock:
+            return HttpStats(self._stats.requests, self._stats.connections)
+
+    def close(self) -> None:
+        self._session.close()
+
+    def _record_connection(self) -> None:
+        with self._lock:
+            self._stats.connections += 1
+
+
+class _CountingAdapter(HTTPAdapter):
+    def __init__(self, on_connect: Callable[[], None], **kwargs):
+        self._on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        # Count real connects (including reconnects after the server drops an idle connection), not pool checkouts.
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _counting_pool_class(pool_class, self._on_connect)
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+
+def _counting_pool_class(pool_class, on_connect: Callable[[], None]):
+    class CountingConnection(pool_class.ConnectionCls):
+        def connect(self):
+            on_connect()
+            super().connect()
+
+    return type(pool_class.__name__, (pool_class,), {"ConnectionCls": CountingConnection})
+
+
+_shared_lock = threading.Lock()
+_shared_clients: dict[tuple[int, int, int], HttpClient] = {}
+
+
+def shared_http_client(config: AppConfig) -> HttpClient:
+    key = (config.http_pool_maxsize, config.http_connect_timeout_sec, config.request_timeout_sec)
+    with _shared_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = HttpClient(
+                pool_maxsize=config.http_pool_maxsize,
+                connect_timeout=config.http_connect_timeout_sec,
+                read_timeout=config.request_timeout_sec,
+            )
+            _shared_clients[key] = client
+        return client
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+class TokenBucket:
+    # Refills `rate` tokens per second up to `capacity`. While an interactive caller is waiting, batch callers do not
+    # take tokens, so a UI run is never queued behind a batch job's backlog.
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._interactive_waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, interactive: bool = True) -> None:
+        with self._cond:
+            if interactive:
+                self._interactive_waiting += 1
+            try:
+                while True:
+                    self._refill()
+                    if self._tokens >= 1 and (interactive or not self._interactive_waiting):
+                        self._tokens -= 1
+                        return
+                    self._cond.wait(max((1 - self._tokens) / self.rate, 0.01))
+            finally:
+                if interactive:
+                    self._interactive_waiting -= 1
+                    self._cond.notify_all()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
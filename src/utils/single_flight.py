@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    # Concurrent calls with the same key share one execution; nothing is remembered once it finishes (the caches
+    # behind each call cover that). Threads and coroutines wait on the same concurrent.futures.Future, so a
+    # Streamlit session and an asyncio pipeline coalesce with each other too.
+    def __init__(self):
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                return self._lead(key, future, func)
+            try:
+                return future.result()
+            except CancelledError:
+                # The leader was cancelled, not failed; try again, possibly as the new leader.
+                continue
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                try:
+                    result = await func()
+                except asyncio.CancelledError:
+                    self._finish(key, future)
+                    future.cancel()
+                    raise
+                except BaseException as exc:
+                    self._finish(key, future)
+                    future.set_exception(exc)
+                    raise
+                self._finish(key, future)
+                future.set_result(result)
+                return result
+            try:
+                # shield() keeps one waiter's cancellation from cancelling the shared call.
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    continue
+                raise
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _lead(self, key: Hashable, future: Future, func: Callable[[], T]) -> T:
+        try:
+            result = func()
+        except BaseException as exc:
+            self._finish(key, future)
+            future.set_exception(exc)
+            raise
+        self._finish(key, future)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
@@ -22,6 +22,25 @@ def normalize_text(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip()
 
 
+def language_matches(candidate_language: str, requested_language: str) -> bool:
+    # Prefix match, so regional tags such as "en-US" satisfy a request for "en".
+    return candidate_language.lower().startswith(requested_language.lower())
+
+
+def canonicalize_query(
+    query: str,
+    lowercase: bool = True,
+    collapse_whitespace: bool = True,
+    sort_tokens: bool = False,
+) -> str:
+    canonical = normalize_text(query) if collapse_whitespace else query
+    if lowercase:
+        canonical = canonical.lower()
+    if sort_tokens:
+        canonical = " ".join(sorted(canonical.split()))
+    return canonical
+
+
 def slugify_text(text: str) -> str:
     normalized = normalize_text(text).lower()
     normalized = re.sub(r"[^a-z0-9\s-]", "", normalized)
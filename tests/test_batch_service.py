@@ -0,0 +1,96 @@
+import threading
+from pathlib import Path
+
+from src.config import AppConfig
+from src.models import MetadataScore, TranscriptResult, VideoCandidate
+from src.services import batch_service, playlist_service
+
+
+class DummyLLM:
+    def generate_subtopics(self, topic: str, language: str):
+        return ["Foundations", "Practice"]
+
+
+def test_load_batch_requests_from_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / "requests.csv"
+    csv_path.write_text("topic,language,max_duration_minutes\nPython,tr,30\n,en,\nRust,,\n", encoding="utf-8")
+    jsonl_path = tmp_path / "requests.jsonl"
+    jsonl_path.write_text('{"topic": "Go", "filters": {"difficulty": "beginner"}}\n\n', encoding="utf-8")
+
+    from_csv = batch_service.load_batch_requests(csv_path)
+    from_jsonl = batch_service.load_batch_requests(jsonl_path)
+
+    assert [(item.topic, item.filters.language, item.filters.max_duration_minutes) for item in from_csv] == [
+        ("Python", "tr", 30),
+        ("Rust", "en", 60),
+    ]
+    assert from_jsonl[0].topic == "Go"
+    assert from_jsonl[0].filters.difficulty == "beginner"
+
+
+def test_batch_shares_lookups_across_runs(monkeypatch, tmp_path):
+    config = AppConfig(
+        gemini_api_key="test",
+        gemini_model="gemini-test",
+        data_dir=str(tmp_path),
+        sqlite_path=str(tmp_path / "cache" / "app.db"),
+        result_cache_ttl_sec=0,
+    )
+    config.ensure_directories()
+    candidates = [
+        VideoCandidate(video_id=f"video-{index}", url=f"https://example.com/{index}", title=f"Video {index}")
+        for index in range(3)
+    ]
+    score = MetadataScore(
+        total=5.0,
+        title_relevance=1.0,
+        description_relevance=1.0,
+        channel_quality=1.0,
+        duration_fit=1.0,
+        language_match=1.0,
+        freshness=0.0,
+        engagement=0.0,
+    )
+    lock = threading.Lock()
+    calls = {"llm": 0, "search": 0, "transcript": 0}
+
+    class CountingLLM(DummyLLM):
+        def generate_subtopics(self, topic: str, language: str):
+            with lock:
+                calls["llm"] += 1
+            return super().generate_subtopics(topic, language)
+
+    def fake_search(config, store, query, filters, logger=None):
+        with lock:
+            calls["search"] += 1
+        return candidates
+
+    def fake_get_transcript(config, store, candidate, run_dir, state, logger=None):
+        with lock:
+            calls["transcript"] += 1
+        return TranscriptResult(video_id=candidate.video_id, status="available", source="asr", text="text")
+
+    monkeypatch.setattr(batch_service, "GeminiLLMProvider", lambda config: CountingLLM())
+    monkeypatch.setattr(playlist_service, "search_candidates", fake_search)
+    monkeypatch.setattr(playlist_service, "get_transcript", fake_get_transcript)
+    monkeypatch.setattr(
+        playlist_service,
+        "rank_candidates",
+        lambda candidates, topic, subtopic, filters: [(candidate, score) for candidate in candidates],
+    )
+
+    requests = batch_service.load_batch_requests(_write_jsonl(tmp_path, ["Topic", "Topic", "Topic"]))
+    summary = batch_service.run_batch(config, requests, workers=3)
+
+    assert len(summary.results) == 3
+    assert len({result.run_id for result in summary.results}) == 3
+    assert all(Path(result.exports.json_path).exists() for result in summary.results)
+    assert calls == {"llm": 1, "search": 2, "transcript": 3}
+    assert summary.deduplicated == {"subtopics": 2, "search": 4, "transcript": 6}
+    assert "runs/min" in batch_service.format_batch_summary(summary)
+
+
+def _write_jsonl(tmp_path, topics):
+    path = tmp_path / "requests.jsonl"
+    path.write_text("".join(f'{{"topic": "{topic}"}}\n' for topic in topics), encoding="utf-8")
+    return path
@@ -0,0 +1,52 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.config import AppConfig
+from src.providers.ytdlp_provider import YtDlpProvider
+from src.utils.http_client import HttpClient, shared_http_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = f"hello {self.path}".encode()
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            body = gzip.compress(body)
+        self.send_response(200)
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_http_client_reuses_keep_alive_connections_and_decodes_gzip():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = HttpClient(pool_maxsize=2, connect_timeout=2, read_timeout=5)
+    try:
+        base = f"http://127.0.0.1:{server.server_port}"
+        texts = [client.get(f"{base}/{index}").text for index in range(5)]
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+    assert texts == [f"hello /{index}" for index in range(5)]
+    stats = client.stats()
+    assert (stats.requests, stats.connections, stats.reused) == (5, 1, 4)
+
+
+def test_providers_share_the_pooled_client_unless_one_is_injected(tmp_path):
+    config = AppConfig(gemini_api_key="test", data_dir=str(tmp_path), sqlite_path=str(tmp_path / "app.db"))
+    injected = HttpClient()
+
+    assert YtDlpProvider(config).http is shared_http_client(config)
+    assert YtDlpProvider(config, http=injected).http is injected
@@ -1,23 +1,111 @@
+import asyncio
+import threading
 from pathlib import Path
 
 from src.config import AppConfig
-from src.models import FilterOptions, MetadataScore, PlaylistRequest, Subtopic, TranscriptResult, VideoCandidate
+from src.models import (
+    FilterOptions,
+    MetadataScore,
+    PlaylistRequest,
+    PlaylistResult,
+    Recommendation,
+    SubtopicResult,
+    TranscriptResult,
+    VideoCandidate,
+)
 from src.services import playlist_service
 
+# Every candidate ranks the same, so picks follow search order.
+EQUAL_SCORE = MetadataScore(
+    total=5.0,
+    title_relevance=1.0,
+    description_relevance=1.0,
+    channel_quality=1.0,
+    duration_fit=1.0,
+    language_match=1.0,
+    freshness=0.0,
+    engagement=0.0,
+)
+
 
 class DummyLLM:
     def generate_subtopics(self, topic: str, language: str):
         return ["Foundations", "Advanced Practice"]
 
 
-def test_playlist_prevents_duplicate_processing_and_exports(monkeypatch, tmp_path):
+class FourSubtopicLLM:
+    def generate_subtopics(self, topic: str, language: str):
+        return ["Alpha", "Beta", "Gamma", "Delta"]
+
+
+class FakePipeline:
+    # Stands in for search and transcript providers and records what a run asked them for.
+    def __init__(self, candidates: list[VideoCandidate] | None, transcript_status: str, transcript_text: str):
+        self.candidates = candidates
+        self.transcript_status = transcript_status
+        self.transcript_text = transcript_text
+        self.searched: list[str] = []
+        self.transcript_calls: list[str] = []
+
+    def search(self, config, store, query, filters, logger=None, details=None):
+        self.searched.append(query)
+        return list(self.candidates)
+
+    def get_transcript(self, config, store, candidate, run_dir, state, logger=None):
+        self.transcript_calls.append(candidate.video_id)
+        available = self.transcript_status == "available"
+        return TranscriptResult(
+            video_id=candidate.video_id,
+            status=self.transcript_status,
+            source="asr",
+            text=self.transcript_text if available else None,
+        )
+
+
+def _config(tmp_path, **overrides):
     config = AppConfig(
         gemini_api_key="test",
         gemini_model="gemini-test",
         data_dir=str(tmp_path),
         sqlite_path=str(tmp_path / "cache" / "app.db"),
+        **overrides,
     )
     config.ensure_directories()
+    return config
+
+
+def _candidates(count: int) -> list[VideoCandidate]:
+    return [
+        VideoCandidate(video_id=f"video-{index}", url=f"https://example.com/{index}", title=f"Video {index}")
+        for index in range(count)
+    ]
+
+
+def _fake_pipeline(
+    monkeypatch,
+    candidates: list[VideoCandidate] | None = None,
+    llm=DummyLLM,
+    rank_equally: bool = True,
+    transcript_status: str = "available",
+    transcript_text: str = "text",
+) -> FakePipeline:
+    # candidates=None keeps the real search path; rank_equally=False keeps the real ranker.
+    fake = FakePipeline(candidates, transcript_status, transcript_text)
+    monkeypatch.setattr(playlist_service, "GeminiLLMProvider", lambda config: llm())
+    monkeypatch.setattr(playlist_service, "get_transcript", fake.get_transcript)
+    if candidates is not None:
+        monkeypatch.setattr(playlist_service, "search_candidates", fake.search)
+    if rank_equally:
+        monkeypatch.setattr(
+            playlist_service,
+            "rank_candidates",
+            lambda candidates, topic, subtopic, filters: [(candidate, EQUAL_SCORE) for candidate in candidates],
+        )
+    return fake
+
+
+def test_playlist_prevents_duplicate_processing_and_exports(monkeypatch, tmp_path):
+    config = _config(tmp_path)
 
     candidates = [
         VideoCandidate(
@@ -98,3 +186,198 @@ def test_playlist_prevents_duplicate_processing_and_exports(monkeypatch, tmp_pat
     assert result.exports is not None
     assert Path(result.exports.json_path).exists()
     assert Path(result.exports.markdown_path).exists()
+
+
+def test_parallel_subtopics_match_serial_output(monkeypatch, tmp_path):
+    fake = _fake_pipeline(monkeypatch, _candidates(4), llm=FourSubtopicLLM)
+
+    outputs = []
+    for workers in (1, 4):
+        config = _config(tmp_path / str(workers), metadata_top_k=3, subtopic_workers=workers)
+        events = []
+        fake.transcript_calls.clear()
+        request = PlaylistRequest(topic="Topic")
+        result = playlist_service.build_playlist(config, request, progress_callback=events.append)
+        assert sorted(fake.transcript_calls) == ["video-0", "video-1", "video-2"]
+        if workers > 1:
+            progress = [event.progress for event in events]
+            assert progress == sorted(progress)
+        assert sum(event.stage == "transcript_enrichment" for event in events) == 4
+        outputs.append(result.model_dump(exclude={"run_id", "created_at", "exports"}))
+
+    assert outputs[0] == outputs[1]
+
+
+def test_async_pipeline_matches_sync_output(monkeypatch, tmp_path):
+    fake = _fake_pipeline(monkeypatch, _candidates(3))
+
+    async def fake_search_async(*args, **kwargs):
+        await asyncio.sleep(0)
+        return fake.search(*args, **kwargs)
+
+    async def fake_get_transcript_async(*args, **kwargs):
+        await asyncio.sleep(0)
+        return fake.get_transcript(*args, **kwargs)
+
+    monkeypatch.setattr(playlist_service, "search_candidates_async", fake_search_async)
+    monkeypatch.setattr(playlist_service, "get_transcript_async", fake_get_transcript_async)
+
+    outputs = []
+    for mode in ("sync", "async"):
+        config = _config(tmp_path / mode)
+        fake.transcript_calls.clear()
+        request = PlaylistRequest(topic="Topic")
+        if mode == "sync":
+            result = playlist_service.build_playlist(config, request)
+        else:
+            result = asyncio.run(playlist_service.build_playlist_async(config, request))
+        assert sorted(fake.transcript_calls) == ["video-0", "video-1", "video-2"]
+        outputs.append(result.model_dump(exclude={"run_id", "created_at", "exports"}))
+
+    assert outputs[0] == outputs[1]
+
+
+def test_iter_playlist_yields_recommendations_before_later_subtopics_run(monkeypatch, tmp_path):
+    fake = _fake_pipeline(monkeypatch, _candidates(2))
+
+    items = playlist_service.iter_playlist(_config(tmp_path), PlaylistRequest(topic="Topic"))
+    assert isinstance(next(items), SubtopicResult)
+    first = next(items)
+    assert isinstance(first, Recommendation)
+    assert fake.searched == ["Topic Foundations"]
+
+    rest = list(items)
+    result = rest[-1]
+    assert isinstance(result, PlaylistResult)
+    assert [item.video.video_id for item in result.recommendations] == [first.video.video_id, "video-1"]
+    assert result.exports is not None
+
+
+def test_lazy_enrichment_only_fetches_picked_transcripts(monkeypatch, tmp_path):
+    fake = _fake_pipeline(monkeypatch, _candidates(4), transcript_text="foundations")
+
+    outputs = {}
+    for mode, workers in (("eager", 1), ("lazy", 1), ("lazy", 2)):
+        key = f"{mode}-{workers}"
+        config = _config(tmp_path / key, transcript_enrichment_mode=mode, subtopic_workers=workers)
+        fake.transcript_calls.clear()
+        result = playlist_service.build_playlist(config, PlaylistRequest(topic="Topic"))
+        if key == "eager-1":
+            assert sorted(fake.transcript_calls) == ["video-0", "video-1", "video-2", "video-3"]
+        elif key == "lazy-1":
+            assert fake.transcript_calls == ["video-0", "video-1"]
+        else:
+            # In parallel both subtopics guess video-0 first; selection then fetches the second subtopic's real pick.
+            assert sorted(fake.transcript_calls) == ["video-0", "video-1"]
+        outputs[key] = result.model_dump(exclude={"run_id", "created_at", "exports"})
+
+    assert outputs["eager-1"] == outputs["lazy-1"] == outputs["lazy-2"]
+
+
+def test_resume_run_reuses_journaled_subtopics_and_transcripts(monkeypatch, tmp_path):
+    config = _config(tmp_path)
+    fake = _fake_pipeline(monkeypatch, _candidates(2))
+
+    events = []
+    request = PlaylistRequest(topic="Topic")
+    items = playlist_service.iter_playlist(config, request, progress_callback=events.append)
+    next(items)
+    first = next(items)
+    items.close()
+    run_id = events[-1].run_id
+
+    class FailingLLM:
+        def generate_subtopics(self, topic: str, language: str):
+            raise AssertionError("subtopics should come from the journal")
+
+    monkeypatch.setattr(playlist_service, "GeminiLLMProvider", lambda config: FailingLLM())
+    fake.searched.clear()
+    fake.transcript_calls.clear()
+    result = playlist_service.build_playlist(config, request, resume_run_id=run_id)
+
+    assert result.run_id == run_id
+    assert fake.searched == ["Topic Advanced Practice"]
+    assert fake.transcript_calls == []
+    assert [item.video.video_id for item in result.recommendations] == [first.video.video_id, "video-1"]
+    assert [item.subtopic.title for item in result.subtopics] == ["Foundations", "Advanced Practice"]
+
+
+def test_identical_request_reuses_recent_result_unless_forced(monkeypatch, tmp_path):
+    config = _config(tmp_path)
+    fake = _fake_pipeline(monkeypatch, _candidates(2))
+
+    first = playlist_service.build_playlist(config, PlaylistRequest(topic="Topic"))
+    reused = playlist_service.build_playlist(config, PlaylistRequest(topic="  topic "))
+    assert len(fake.searched) == 2
+    assert reused.reused_from_run_id == first.run_id
+    assert reused.run_id != first.run_id
+    assert Path(reused.exports.json_path).exists()
+    assert reused.model_dump(include={"subtopics", "recommendations"}) == first.model_dump(
+        include={"subtopics", "recommendations"}
+    )
+
+    # Reused runs are not reuse sources themselves, and force_refresh always recomputes.
+    refreshed = playlist_service.build_playlist(config, PlaylistRequest(topic="Topic"), force_refresh=True)
+    assert refreshed.reused_from_run_id is None
+    assert len(fake.searched) == 4
+    again = playlist_service.build_playlist(config, PlaylistRequest(topic="Topic"))
+    assert again.reused_from_run_id == refreshed.run_id
+
+
+def test_exhausted_shortlist_fetches_the_next_search_page(monkeypatch, tmp_path):
+    _fake_pipeline(monkeypatch, _candidates(1), rank_equally=False, transcript_status="unavailable")
+    page_calls = []
+
+    def fake_search_more(config, store, query, filters, page, logger=None):
+        page_calls.append((query, page))
+        return _candidates(2)
+
+    monkeypatch.setattr(playlist_service, "search_more_candidates", fake_search_more)
+
+    result = playlist_service.build_playlist(_config(tmp_path, search_max_pages=3), PlaylistRequest(topic="Topic"))
+
+    assert [item.video.video_id for item in result.recommendations] == ["video-0", "video-1"]
+    assert page_calls == [("Topic Advanced Practice", 2)]
+    assert result.subtopics[1].candidates_considered == 2
+
+
+def test_data_api_subtopics_search_separately_and_share_detail_lookups(monkeypatch, tmp_path):
+    _fake_pipeline(monkeypatch, rank_equally=False)
+    searched: list[str] = []
+    detail_calls: list[list[str]] = []
+    both_searching = threading.Barrier(2, timeout=5)
+
+    def fake_snippets(self, query, filters, limit, page_token=None):
+        searched.append(query)
+        if self.config.subtopic_workers > 1:
+            # Fails unless both subtopic searches are in flight at the same time.
+            both_searching.wait()
+        stubs = [
+            VideoCandidate(video_id=f"{query[-4:]}-{index}", url=f"https://example.com/{index}", title=query)
+            for index in range(3)
+        ]
+        return stubs, None
+
+    def fake_details(self, video_ids):
+        detail_calls.append(list(video_ids))
+        return [{"id": video_id, "contentDetails": {"duration": "PT5M"}} for video_id in video_ids]
+
+    monkeypatch.setattr(playlist_service.YouTubeDataAPIProvider, "search_snippets", fake_snippets)
+    monkeypatch.setattr(playlist_service.YouTubeDataAPIProvider, "_fetch_video_details", fake_details)
+
+    serial = _config(tmp_path / "1", youtube_data_api_key="key")
+    items = playlist_service.iter_playlist(serial, PlaylistRequest(topic="Topic"))
+    assert isinstance(next(items), SubtopicResult)
+    assert isinstance(next(items), Recommendation)
+    assert searched == ["Topic Foundations"]
+    list(items)
+    assert len(detail_calls) == 2
+
+    searched.clear()
+    detail_calls.clear()
+    parallel = _config(tmp_path / "2", youtube_data_api_key="key", subtopic_workers=2)
+    result = playlist_service.build_playlist(parallel, PlaylistRequest(topic="Topic"))
+    assert sorted(searched) == ["Topic Advanced Practice", "Topic Foundations"]
+    assert len(detail_calls) == 1
+    assert sorted(detail_calls[0]) == sorted(f"{suffix}-{index}" for suffix in ("ions", "tice") for index in range(3))
+    assert [item.video.duration_sec for item in result.recommendations] == [300, 300]
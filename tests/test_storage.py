@@ -1,6 +1,13 @@
+import gc
+import sqlite3
+import threading
+
+import pytest
+
 from src.config import AppConfig
-from src.models import FilterOptions, VideoCandidate
-from src.storage import SQLiteStore
+from src.models import FilterOptions, PlaylistResult, TranscriptResult, VideoCandidate
+from src.storage import MemoryCache, SQLiteStore, migrations, sqlite_store
+from src.storage.migrations import MIGRATIONS
 
 
 def test_sqlite_search_cache_hit_and_miss(tmp_path):
@@ -22,3 +29,215 @@ def test_sqlite_search_cache_hit_and_miss(tmp_path):
 
     store.put_search_cache("yt_dlp", "expired", filters.model_dump(), [candidate], ttl_sec=0)
     assert store.get_search_cache("yt_dlp", "expired", filters.model_dump()) is None
+
+
+def test_sqlite_store_reuses_thread_local_wal_connections(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache" / "app.db"))
+
+    with store.connect() as first:
+        journal_mode = first.execute("PRAGMA journal_mode").fetchone()[0]
+    with store.connect() as second:
+        assert second is first
+
+    other: list = []
+    worker = threading.Thread(target=lambda: other.append(store._pool.acquire()))
+    worker.start()
+    worker.join()
+
+    assert journal_mode == "wal"
+    assert other[0] is not first
+    store.close()
+
+
+def test_connections_of_finished_threads_are_closed(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache" / "app.db"))
+    store.get_provider_cooldowns()
+
+    for _ in range(50):
+        worker = threading.Thread(target=store.get_provider_cooldowns)
+        worker.start()
+        worker.join()
+
+    gc.collect()
+    assert store._pool.open_connections() == 1
+    store.close()
+    assert store._pool.open_connections() == 0
+
+
+def test_sqlite_batch_metadata_and_transcript_lookups(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache" / "app.db"))
+    candidates = [
+        VideoCandidate(video_id=f"vid{index:08d}", url="https://example.com", title=f"Video {index}")
+        for index in range(3)
+    ]
+
+    store.upsert_video_metadata_many(candidates, ttl_sec=60)
+    store.upsert_video_metadata_many(candidates[2:], ttl_sec=0)
+    metadata = store.get_video_metadata_many([item.video_id for item in candidates] + ["missing"])
+    assert sorted(metadata) == ["vid00000000", "vid00000001"]
+
+    store.put_transcript_cache(
+        TranscriptResult(video_id="vid00000000", status="available", source="asr", text="cached"), ttl_sec=60
+    )
+    store.put_transcript_cache(
+        TranscriptResult(video_id="vid00000001", status="unavailable", source="yt_dlp_subtitles"), ttl_sec=60
+    )
+    transcripts = store.get_transcript_cache_many(["vid00000000", "vid00000001"], ["asr", "youtube_transcript_api"])
+    assert list(transcripts) == [("vid00000000", "asr")]
+
+    store.mark_provider_cooldown("yt_dlp", "blocked", 60)
+    store.mark_provider_cooldown("asr", "expired", 0)
+    assert list(store.get_provider_cooldowns()) == ["yt_dlp"]
+
+
+def test_memory_cache_serves_validated_copies_and_honours_expiry(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache" / "app.db"), memory_cache=MemoryCache(max_entries=8))
+    filters = FilterOptions(language="en").model_dump()
+    candidate = VideoCandidate(video_id="vid12345678", url="https://example.com", title="Test")
+
+    store.put_search_cache("yt_dlp", "python", filters, [candidate], ttl_sec=60)
+    candidate.metadata_score = 9.0
+    with store.connect() as conn:
+        conn.execute("DELETE FROM search_cache")
+
+    cached = store.get_search_cache("yt_dlp", "python", filters)
+    assert cached is not None
+    assert cached[0].metadata_score == 0.0
+    cached[0].metadata_score = 5.0
+    assert store.get_search_cache("yt_dlp", "python", filters)[0].metadata_score == 0.0
+
+    store.put_transcript_cache(TranscriptResult(video_id="vid12345678", status="unavailable", source="asr"), ttl_sec=0)
+    assert store.get_transcript_cache("vid12345678", "asr") is None
+
+    stats = store.cache_stats()
+    assert (stats["search_cache"].hits, stats["search_cache"].misses) == (2, 0)
+    assert stats["transcript_cache"].misses == 1
+
+
+def test_transcript_text_is_deduplicated_compressed_and_loaded_lazily(tmp_path, monkeypatch):
+    store = SQLiteStore(str(tmp_path / "cache" / "app.db"))
+    text = "python functions scope parameters return values " * 50
+    for provider in ("youtube_transcript_api", "yt_dlp_subtitles"):
+        store.put_transcript_cache(
+            TranscriptResult(video_id="vid12345678", status="available", source=provider, text=text), ttl_sec=60
+        )
+    with store.connect() as conn:
+        blobs = conn.execute("SELECT raw_size, length(data) AS stored FROM transcript_blob").fetchall()
+        conn.execute(
+            """
+            INSERT INTO transcript_cache (video_id, provider, status, payload_json, expires_at, updated_at)
+            VALUES ('legacy00000', 'asr', 'available', ?, 4102444800, 1704067200)
+            """,
+            (TranscriptResult(video_id="legacy00000", status="available", source="asr", text="inline").model_dump_json(),),
+        )
+    assert len(blobs) == 1
+    assert blobs[0]["stored"] < blobs[0]["raw_size"] / 5
+
+    loads: list[str] = []
+    original_load = sqlite_store.load_blob_text
+    monkeypatch.setattr(
+        sqlite_store, "load_blob_text", lambda db_path, digest: loads.append(digest) or original_load(db_path, digest)
+    )
+    cached = store.get_transcript_cache("vid12345678", "yt_dlp_subtitles")
+    assert loads == []
+    assert cached.status == "available"
+    assert cached.text == text
+    assert cached.model_dump()["text"] == text
+    assert len(loads) == 1
+    assert store.get_transcript_cache("legacy00000", "asr").text == "inline"
+
+
+def test_lazy_transcript_whose_blob_was_evicted_is_not_available(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache" / "app.db"))
+    store.put_transcript_cache(
+        TranscriptResult(video_id="vid12345678", status="available", source="asr", text="some text"), ttl_sec=60
+    )
+    cached = store.get_transcript_cache("vid12345678", "asr")
+    with store.connect() as conn:
+        conn.execute("DELETE FROM transcript_cache")
+        conn.execute("DELETE FROM transcript_blob")
+
+    assert cached.status == "failed_temporary"
+    assert cached.text is None
+    assert store.get_transcript_cache("vid12345678", "asr") is None
+
+
+def test_run_journal_writes_behind_and_flushes_on_finalize(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache" / "app.db"), journal_queue_size=4)
+    store.create_run("run-1", "Topic", FilterOptions().model_dump())
+    for index in range(10):
+        store.add_run_video("run-1", "transcript", f"vid{index:08d}", {"index": index})
+    store.add_run_subtopic("run-1", 1, {"title": "Foundations"})
+
+    result = PlaylistResult(run_id="run-1", topic="Topic", filters=FilterOptions(), subtopics=[], recommendations=[])
+    store.finalize_run("run-1", result)
+
+    with store.connect() as conn:
+        videos = conn.execute("SELECT COUNT(*) FROM run_video WHERE run_id = 'run-1'").fetchone()[0]
+        subtopic = conn.execute("SELECT subtopic_json FROM run_subtopic WHERE run_id = 'run-1'").fetchone()[0]
+        finalized = conn.execute("SELECT result_json FROM run WHERE run_id = 'run-1'").fetchone()[0]
+    assert videos == 10
+    assert subtopic == '{"title": "Foundations"}'
+    assert finalized is not None
+
+
+def test_payload_codec_is_tagged_per_row_and_pre_codec_rows_stay_readable(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "cache" / "app.db")
+    codec_version = next(migration.version for migration in MIGRATIONS if migration.name == "payload_codecs")
+    monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in MIGRATIONS if m.version < codec_version])
+    SQLiteStore(db_path).close()
+    candidate = VideoCandidate(video_id="vid12345678", url="https://example.com", title="Test", view_count=10)
+    transcript = TranscriptResult(video_id="vid12345678", status="available", source="asr", text="inline text")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO video_metadata_cache VALUES ('vid12345678', ?, 4102444800, 1704067200)",
+        (candidate.model_dump_json(),),
+    )
+    conn.execute(
+        """
+        INSERT INTO transcript_cache
+        VALUES ('vid12345678', 'asr', 'available', ?, 4102444800, 1704067200, NULL, NULL)
+        """,
+        (transcript.model_dump_json(),),
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.undo()
+
+    store = SQLiteStore(db_path)
+    assert store.get_video_metadata("vid12345678") == candidate
+    assert store.get_transcript_cache("vid12345678", "asr").text == "inline text"
+
+    filters = FilterOptions(language="en").model_dump()
+    store.put_search_cache("yt_dlp", "json", filters, [candidate], ttl_sec=60)
+    with store.connect() as conn:
+        tags = {
+            table: {row[0] for row in conn.execute(f"SELECT payload_codec FROM {table}")}
+            for table in ("search_cache", "video_metadata_cache", "transcript_cache")
+        }
+    assert tags == {"search_cache": {"json"}, "video_metadata_cache": {"json"}, "transcript_cache": {"json"}}
+    assert store.get_search_cache("yt_dlp", "json", filters) == [candidate]
+
+
+def test_msgpack_payload_rows_are_readable_alongside_json_rows(tmp_path):
+    pytest.importorskip("msgpack")
+    db_path = str(tmp_path / "cache" / "app.db")
+    json_store = SQLiteStore(db_path)
+    msgpack_store = SQLiteStore(db_path, payload_codec="msgpack")
+    filters = FilterOptions(language="en").model_dump()
+    candidate = VideoCandidate(video_id="vid12345678", url="https://example.com", title="Test", view_count=10)
+
+    json_store.put_search_cache("yt_dlp", "json", filters, [candidate], ttl_sec=60)
+    msgpack_store.put_search_cache("yt_dlp", "msgpack", filters, [candidate], ttl_sec=60)
+    msgpack_store.upsert_video_metadata(candidate, ttl_sec=60)
+    msgpack_store.put_transcript_cache(
+        TranscriptResult(video_id="vid12345678", status="available", source="asr", text="packed text"), ttl_sec=60
+    )
+
+    with json_store.connect() as conn:
+        codecs = [row[0] for row in conn.execute("SELECT payload_codec FROM search_cache ORDER BY query")]
+    assert codecs == ["json", "msgpack"]
+    assert msgpack_store.get_search_cache("yt_dlp", "json", filters)[0] == candidate
+    assert json_store.get_search_cache("yt_dlp", "msgpack", filters)[0] == candidate
+    assert json_store.get_video_metadata("vid12345678").view_count == 10
+    assert json_store.get_transcript_cache("vid12345678", "asr").text == "packed text"
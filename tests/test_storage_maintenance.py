@@ -0,0 +1,85 @@
+import logging
+import os
+
+from src.models import FilterOptions, TranscriptResult, VideoCandidate
+from src.storage import MemoryCache, SQLiteStore, maintenance, sqlite_store
+from src.storage.connection_pool import SQLitePragmas
+from src.storage.maintenance import database_size_bytes, maintenance_due, maybe_run_maintenance_in_background
+
+
+def _transcript(video_id: str) -> TranscriptResult:
+    return TranscriptResult(video_id=video_id, status="available", source="asr", text=os.urandom(8000).hex())
+
+
+def test_maintenance_purges_expired_rows_and_enforces_size_cap(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache" / "app.db"))
+    filters = FilterOptions(language="en").model_dump()
+    candidate = VideoCandidate(video_id="vid00000000", url="https://example.com", title="Test")
+    store.put_search_cache("yt_dlp", "expired", filters, [candidate], ttl_sec=0)
+    store.put_search_cache("yt_dlp", "fresh", filters, [candidate], ttl_sec=60)
+    store.put_transcript_cache(_transcript("stale"), ttl_sec=0)
+    for index in range(40):
+        store.put_transcript_cache(_transcript(f"vid{index:08d}"), ttl_sec=60)
+    assert store.get_transcript_cache("vid00000039", "asr") is not None
+
+    report = store.run_maintenance(batch_size=1)
+    assert report.expired_deleted == {"search_cache": 1, "video_metadata_cache": 0, "transcript_cache": 1}
+    assert store.get_search_cache("yt_dlp", "fresh", filters) is not None
+
+    cap = database_size_bytes(store) // 2
+    report = store.run_maintenance(max_db_size_bytes=cap, batch_size=5)
+    assert report.evicted["transcript_cache"] > 0
+    assert report.size_after_bytes <= cap
+    assert store.get_transcript_cache("vid00000039", "asr") is not None
+    assert store.get_transcript_cache("vid00000000", "asr") is None
+    with store.connect() as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def test_background_maintenance_runs_at_most_once_per_interval(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache" / "app.db"))
+    assert maintenance_due(store, 3600)
+
+    thread = maybe_run_maintenance_in_background(store, interval_sec=3600)
+    assert thread is not None
+    thread.join()
+
+    assert not maintenance_due(store, 3600)
+    assert maybe_run_maintenance_in_background(store, interval_sec=3600) is None
+
+
+def test_background_maintenance_leaves_the_auto_vacuum_switch_to_the_cli(tmp_path, caplog):
+    db_path = str(tmp_path / "cache" / "app.db")
+    store = SQLiteStore(db_path, pragmas=SQLitePragmas(auto_vacuum="NONE"))
+    logger = logging.getLogger("test-maintenance")
+
+    with caplog.at_level(logging.INFO, logger="test-maintenance"):
+        thread = maybe_run_maintenance_in_background(store, interval_sec=3600, logger=logger)
+        thread.join()
+    with store.connect() as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+    assert "predates incremental auto-vacuum" in caplog.text
+    store.close()
+
+    assert maintenance.main(["--db", db_path, "--max-size-mb", "0"]) == 0
+    store = SQLiteStore(db_path)
+    with store.connect() as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def test_entries_read_only_from_memory_survive_lru_eviction(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_store, "_MEMORY_ACCESS_RECORD_INTERVAL_SEC", 0)
+    store = SQLiteStore(str(tmp_path / "cache" / "app.db"), memory_cache=MemoryCache())
+    for index in range(40):
+        store.put_transcript_cache(_transcript(f"vid{index:08d}"), ttl_sec=60)
+    with store.connect() as conn:
+        conn.execute("UPDATE transcript_cache SET last_accessed_at = last_accessed_at - 600")
+
+    assert store.get_transcript_cache("vid00000000", "asr") is not None
+    assert store.cache_stats()["transcript_cache"].hits == 1
+
+    report = store.run_maintenance(max_db_size_bytes=database_size_bytes(store) // 2, batch_size=5)
+    assert report.evicted["transcript_cache"] > 0
+    with store.connect() as conn:
+        kept = conn.execute("SELECT 1 FROM transcript_cache WHERE video_id = 'vid00000000'").fetchone()
+    assert kept is not None
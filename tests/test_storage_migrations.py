@@ -0,0 +1,71 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from src.models import FilterOptions, TranscriptResult, VideoCandidate
+from src.providers.search_cache_policy import YOUTUBE_SEARCH_CACHE_POLICY
+from src.storage import SQLiteStore
+from src.storage.migrations import MIGRATIONS, apply_migrations
+
+
+def _iso(delta_sec: int) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=delta_sec)).isoformat()
+
+
+def test_legacy_iso_database_is_migrated_in_place(tmp_path):
+    db_path = tmp_path / "cache" / "app.db"
+    db_path.parent.mkdir(parents=True)
+    filter_options = FilterOptions(language="en", max_duration_minutes=20)
+    filters = filter_options.model_dump()
+    candidate = VideoCandidate(video_id="vid12345678", url="https://example.com", title="Legacy")
+    transcript = TranscriptResult(video_id="vid12345678", status="available", source="asr", text="legacy text")
+    cache_key = SQLiteStore.build_search_cache_key("yt_dlp", "Python  Basics", filters)
+
+    conn = sqlite3.connect(db_path)
+    MIGRATIONS[0].apply(conn)
+    conn.execute(
+        "INSERT INTO search_cache VALUES (?, 'yt_dlp', 'Python  Basics', ?, ?, ?, ?)",
+        (cache_key, json.dumps(filters), json.dumps([candidate.model_dump()]), _iso(3600), _iso(0)),
+    )
+    conn.execute(
+        "INSERT INTO transcript_cache VALUES ('vid12345678', 'asr', 'available', ?, ?, ?)",
+        (transcript.model_dump_json(), _iso(3600), _iso(0)),
+    )
+    conn.execute(
+        "INSERT INTO transcript_cache VALUES ('vid12345678', 'yt_dlp_subtitles', 'unavailable', ?, ?, ?)",
+        (transcript.model_dump_json(), _iso(-60), _iso(-120)),
+    )
+    conn.execute("INSERT INTO provider_health VALUES ('yt_dlp', ?, 'blocked', ?)", (_iso(600), _iso(0)))
+    conn.commit()
+    conn.close()
+
+    store = SQLiteStore(str(db_path))
+
+    policy = YOUTUBE_SEARCH_CACHE_POLICY
+    other_filters = policy.cache_filters(filter_options.model_copy(update={"max_duration_minutes": 90}))
+    assert store.get_search_cache("yt_dlp", policy.cache_query("python basics"), other_filters)[0].title == "Legacy"
+    assert store.get_transcript_cache("vid12345678", "asr").text == "legacy text"
+    assert store.get_transcript_cache("vid12345678", "yt_dlp_subtitles") is None
+    assert list(store.get_provider_cooldowns()) == ["yt_dlp"]
+    with store.connect() as conn:
+        versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+        expires_type = conn.execute("SELECT typeof(expires_at) FROM search_cache").fetchone()[0]
+    assert versions == [migration.version for migration in MIGRATIONS]
+    assert expires_type == "integer"
+
+    SQLiteStore(str(db_path))
+
+
+def test_current_schema_is_checked_without_taking_the_write_lock(tmp_path):
+    db_path = str(tmp_path / "app.db")
+    SQLiteStore(db_path).close()
+
+    writer = sqlite3.connect(db_path, timeout=0)
+    reader = sqlite3.connect(db_path, timeout=0)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        assert apply_migrations(reader) == MIGRATIONS[-1].version
+    finally:
+        writer.rollback()
+        writer.close()
+        reader.close()
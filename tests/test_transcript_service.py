@@ -1,3 +1,7 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from src.config import AppConfig
 from src.models import TranscriptResult, VideoCandidate
 from src.services import transcript_service
@@ -112,3 +116,84 @@ def test_asr_backend_selection(tmp_path, monkeypatch):
 
     config.asr_backend = "faster-whisper"
     assert transcript_service.select_transcription_backend(config).name == "faster_whisper"
+
+
+def test_concurrent_lookups_respect_provider_limits_and_shared_cooldown(tmp_path, monkeypatch):
+    config = _config(tmp_path)
+    config.asr_concurrency = 2
+    store = SQLiteStore(config.sqlite_path)
+    state = transcript_service.RunTranscriptState.from_config(config)
+    candidates = [
+        VideoCandidate(video_id=f"vid{index:08d}", url=f"https://example.com/{index}", title="Python", language="en")
+        for index in range(6)
+    ]
+    lock = threading.Lock()
+    active = {"asr": 0, "peak": 0}
+    youtube_calls = []
+
+    def fake_youtube(candidate, logger=None):
+        youtube_calls.append(candidate.video_id)
+        time.sleep(0.05)
+        raise RuntimeError("blocked")
+
+    def fake_asr(config, candidate, run_dir, state, logger=None):
+        with lock:
+            active["asr"] += 1
+            active["peak"] = max(active["peak"], active["asr"])
+        time.sleep(0.05)
+        with lock:
+            active["asr"] -= 1
+        return TranscriptResult(video_id=candidate.video_id, status="available", source="asr", text="python")
+
+    monkeypatch.setattr(transcript_service, "_fetch_youtube_transcript", fake_youtube)
+    monkeypatch.setattr(
+        transcript_service,
+        "_fetch_ytdlp_subtitles",
+        lambda config, candidate, logger=None: TranscriptResult(
+            video_id=candidate.video_id, status="unavailable", source="yt_dlp_subtitles"
+        ),
+    )
+    monkeypatch.setattr(transcript_service, "_fetch_asr_transcript", fake_asr)
+    state.provider_limits["youtube_transcript_api"] = 1
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(
+            executor.map(
+                lambda candidate: transcript_service.get_transcript(config, store, candidate, str(tmp_path), state),
+                candidates,
+            )
+        )
+
+    assert [result.status for result in results] == ["available"] * 6
+    assert active["peak"] == 2
+    # Lookups queued behind the failing call see the cooldown instead of retrying the blocked provider.
+    assert len(youtube_calls) == 1
+
+
+def test_concurrent_runs_coalesce_identical_transcript_fetches(tmp_path, monkeypatch):
+    config = _config(tmp_path)
+    store = SQLiteStore(config.sqlite_path)
+    candidate = _candidate()
+    calls = []
+
+    def fake_youtube(candidate, logger=None):
+        calls.append(candidate.video_id)
+        time.sleep(0.1)
+        return TranscriptResult(
+            video_id=candidate.video_id, status="available", source="youtube_transcript_api", text="x"
+        )
+
+    monkeypatch.setattr(transcript_service, "_fetch_youtube_transcript", fake_youtube)
+
+    # Separate run states, as for two Streamlit sessions: only the in-flight layer can deduplicate them.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(
+            executor.map(
+                lambda state: transcript_service.get_transcript(config, store, candidate, str(tmp_path), state),
+                [transcript_service.RunTranscriptState(), transcript_service.RunTranscriptState()],
+            )
+        )
+
+    assert calls == [candidate.video_id]
+    assert [result.status for result in results] == ["available", "available"]
+    assert results[0] is not results[1]
@@ -0,0 +1,61 @@
+import pytest
+
+from src.config import AppConfig
+from src.models import FilterOptions
+from src.providers.youtube_data_api_provider import QuotaExhaustedError, YouTubeDataAPIProvider
+from src.providers.youtube_quota import DataApiQuota
+from src.storage import SQLiteStore
+
+
+def test_quota_ledger_keeps_the_interactive_reserve_from_batch_runs(tmp_path):
+    db_path = str(tmp_path / "app.db")
+    quota = DataApiQuota(SQLiteStore(db_path), "key", daily_limit=250, interactive_reserve=100, requests_per_sec=1000)
+
+    assert quota.admit(100, interactive=False)
+    assert not quota.admit(100, interactive=False)
+    assert quota.remaining(interactive=False) == 50
+    assert quota.admit(100, interactive=True)
+
+    other_process = DataApiQuota(SQLiteStore(db_path), "key", daily_limit=250, requests_per_sec=1000)
+    assert other_process.remaining() == 50
+    assert DataApiQuota(SQLiteStore(db_path), "other-key", daily_limit=250).remaining() == 250
+
+
+class _Response:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+class _RecordingHttp:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(url)
+        return self.response
+
+
+def test_provider_checks_quota_before_calling_and_records_quota_exceeded(tmp_path):
+    config = AppConfig(gemini_api_key="test", youtube_data_api_key="key", data_dir=str(tmp_path))
+    store = SQLiteStore(str(tmp_path / "app.db"))
+    quota = DataApiQuota(store, "key", daily_limit=150, requests_per_sec=1000)
+    exceeded = _Response(403, {"error": {"errors": [{"reason": "quotaExceeded"}]}})
+    http = _RecordingHttp(exceeded)
+    provider = YouTubeDataAPIProvider(config, http=http, quota=quota)
+
+    with pytest.raises(QuotaExhaustedError):
+        provider.search_snippets("python", FilterOptions(), 10)
+    assert len(http.calls) == 1
+    assert quota.remaining() == 0
+
+    with pytest.raises(QuotaExhaustedError, match="0 units left"):
+        provider.search_snippets("python", FilterOptions(), 10)
+    assert len(http.calls) == 1
@@ -0,0 +1,334 @@
+import asyncio
+import threading
+import time
+
+from src.config import AppConfig
+from src.models import FilterOptions, TranscriptResult, VideoCandidate
+from src.providers.youtube_data_api_provider import ProviderPermanentError
+from src.providers.ytdlp_provider import YtDlpProvider
+from src.services import youtube_search_service
+from src.services.cache_refresh import CacheRefresher
+from src.services.metadata_ranker import rank_candidates
+from src.services.youtube_search_service import search_candidates
+from src.storage import SQLiteStore
+
+
+def test_offline_discovery_searches_the_local_full_text_index(tmp_path):
+    config = AppConfig(
+        gemini_api_key="test",
+        gemini_model="gemini-test",
+        data_dir=str(tmp_path),
+        sqlite_path=str(tmp_path / "cache" / "app.db"),
+        local_index_mode="offline",
+    )
+    config.ensure_directories()
+    store = SQLiteStore(config.sqlite_path)
+    videos = [
+        VideoCandidate(video_id="vid00000001", url="https://example.com/1", title="Intro to Rust ownership"),
+        VideoCandidate(video_id="vid00000002", url="https://example.com/2", title="Cooking pasta", channel="Chef"),
+        VideoCandidate(video_id="vid00000003", url="https://example.com/3", title="Systems lecture", language="tr"),
+        VideoCandidate(video_id="vid00000004", url="https://example.com/4", title="Rust traits", language="en-US"),
+        VideoCandidate(video_id="vid00000005", url="https://example.com/5", title="Rust macros", language="EN"),
+    ]
+    store.upsert_video_metadata_many(videos, ttl_sec=0)
+    store.put_transcript_cache(
+        TranscriptResult(video_id="vid00000002", status="available", source="asr", text="we borrow like rust"),
+        ttl_sec=60,
+    )
+
+    results = search_candidates(config, store, "rust borrow", FilterOptions(language="en"))
+    assert sorted(candidate.video_id for candidate in results) == [
+        "vid00000001",
+        "vid00000002",
+        "vid00000004",
+        "vid00000005",
+    ]
+    assert {candidate.discovery_provider for candidate in results} == {"local_index"}
+
+    store.upsert_video_metadata(videos[0].model_copy(update={"title": "Intro to Go"}), ttl_sec=60)
+    results = search_candidates(config, store, "rust", FilterOptions(language="en"))
+    assert sorted(candidate.video_id for candidate in results) == ["vid00000002", "vid00000004", "vid00000005"]
+
+
+def test_stale_search_is_served_while_one_refresh_writes_back(tmp_path, monkeypatch):
+    config = AppConfig(
+        gemini_api_key="test",
+        gemini_model="gemini-test",
+        data_dir=str(tmp_path),
+        sqlite_path=str(tmp_path / "cache" / "app.db"),
+    )
+    config.ensure_directories()
+    store = SQLiteStore.from_config(config)
+    filters = FilterOptions(language="en")
+    old = VideoCandidate(video_id="vid00000001", url="https://example.com/1", title="Old")
+    new = VideoCandidate(video_id="vid00000002", url="https://example.com/2", title="New")
+    policy = YtDlpProvider.cache_policy
+    store.put_search_cache("yt_dlp", "python", policy.cache_filters(filters), [old], ttl_sec=0)
+
+    release = threading.Event()
+    calls = []
+
+    def fake_search(self, query, search_filters, limit):
+        calls.append(query)
+        release.wait(5)
+        return [new]
+
+    refresher = CacheRefresher(max_workers=2)
+    monkeypatch.setattr(YtDlpProvider, "search", fake_search)
+    monkeypatch.setattr(youtube_search_service, "shared_cache_refresher", lambda workers: refresher)
+
+    assert search_candidates(config, store, "Python", filters)[0].title == "Old"
+    assert search_candidates(config, store, "python ", filters)[0].title == "Old"
+    release.set()
+    refresher.wait(5)
+
+    assert calls == ["Python"]
+    assert store.get_search_cache("yt_dlp", "python", policy.cache_filters(filters))[0].title == "New"
+    stats = refresher.stats()["search_cache"]
+    assert (stats.stale_served, stats.scheduled, stats.deduplicated) == (2, 1, 1)
+
+
+def test_concurrent_identical_async_searches_share_one_provider_call(tmp_path):
+    config = AppConfig(
+        gemini_api_key="test",
+        gemini_model="gemini-test",
+        data_dir=str(tmp_path),
+        sqlite_path=str(tmp_path / "cache" / "app.db"),
+        retry_max_attempts=1,
+    )
+    config.ensure_directories()
+    store = SQLiteStore.from_config(config)
+    filters = FilterOptions(language="en")
+    video = VideoCandidate(video_id="vid00000001", url="https://example.com/1", title="Python")
+
+    class SlowProvider:
+        name = "slow_search"
+        cache_policy = YtDlpProvider.cache_policy
+
+        def __init__(self, error: Exception | None = None):
+            self.error = error
+            self.calls = 0
+
+        def is_configured(self) -> bool:
+            return True
+
+        async def search_async(self, query, search_filters, limit):
+            self.calls += 1
+            await asyncio.sleep(0.05)
+            if self.error is not None:
+                raise self.error
+            return [video]
+
+    async def search_twice(provider, query):
+        return await asyncio.gather(
+            *(
+                youtube_search_service.search_candidates_async(config, store, query, filters, providers=[provider])
+                for _ in range(2)
+            )
+        )
+
+    provider = SlowProvider()
+    assert asyncio.run(search_twice(provider, "Python")) == [[video], [video]]
+    assert provider.calls == 1
+
+    # Both callers see the shared failure and record it, instead of the second one calling the provider again.
+    failing = SlowProvider(RuntimeError("quota exceeded"))
+    assert asyncio.run(search_twice(failing, "Rust")) == [[], []]
+    assert failing.calls == 1
+    assert "slow_search" in store.get_provider_cooldowns()
+
+
+def test_coalesced_searches_rank_their_own_copies(tmp_path, monkeypatch):
+    config = AppConfig(
+        gemini_api_key="test",
+        gemini_model="gemini-test",
+        data_dir=str(tmp_path),
+        sqlite_path=str(tmp_path / "cache" / "app.db"),
+        retry_max_attempts=1,
+    )
+    config.ensure_directories()
+    store = SQLiteStore.from_config(config)
+    video = VideoCandidate(
+        video_id="vid00000001", url="https://example.com/1", title="Python basics tutorial", duration_sec=600
+    )
+    started = threading.Event()
+    release = threading.Event()
+
+    def fake_search(self, query, search_filters, limit):
+        started.set()
+        release.wait(5)
+        return [video.model_copy()]
+
+    monkeypatch.setattr(YtDlpProvider, "search", fake_search)
+    short = FilterOptions(language="en", difficulty="beginner", max_duration_minutes=5)
+    long = FilterOptions(language="en", difficulty="advanced", max_duration_minutes=60)
+    results: dict[str, list[VideoCandidate]] = {}
+
+    def search_and_rank(name: str, filters: FilterOptions) -> None:
+        results[name] = search_candidates(config, store, "Python", filters)
+        rank_candidates(results[name], "Python", "Basics", filters)
+
+    coalesced = youtube_search_service._SEARCH_FLIGHTS.coalesced
+    leader = threading.Thread(target=search_and_rank, args=("short", short))
+    leader.start()
+    assert started.wait(5)
+    follower = threading.Thread(target=search_and_rank, args=("long", long))
+    follower.start()
+    while youtube_search_service._SEARCH_FLIGHTS.coalesced == coalesced:
+        time.sleep(0.01)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results["short"][0] is not results["long"][0]
+    for name, filters in (("short", short), ("long", long)):
+        expected = rank_candidates([video.model_copy()], "Python", "Basics", filters)[0][1].total
+        assert results[name][0].metadata_score == expected
+    assert results["short"][0].metadata_score != results["long"][0].metadata_score
+
+
+def test_search_many_batches_detail_lookups_and_skips_cached_metadata(tmp_path, monkeypatch):
+    config = AppConfig(
+        gemini_api_key="test",
+        gemini_model="gemini-test",
+        youtube_data_api_key="key",
+        data_dir=str(tmp_path),
+        sqlite_path=str(tmp_path / "cache" / "app.db"),
+    )
+    config.ensure_directories()
+    store = SQLiteStore.from_config(config)
+    hits = {
+        "q1": [f"vid{index:08d}" for index in range(0, 30)],
+        "q2": [f"vid{index:08d}" for index in range(20, 50)],
+        "q3": [f"vid{index:08d}" for index in range(40, 70)],
+    }
+    cached = [VideoCandidate(video_id=f"vid{index:08d}", url="https://example.com", title="Cached") for index in (0, 1)]
+    store.upsert_video_metadata_many(cached, ttl_sec=3600)
+    detail_calls = []
+
+    def fake_snippets(self, query, filters, limit, page_token=None):
+        stubs = [
+            VideoCandidate(video_id=video_id, url=f"https://example.com/{video_id}", title=f"{query} {video_id}")
+            for video_id in hits[query]
+        ]
+        return stubs, None
+
+    def fake_details(self, video_ids):
+        detail_calls.append(list(video_ids))
+        return [{"id": video_id, "contentDetails": {"duration": "PT5M"}} for video_id in video_ids]
+
+    monkeypatch.setattr(youtube_search_service.YouTubeDataAPIProvider, "search_snippets", fake_snippets)
+    monkeypatch.setattr(youtube_search_service.YouTubeDataAPIProvider, "_fetch_video_details", fake_details)
+
+    results = youtube_search_service.search_candidates_many(
+        config, store, ["q1", "q2", "q3", "q1"], FilterOptions(language="en")
+    )
+
+    assert [len(batch) for batch in detail_calls] == [50, 18]
+    assert not {"vid00000000", "vid00000001"} & {video_id for batch in detail_calls for video_id in batch}
+    assert [candidate.video_id for candidate in results["q2"]] == hits["q2"]
+    assert results["q2"][0].title == "q2 vid00000020"
+    assert results["q2"][0].duration_sec == 300
+    assert results["q1"][0].duration_sec is None
+
+    again = youtube_search_service.search_candidates_many(config, store, ["q3"], FilterOptions(language="en"))
+    assert [candidate.video_id for candidate in again["q3"]] == hits["q3"]
+    assert len(detail_calls) == 2
+
+
+def test_search_many_sends_queries_to_ytdlp_when_details_fail_permanently(tmp_path, monkeypatch):
+    config = AppConfig(
+        gemini_api_key="test",
+        gemini_model="gemini-test",
+        youtube_data_api_key="key",
+        data_dir=str(tmp_path),
+        sqlite_path=str(tmp_path / "cache" / "app.db"),
+    )
+    config.ensure_directories()
+    store = SQLiteStore.from_config(config)
+    snippet_calls = []
+    fallback = VideoCandidate(video_id="vid00000009", url="https://example.com/9", title="Fallback")
+
+    def fake_snippets(self, query, filters, limit, page_token=None):
+        snippet_calls.append(query)
+        return [VideoCandidate(video_id="vid00000001", url="https://example.com/1", title=query)], None
+
+    def failing_details(self, video_ids):
+        raise ProviderPermanentError("videos.list forbidden")
+
+    monkeypatch.setattr(youtube_search_service.YouTubeDataAPIProvider, "search_snippets", fake_snippets)
+    monkeypatch.setattr(youtube_search_service.YouTubeDataAPIProvider, "fetch_videos", failing_details)
+    monkeypatch.setattr(YtDlpProvider, "search", lambda self, query, filters, limit: [fallback])
+
+    results = youtube_search_service.search_candidates_many(config, store, ["q1", "q2"], FilterOptions(language="en"))
+
+    assert sorted(snippet_calls) == ["q1", "q2"]
+    assert results == {"q1": [fallback], "q2": [fallback]}
+
+
+def test_hedged_search_races_the_fallback_when_the_primary_is_slow(tmp_path, monkeypatch):
+    config = AppConfig(
+        gemini_api_key="test",
+        gemini_model="gemini-test",
+        youtube_data_api_key="key",
+        data_dir=str(tmp_path),
+        sqlite_path=str(tmp_path / "cache" / "app.db"),
+        search_hedging=True,
+        search_hedge_delay_ms=50,
+    )
+    config.ensure_directories()
+    store = SQLiteStore.from_config(config)
+    release = threading.Event()
+    slow = VideoCandidate(video_id="vid00000001", url="https://example.com/1", title="Slow")
+    fast = VideoCandidate(video_id="vid00000002", url="https://example.com/2", title="Fast")
+
+    def slow_search(self, query, filters, limit):
+        release.wait(5)
+        return [slow]
+
+    monkeypatch.setattr(youtube_search_service.YouTubeDataAPIProvider, "search", slow_search)
+    monkeypatch.setattr(YtDlpProvider, "search", lambda self, query, filters, limit: [fast])
+    hedger = youtube_search_service.shared_search_hedger()
+    wins_before = hedger.wins().get("yt_dlp", 0)
+    try:
+        results = search_candidates(config, store, "hedged query", FilterOptions(language="en"))
+    finally:
+        release.set()
+
+    assert [candidate.video_id for candidate in results] == ["vid00000002"]
+    assert hedger.wins().get("yt_dlp", 0) == wins_before + 1
+
+
+def test_deeper_search_pages_follow_stored_tokens_and_are_cached(tmp_path, monkeypatch):
+    config = AppConfig(
+        gemini_api_key="test",
+        gemini_model="gemini-test",
+        youtube_data_api_key="key",
+        data_dir=str(tmp_path),
+        sqlite_path=str(tmp_path / "cache" / "app.db"),
+        search_max_pages=3,
+    )
+    config.ensure_directories()
+    store = SQLiteStore.from_config(config)
+    filters = FilterOptions(language="en")
+    calls = []
+
+    def fake_search_page(self, query, filters, limit, page_token=None):
+        calls.append(page_token)
+        page = int((page_token or "t1")[1:])
+        candidates = [
+            VideoCandidate(video_id=f"vid0000{page}00{index}", url="https://example.com", title=f"Page {page}")
+            for index in range(2)
+        ]
+        return candidates, f"t{page + 1}"
+
+    monkeypatch.setattr(youtube_search_service.YouTubeDataAPIProvider, "search_page", fake_search_page)
+
+    first = search_candidates(config, store, "python", filters)
+    second = youtube_search_service.search_more_candidates(config, store, "python", filters, page=2)
+    third = youtube_search_service.search_more_candidates(config, store, "python", filters, page=3)
+    again = youtube_search_service.search_more_candidates(config, store, "python", filters, page=2)
+
+    assert [candidate.title for candidate in first + second + third] == ["Page 1"] * 2 + ["Page 2"] * 2 + ["Page 3"] * 2
+    assert [candidate.video_id for candidate in again] == [candidate.video_id for candidate in second]
+    assert calls == [None, "t2", "t3"]